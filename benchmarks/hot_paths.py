@@ -0,0 +1,358 @@
+"""
+Benchmark the agent's hot paths and gate on regressions.
+
+Runs offline against a scripted fake LLM and times:
+    - Tool.get_schema (cold) and ToolRegistry.list_tools at 10/100/1000 tools
+    - AgentState.add_message and OllamaLLM._format_messages / _encode_request
+      at long history lengths
+    - full Agent.process_input turns with and without a tool call
+    - GeneralTools.calculate
+
+Timing rounds of each case alternate with rounds of a fixed reference
+workload, and a case is measured as the median ratio of its time to the
+reference's. Baselines (benchmarks/baselines.json) store these ratios rather
+than absolute times, so they carry over between machines and are not thrown
+off by a shared CI runner getting slower or faster mid-run. The run fails if
+a case's ratio exceeds its baseline by more than the threshold (50% by
+default; cases over it are re-measured first, so one noisy measurement does
+not fail the run). Different interpreters or CPUs can still shift ratios;
+refresh the baselines with --save after intentional changes, or on the CI
+runner itself.
+
+Cases that take under --min-time per call (1 us by default), like the cached
+list_tools lookups, are within timer and interpreter noise: they are reported
+but neither gated nor saved as baselines.
+
+Usage:
+    python benchmarks/hot_paths.py [--filter TEXT] [--threshold 0.5] [--retries 2] [--min-time 1e-6] [--save]
+"""
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+# Add the parent directory to sys.path to allow importing the package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openagents.core.agent import Agent
+from openagents.core.state import AgentState
+from openagents.llm.base import BaseLLM
+from openagents.llm.ollama_me import OllamaLLM
+from openagents.llm.usage import UsageTracker
+from openagents.tools.base import Tool
+from openagents.tools.general import GeneralTools
+from openagents.tools.registry import ToolRegistry
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+SYSTEM_PROMPT = "You are a helpful AI assistant with access to tools."
+
+
+class ScriptedLLM(BaseLLM):
+    """Fake LLM that answers instantly: asks for the calculator when the input mentions it"""
+    
+    def __init__(self, model: str = "scripted", **kwargs):
+        """Initialize the fake LLM"""
+        super().__init__(model, **kwargs)
+    
+    def generate_response(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Return a tool call for calculator requests, otherwise echo the last message"""
+        last = messages[-1]
+        if tools and last["role"] == "user" and "calculate" in last["content"]:
+            return {
+                "content": "",
+                "tool_calls": [{"id": "call-1", "name": "calculator", "arguments": {"expression": "2 ** 10 + sqrt(16)"}}]
+            }
+        return {"content": f"Answer: {last['content']}", "tool_calls": None}
+    
+    def get_tools_format(self, tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Use tools as they are"""
+        return tools
+
+
+def make_tools(count: int) -> List[Tool]:
+    """Create distinct tools with typed, documented parameters"""
+    def lookup(query: str, limit: int = 10, exact: bool = False) -> str:
+        """Look up records
+        
+        Args:
+            query: Text to search for
+            limit: Maximum number of records
+            exact: Whether to require an exact match
+        """
+        return query
+    
+    return [Tool(name=f"lookup_{i}", description=f"Look up records in table {i}", function=lookup) for i in range(count)]
+
+
+def make_history(length: int) -> AgentState:
+    """Create a conversation of the given length"""
+    state = AgentState()
+    state.add_message("system", SYSTEM_PROMPT)
+    for i in range(length - 1):
+        state.add_message("user" if i % 2 == 0 else "assistant", f"Message number {i} in a long conversation")
+    return state
+
+
+def make_agent(tools: bool) -> Agent:
+    """Create an agent backed by the scripted LLM"""
+    registry = ToolRegistry()
+    if tools:
+        registry.register_provider(GeneralTools())
+    return Agent("bench", SYSTEM_PROMPT, ScriptedLLM(), registry, usage_tracker=UsageTracker())
+
+
+# Each case is a factory returning the operation to time, built outside the timing
+def case_get_schema_cold(count: int) -> Callable[[], Any]:
+    """Build the schema of every tool from scratch"""
+    tools = make_tools(count)
+    
+    def run():
+        for tool in tools:
+            tool.invalidate_schema()
+            tool.get_schema()
+    return run
+
+
+def case_list_tools(count: int) -> Callable[[], Any]:
+    """Get the registry's tool list and its JSON encoding, as every request does"""
+    registry = ToolRegistry()
+    for tool in make_tools(count):
+        registry.register_tool(tool)
+    return lambda: registry.list_tools().to_json()
+
+
+def case_add_message(length: int) -> Callable[[], Any]:
+    """Build a conversation message by message"""
+    def run():
+        make_history(length)
+    return run
+
+
+def case_format_messages(length: int) -> Callable[[], Any]:
+    """Convert a long history to the Ollama wire format"""
+    llm = OllamaLLM("bench")
+    history = make_history(length).conversation_history
+    return lambda: llm._format_messages(history)
+
+
+def case_encode_request(length: int) -> Callable[[], Any]:
+    """Serialize a request body with a long history and the general tools"""
+    llm = OllamaLLM("bench")
+    history = make_history(length).conversation_history
+    tools = ToolRegistry()
+    tools.register_provider(GeneralTools())
+    schemas = tools.list_tools()
+    return lambda: llm._encode_request(history, schemas)
+
+
+def case_process_input(with_tool_call: bool) -> Callable[[], Any]:
+    """Run a full agent turn"""
+    agent = make_agent(tools=True)
+    prompt = "please calculate something" if with_tool_call else "hello there"
+    
+    def run():
+        # Keep the history short so every turn does the same work
+        del agent.state.conversation_history[1:]
+        agent.process_input(prompt)
+    return run
+
+
+def case_calculate() -> Callable[[], Any]:
+    """Evaluate an expression with the calculator tool"""
+    tools = GeneralTools()
+    return lambda: tools.calculate("2 ** 10 + sqrt(16) * sin(pi / 4)")
+
+
+def reference_workload() -> None:
+    """Fixed pure-Python work (dicts, strings, JSON) that measures machine speed"""
+    records = [{"role": "user", "content": f"message {i}", "index": i} for i in range(200)]
+    json.dumps([{k: v for k, v in record.items() if k != "index"} for record in records])
+
+
+CASES: List[Tuple[str, Callable[[], Callable[[], Any]]]] = (
+    [(f"get_schema_cold[{n}]", lambda n=n: case_get_schema_cold(n)) for n in (10, 100, 1000)]
+    + [(f"list_tools[{n}]", lambda n=n: case_list_tools(n)) for n in (10, 100, 1000)]
+    + [(f"add_message[{n}]", lambda n=n: case_add_message(n)) for n in (100, 1000, 10000)]
+    + [(f"format_messages[{n}]", lambda n=n: case_format_messages(n)) for n in (100, 1000, 10000)]
+    + [(f"encode_request[{n}]", lambda n=n: case_encode_request(n)) for n in (100, 1000, 10000)]
+    + [
+        ("process_input[no_tool_call]", lambda: case_process_input(False)),
+        ("process_input[tool_call]", lambda: case_process_input(True)),
+        ("calculate", case_calculate),
+    ]
+)
+
+
+def measure(operation: Callable[[], Any], rounds: int = 9, min_round_time: float = 0.05) -> Tuple[float, float]:
+    """Time an operation relative to the reference workload
+    
+    Rounds of the operation alternate with rounds of the reference workload,
+    and each operation round is divided by the mean of the reference rounds
+    on either side of it. Load that comes and goes during the run slows both
+    alike, so the ratio stays put while the absolute time moves.
+    
+    Args:
+        operation: Function to time
+        rounds: Number of timed rounds
+        min_round_time: Minimum duration of a round; the number of calls per
+            round is calibrated to reach it
+    
+    Returns:
+        (median seconds per call, median ratio to the reference workload)
+    """
+    operation()  # warm up caches and lazy initialization
+    reference_workload()
+    
+    # Like timeit, keep the garbage collector from landing in random rounds
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        number = _calibrate(operation, min_round_time)
+        reference_number = _calibrate(reference_workload, min_round_time)
+        
+        times, ratios = [], []
+        before = _time_round(reference_workload, reference_number)
+        for _ in range(rounds):
+            current = _time_round(operation, number)
+            after = _time_round(reference_workload, reference_number)
+            times.append(current)
+            ratios.append(current / ((before + after) / 2))
+            before = after
+        return statistics.median(times), statistics.median(ratios)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _calibrate(operation: Callable[[], Any], min_round_time: float) -> int:
+    """Get the number of calls that takes at least min_round_time"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        if time.perf_counter() - start >= min_round_time:
+            return number
+        number *= 2
+
+
+def _time_round(operation: Callable[[], Any], number: int) -> float:
+    """Get the seconds per call over one round of number calls"""
+    start = time.perf_counter()
+    for _ in range(number):
+        operation()
+    return (time.perf_counter() - start) / number
+
+
+def format_time(seconds: Optional[float]) -> str:
+    """Format a duration with a readable unit"""
+    if seconds is None:
+        return "-"
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def compare(results: Dict[str, Tuple[float, float]],
+            baselines: Dict[str, float],
+            threshold: float,
+            min_time: float = 0.0) -> List[str]:
+    """Print the comparison table and return the names of regressed cases
+    
+    Args:
+        results: (seconds per call, ratio to the reference workload) of each case
+        baselines: Stored ratio to the reference workload of each case
+        threshold: Allowed slowdown as a fraction
+        min_time: Seconds per call below which a case is too fast to gate
+    
+    Returns:
+        Names of the regressed cases
+    """
+    regressed = []
+    width = max(len(name) for name in results)
+    print(f"{'case':{width}s}  {'time':>10s}  {'baseline':>10s}  {'current':>10s}  {'change':>8s}  status")
+    for name, (seconds, ratio) in results.items():
+        baseline = baselines.get(name)
+        if seconds < min_time:
+            change, status = "", "too fast to gate"
+        elif baseline is None:
+            change, status = "", "new"
+        else:
+            delta = ratio / baseline - 1
+            change = f"{100 * delta:+.1f}%"
+            status = "ok"
+            if delta > threshold:
+                status = "REGRESSED"
+                regressed.append(name)
+            elif delta < -threshold:
+                status = "faster"
+        print(
+            f"{name:{width}s}  {format_time(seconds):>10s}  {format_ratio(baseline):>10s}  "
+            f"{format_ratio(ratio):>10s}  {change:>8s}  {status}"
+        )
+    return regressed
+
+
+def format_ratio(ratio: Optional[float]) -> str:
+    """Format a time relative to the reference workload"""
+    if ratio is None:
+        return "-"
+    return f"{ratio:.4g}x"
+
+
+def main():
+    """Run the benchmarks, compare with the baselines and exit non-zero on regressions"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this text")
+    parser.add_argument("--threshold", type=float, default=0.5, help="Allowed slowdown as a fraction (0.5 = 50%%)")
+    parser.add_argument("--retries", type=int, default=2, help="Re-measurements of a case before it counts as regressed")
+    parser.add_argument("--min-time", type=float, default=1e-6, help="Seconds per call below which a case is not gated")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file")
+    parser.add_argument("--save", action="store_true", help="Store the results as the new baselines")
+    args = parser.parse_args()
+    
+    baselines: Dict[str, float] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baselines = json.load(f)
+    
+    results: Dict[str, Tuple[float, float]] = {}
+    for name, factory in CASES:
+        if args.filter in name:
+            operation = factory()
+            results[name] = measure(operation)
+            # A slowdown must persist to count: re-measure suspects and keep the
+            # lowest ratio. New baselines are always the lowest of all attempts.
+            baseline = baselines.get(name)
+            if results[name][0] < args.min_time:
+                continue
+            for _ in range(args.retries):
+                if not args.save and (baseline is None or results[name][1] <= baseline * (1 + args.threshold)):
+                    break
+                results[name] = min(results[name], measure(operation), key=lambda result: result[1])
+    
+    regressed = compare(results, baselines, args.threshold, args.min_time)
+    
+    if args.save:
+        saved = {name: ratio for name, (seconds, ratio) in results.items() if seconds >= args.min_time}
+        for name in results.keys() - saved.keys():
+            baselines.pop(name, None)
+        baselines.update(saved)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Saved {len(saved)} baselines to {args.baseline}")
+    elif regressed:
+        print(f"{len(regressed)} case(s) regressed by more than {100 * args.threshold:.0f}%")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Measure the memory used by conversation history.
+
+Builds many idle sessions with a shared system prompt, once with the old
+dict messages and once with the compact Message type, and reports the RSS
+growth of each (measured in a fresh process with utils.helpers.get_memory_usage).
+
+Usage:
+    python benchmarks/message_memory.py [--sessions N] [--messages M]
+"""
+import argparse
+import gc
+import multiprocessing
+import os
+import sys
+
+# Add the parent directory to sys.path to allow importing the package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openagents.core.state import Message
+from openagents.utils.helpers import get_memory_usage
+
+SYSTEM_PROMPT = "You are a helpful AI assistant with access to tools. " * 20
+
+
+def build_dict_history(session: int, messages: int) -> list:
+    """Build a conversation the way AgentState used to: one dict per message"""
+    # Each agent receives its own copy of the prompt, e.g. loaded from config
+    history = [{"role": "system", "content": "".join(list(SYSTEM_PROMPT))}]
+    for i in range(messages):
+        history.append({"role": "user" if i % 2 == 0 else "assistant", "content": f"message {session}-{i}"})
+    return history
+
+
+def build_message_history(session: int, messages: int) -> list:
+    """Build a conversation from compact Message objects"""
+    history = [Message("system", "".join(list(SYSTEM_PROMPT)))]
+    for i in range(messages):
+        history.append(Message("user" if i % 2 == 0 else "assistant", f"message {session}-{i}"))
+    return history
+
+
+def measure(kind: str, sessions: int, messages: int) -> float:
+    """Return the RSS growth in MB from building the given kind of history"""
+    build = build_dict_history if kind == "dict" else build_message_history
+    gc.collect()
+    before = get_memory_usage()
+    if "error" in before:
+        raise RuntimeError(before["error"])
+    
+    histories = [build(session, messages) for session in range(sessions)]
+    
+    gc.collect()
+    after = get_memory_usage()
+    del histories
+    return after["rss_mb"] - before["rss_mb"]
+
+
+def main():
+    """Run the measurement and print a comparison"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=2000, help="Number of idle sessions")
+    parser.add_argument("--messages", type=int, default=50, help="Messages per session")
+    args = parser.parse_args()
+    
+    # Measure each variant in a fresh process so freed memory does not skew the other
+    ctx = multiprocessing.get_context("spawn")
+    results = {}
+    for kind in ("dict", "message"):
+        with ctx.Pool(1) as pool:
+            results[kind] = pool.apply(measure, (kind, args.sessions, args.messages))
+    
+    total = args.sessions * (args.messages + 1)
+    print(f"{args.sessions} sessions x {args.messages + 1} messages ({total} messages)")
+    for kind, rss_mb in results.items():
+        print(f"  {kind:8s} {rss_mb:8.1f} MB  ({rss_mb * 1024 * 1024 / total:6.0f} bytes/message)")
+    if results["dict"] > 0:
+        saving = 100 * (1 - results["message"] / results["dict"])
+        print(f"  saving   {saving:7.1f} %")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,7 +18,8 @@ from openagents.core.agent import Agent
 from openagents.llm.ollama_me import OllamaLLM
 from openagents.tools.registry import ToolRegistry
 from openagents.tools.general import GeneralTools
-from openagents.tools.base import Tool
+from openagents.tools.base import Tool, CACHE_PURE
+from openagents.tools.cache import ToolResultCache
 
 
 # Define custom tools
@@ -104,7 +105,8 @@ def main():
     registry.register_tool(Tool(
         name="search_database",
         description="Search a database for information",
-        function=search_database
+        function=search_database,
+        cache=CACHE_PURE
     ))
     
     registry.register_tool(Tool(
@@ -125,7 +127,8 @@ def main():
         ),
         llm=llm,
         tool_registry=registry,
-        verbose=True
+        verbose=True,
+        tool_cache=ToolResultCache()
     )
     
     print(f"\n{agent.name}: Hello! I'm your database assistant. I can help you search databases and send notifications.")
@@ -4,6 +4,8 @@ Package initialization for OpenAgents.
 This module initializes the OpenAgents package and provides a simplified API.
 """
 import logging
+from typing import TYPE_CHECKING, Any, Optional
+
 import termcolor
 
 
@@ -12,14 +14,36 @@ logging.getLogger(__name__).addHandler(logging.NullHandler())
 
 # Import main components for easier access
 from openagents.core.agent import Agent
+from openagents.core.context import ContextManager
 from openagents.tools.registry import ToolRegistry
 from openagents.tools.base import Tool
+from openagents.tools.cache import ToolResultCache
 from openagents.llm.providers import LLMRegistry
+from openagents.llm.admission import AdmissionController, AdmittedLLM
+from openagents.llm.balancer import BalancedOllamaLLM
+from openagents.llm.cache import CachedLLM, ResponseCache
+from openagents.llm.coalesce import CoalescingLLM
+from openagents.llm.ollama_me import OllamaLLM
+from openagents.llm.residency import ModelResidencyManager
+from openagents.llm.usage import UsageTracker, get_usage_tracker
 from openagents.tools.general import GeneralTools
+from openagents.tools.result_store import ResultStore
+from openagents.tools.retrieval import ToolSelector
+
+if TYPE_CHECKING:
+    # Needs multiprocessing.shared_memory (Python 3.8+); imported on first use
+    from openagents.tools.sandbox import SandboxExecutor
 
 # Package version
 __version__ = "0.1.0"
 
+def __getattr__(name: str) -> Any:
+    # Keep `from openagents import SandboxExecutor` working without importing it eagerly
+    if name == "SandboxExecutor":
+        from openagents.tools.sandbox import SandboxExecutor
+        return SandboxExecutor
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 def print_colored(text, color):
     print(termcolor.colored(text, color))
 
@@ -31,6 +55,20 @@ def create_agent(
     llm_model: str = "llama3.2",
     include_general_tools: bool = True,
     verbose: bool = False,
+    parallel_tool_calls: bool = False,
+    max_tool_concurrency: int = 4,
+    response_cache: Optional[ResponseCache] = None,
+    coalesce_requests: bool = False,
+    tool_top_k: Optional[int] = None,
+    max_context_tokens: Optional[int] = None,
+    residency: Optional[ModelResidencyManager] = None,
+    admission: Optional[AdmissionController] = None,
+    tenant: str = "default",
+    priority: str = "interactive",
+    tool_cache: Optional[ToolResultCache] = None,
+    sandbox: Optional["SandboxExecutor"] = None,
+    tool_timeout: Optional[float] = None,
+    result_store: Optional[ResultStore] = None,
     **kwargs
 ) -> Agent:
     """Create an agent with the specified configuration
@@ -42,6 +80,27 @@ def create_agent(
         llm_model: LLM model to use
         include_general_tools: Whether to include general tools
         verbose: Whether to enable verbose logging
+        parallel_tool_calls: Whether to run the tool calls of a single turn concurrently
+        max_tool_concurrency: Maximum number of concurrent tool calls per agent
+        response_cache: Optional cache of LLM responses for identical requests
+        coalesce_requests: Whether identical in-flight requests share one LLM call
+        tool_top_k: If set, send only the tool_top_k tools most relevant to each input
+        max_context_tokens: If set, keep the prompt under this many tokens
+        residency: Optional residency manager; the model is preloaded in the
+            background on every server the client uses and kept alive
+            according to the manager (Ollama providers only)
+        admission: Optional admission controller shared with other agents; every
+            LLM request of this agent waits for admission
+        tenant: Tenant the agent's requests are rate-limited and accounted as
+        priority: Priority class of the agent's requests ("interactive" or "batch")
+        tool_cache: Optional cache of tool results, shared with other agents to
+            reuse results of pure and TTL-cached tools across them
+        sandbox: Optional process-pool executor that CPU-heavy general tools
+            (the calculator) run in, with timeouts and resource limits
+        tool_timeout: Seconds a tool call may take, for tools without a timeout
+            of their own; calls that overrun report a timeout to the model
+        result_store: Optional store for large tool results; the conversation
+            keeps a preview and a handle the model can read slices of
         **kwargs: Additional arguments to pass to the LLM provider
         
     Returns:
@@ -53,14 +112,28 @@ def create_agent(
     
     # Create LLM
     llm_class = LLMRegistry.get_provider(llm_provider)
+    # Residency applies to Ollama servers only
+    uses_residency = residency is not None and issubclass(llm_class, (OllamaLLM, BalancedOllamaLLM))
+    if residency is not None and not uses_residency:
+        logging.getLogger(__name__).warning(f"Residency manager ignored for provider '{llm_provider}'")
+    if uses_residency:
+        kwargs["residency"] = residency
     llm = llm_class(model=llm_model, **kwargs)
+    if uses_residency:
+        residency.preload_for(llm, block=False)
+    if admission is not None:
+        llm = AdmittedLLM(llm, admission, tenant=tenant, priority=priority)
+    if coalesce_requests:
+        llm = CoalescingLLM(llm)
+    if response_cache is not None:
+        llm = CachedLLM(llm, response_cache)
     
     # Create tool registry
     registry = ToolRegistry()
     
     # Add general tools if requested
     if include_general_tools:
-        registry.register_provider(GeneralTools())
+        registry.register_provider(GeneralTools(executor=sandbox))
     
     # Create and return agent
     return Agent(
@@ -68,5 +141,12 @@ def create_agent(
         system_prompt=system_prompt,
         llm=llm,
         tool_registry=registry,
-        verbose=verbose
+        verbose=verbose,
+        parallel_tool_calls=parallel_tool_calls,
+        max_tool_concurrency=max_tool_concurrency,
+        tool_selector=ToolSelector(registry, top_k=tool_top_k) if tool_top_k else None,
+        context_manager=ContextManager(max_context_tokens) if max_context_tokens else None,
+        tool_cache=tool_cache,
+        tool_timeout=tool_timeout,
+        result_store=result_store
     )
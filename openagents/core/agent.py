@@ -4,12 +4,26 @@ Core agent implementation for OpenAgents framework.
 This module provides the main Agent class that coordinates LLM interactions,
 tool execution, and conversation management.
 """
+import asyncio
+import contextvars
+import json
 import logging
-from typing import Dict, List, Any, Optional, Union
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Union, Iterator, Generator, Tuple
 
+from openagents.core.context import ContextManager
 from openagents.core.state import AgentState
-from openagents.llm.base import BaseLLM
-from openagents.tools.registry import ToolRegistry
+from openagents.llm.base import BaseLLM, is_error_response
+from openagents.llm.usage import UsageTracker, get_usage_tracker
+from openagents.tools.base import Tool, ToolTimeoutError
+from openagents.tools.cache import ToolCallKey, ToolResultCache
+from openagents.tools.registry import ToolRegistry, ToolSchemas
+from openagents.tools.result_store import ResultPreview, ResultStore
+from openagents.tools.retrieval import ToolSelector
+from openagents.utils import deadline, session, tracing
+from openagents.utils.loop import get_background_loop
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +36,17 @@ class Agent:
                 system_prompt: str, 
                 llm: BaseLLM, 
                 tool_registry: ToolRegistry,
-                verbose: bool = False):
+                verbose: bool = False,
+                parallel_tool_calls: bool = False,
+                max_tool_concurrency: int = 4,
+                tool_selector: Optional[ToolSelector] = None,
+                context_manager: Optional[ContextManager] = None,
+                usage_tracker: Optional[UsageTracker] = None,
+                tool_cache: Optional[ToolResultCache] = None,
+                tool_timeout: Optional[float] = None,
+                result_store: Optional[ResultStore] = None,
+                max_result_rounds: int = 2,
+                session_id: Optional[str] = None):
         """Initialize the agent
         
         Args:
@@ -31,14 +55,54 @@ class Agent:
             llm: LLM client
             tool_registry: Registry of tools available to the agent
             verbose: Whether to enable verbose logging
+            parallel_tool_calls: Whether to run the tool calls of a single turn concurrently
+            max_tool_concurrency: Maximum number of tool calls run at once in parallel mode
+            tool_selector: Optional selector that sends only the tools relevant to each input
+            context_manager: Optional manager that keeps the prompt under a token budget
+            usage_tracker: Tracker that LLM usage is recorded into (defaults to the
+                process-wide tracker)
+            tool_cache: Optional cache that results of tools declared pure or
+                TTL-cached are memoized in; may be shared with other agents
+            tool_timeout: Seconds a tool call may take, for tools without a
+                timeout of their own (None for no limit besides the turn budget)
+            result_store: Optional store that large tool results are kept in; the
+                conversation gets a preview and a handle, and the store's
+                read_result/search_result tools are sent with every request
+            max_result_rounds: Extra tool rounds a turn may take to read results
+                that were moved to the result store before it must answer
+            session_id: Identifier of the conversation, for providers that route
+                by session (defaults to a random id)
         """
+        if max_tool_concurrency < 1:
+            raise ValueError("max_tool_concurrency must be at least 1")
+        
         self.name = name
         self.system_prompt = system_prompt
         self.llm = llm
         self.tool_registry = tool_registry
         self.verbose = verbose
+        self.parallel_tool_calls = parallel_tool_calls
+        self.max_tool_concurrency = max_tool_concurrency
+        self.tool_selector = tool_selector
+        self.context_manager = context_manager
+        self.usage_tracker = usage_tracker or get_usage_tracker()
+        self.tool_cache = tool_cache
+        self.tool_timeout = tool_timeout
+        self.result_store = result_store
+        self.max_result_rounds = max_result_rounds
+        self.session_id = session_id or uuid.uuid4().hex
         self.state = AgentState()
+        self._tool_executor: Optional[ThreadPoolExecutor] = None
                 
+        # Let the model read the large results kept out of the conversation. The
+        # store's tools belong to this agent rather than to the (possibly shared)
+        # registry, and are added to whatever tools are selected
+        self._result_tools: Dict[str, Tool] = {}
+        if result_store is not None:
+            self._result_tools = {tool.name: tool for tool in result_store.get_tools()}
+        # Selected schemas with the result tools added, by the snapshot they extend
+        self._tools_with_results: "OrderedDict[int, Tuple[List[Dict[str, Any]], ToolSchemas]]" = OrderedDict()
+        
         # Initialize conversation with system prompt
         self.state.add_message("system", system_prompt, None)
         
@@ -72,86 +136,651 @@ class Agent:
         Returns:
             Result of the tool execution
         """
-        tool = self.tool_registry.get_tool(tool_name)
-        if not tool:
-            error_msg = f"Error: Tool '{tool_name}' not found"
-            logger.error(error_msg)
-            return error_msg
-        
-        try:
-            if self.verbose:
-                logger.debug(f"Executing tool: {tool_name} with args: {arguments}")
+        with tracing.span("tool.execute", agent=self.name, tool=tool_name) as span:
+            tool = self._get_tool(tool_name)
+            if not tool:
+                error_msg = f"Error: Tool '{tool_name}' not found"
+                logger.error(error_msg)
+                span.set_error(error_msg)
+                return error_msg
+            
+            try:
+                if self.verbose:
+                    logger.debug(f"Executing tool: {tool_name} with args: {arguments}")
+                
+                cache_key = self._tool_cache_key(tool, arguments)
+                hit, result = self._cached_tool_result(cache_key, span)
+                if not hit:
+                    timeout = self._tool_call_timeout(tool)
+                    if timeout is not None and timeout <= 0:
+                        raise ToolTimeoutError("No time left in the turn budget")
+                    result = tool.call(arguments, timeout)
+                    if cache_key is not None:
+                        self.tool_cache.put(cache_key, result, tool.cache_ttl)
+                
+                # Store the result in the agent's state (large results go to the result store)
+                result = self._store_tool_result(tool_name, result)
                 
-            result = tool.execute(**arguments)
+                if self.verbose:
+                    logger.debug(f"Tool result: {str(result)[:100]}...")
+                    
+                return result
+            except ToolTimeoutError as e:
+                logger.warning(f"Tool '{tool_name}' timed out: {e}")
+                span.set_error(e)
+                return self._tool_timeout_result(tool_name, e)
+            except Exception as e:
+                error_msg = f"Error executing tool '{tool_name}': {str(e)}"
+                logger.error(error_msg)
+                span.set_error(e)
+                return error_msg
+    
+    async def aexecute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
+        """Execute a tool by name without blocking the event loop
+        
+        Async tools are awaited directly; synchronous tools are run in the
+        event loop's executor.
+        
+        Args:
+            tool_name: Name of the tool to execute
+            arguments: Arguments to pass to the tool
             
-            # Store the result in the agent's state
-            self.state.store_tool_result(tool_name, result)
+        Returns:
+            Result of the tool execution
+        """
+        with tracing.span("tool.execute", agent=self.name, tool=tool_name) as span:
+            tool = self._get_tool(tool_name)
+            if not tool:
+                error_msg = f"Error: Tool '{tool_name}' not found"
+                logger.error(error_msg)
+                span.set_error(error_msg)
+                return error_msg
             
-            if self.verbose:
-                logger.debug(f"Tool result: {str(result)[:100]}...")
+            try:
+                if self.verbose:
+                    logger.debug(f"Executing tool: {tool_name} with args: {arguments}")
+                
+                cache_key = self._tool_cache_key(tool, arguments)
+                hit, result = self._cached_tool_result(cache_key, span)
+                if not hit:
+                    timeout = self._tool_call_timeout(tool)
+                    if timeout is not None and timeout <= 0:
+                        raise ToolTimeoutError("No time left in the turn budget")
+                    result = await tool.acall(arguments, timeout)
+                    if cache_key is not None:
+                        self.tool_cache.put(cache_key, result, tool.cache_ttl)
                 
-            return result
-        except Exception as e:
-            error_msg = f"Error executing tool '{tool_name}': {str(e)}"
-            logger.error(error_msg)
-            return error_msg
+                # Store the result in the agent's state (large results go to the result store)
+                result = self._store_tool_result(tool_name, result)
+                
+                if self.verbose:
+                    logger.debug(f"Tool result: {str(result)[:100]}...")
+                    
+                return result
+            except ToolTimeoutError as e:
+                logger.warning(f"Tool '{tool_name}' timed out: {e}")
+                span.set_error(e)
+                return self._tool_timeout_result(tool_name, e)
+            except Exception as e:
+                error_msg = f"Error executing tool '{tool_name}': {str(e)}"
+                logger.error(error_msg)
+                span.set_error(e)
+                return error_msg
     
-    def process_input(self, user_input: str) -> str:
-        """Process user input and generate a response
+    def _get_tool(self, tool_name: str) -> Optional[Tool]:
+        """Look up a tool by name: the agent's result tools first, then the registry"""
+        return self._result_tools.get(tool_name) or self.tool_registry.get_tool(tool_name)
+    
+    def _tool_cache_key(self, tool: Tool, arguments: Dict[str, Any]) -> Optional[ToolCallKey]:
+        """Get the memoization key of a tool call, or None if it must run"""
+        if self.tool_cache is None:
+            return None
+        return self.tool_cache.key_for(tool, arguments)
+    
+    def _cached_tool_result(self, cache_key: Optional[ToolCallKey], span: Any) -> Tuple[bool, Any]:
+        """Look up a memoized tool result, recording the outcome on the span"""
+        if cache_key is None:
+            return False, None
+        hit, result = self.tool_cache.get(cache_key)
+        span.set_attribute("cache_hit", hit)
+        if hit and self.verbose:
+            logger.debug(f"Reusing cached result of {cache_key[0]}")
+        return hit, result
+    
+    def _store_tool_result(self, tool_name: str, result: Any) -> Any:
+        """Keep a tool result in the state, replacing a large one by its stored preview
+        
+        Args:
+            tool_name: Name of the tool
+            result: Result of the tool execution
+            
+        Returns:
+            The result to put in the conversation
+        """
+        if self.result_store is not None:
+            text = result if isinstance(result, str) else str(result)
+            if len(text) > self.result_store.threshold:
+                result = self.result_store.compact(tool_name, text)
+        self.state.store_tool_result(tool_name, result)
+        return result
+    
+    def _follow_up_tools(self, results: List[Any]) -> Optional[List[Dict[str, Any]]]:
+        """Tools to send after tool calls: the result store's, if any result was moved there"""
+        if self.max_result_rounds < 1 or not any(isinstance(result, ResultPreview) for result in results):
+            return None
+        return [tool.get_schema() for tool in self._result_tools.values()] or None
+    
+    def _tool_call_timeout(self, tool: Tool) -> Optional[float]:
+        """Seconds a call of the tool may take: its own timeout capped to the turn budget"""
+        return deadline.cap(tool.timeout if tool.timeout is not None else self.tool_timeout)
+    
+    def _tool_timeout_result(self, tool_name: str, error: Exception) -> str:
+        """Structured result reported to the model for a tool call that timed out"""
+        return json.dumps({
+            "status": "timeout",
+            "tool": tool_name,
+            "error": str(error),
+            "message": "The tool call was stopped before it finished. Answer with the "
+                       "information available or try a cheaper approach."
+        })
+    
+    def _finish_best_effort(self,
+                            turn: Any,
+                            response: Dict[str, Any],
+                            tool_calls: Optional[List[Dict[str, Any]]] = None,
+                            results: Optional[List[Any]] = None) -> str:
+        """End a turn whose budget ran out with an answer built from what it produced"""
+        turn.set_attribute("budget_exhausted", True)
+        logger.warning(f"Agent '{self.name}' ran out of turn budget; returning a best-effort answer")
+        
+        parts = []
+        if response.get("content") and not is_error_response(response):
+            parts.append(response["content"])
+        for tool_call, result in zip(tool_calls or [], results or []):
+            parts.append(f"{tool_call['name']}: {result}")
+        
+        if parts:
+            content = "I ran out of time before finishing my answer. Here is what I have so far:\n" + "\n".join(parts)
+        else:
+            content = "I ran out of time before I could answer."
+        self.add_message("assistant", content, None)
+        return content
+    
+    def get_prompt_messages(self) -> List[Dict[str, Any]]:
+        """Get the messages to send to the LLM for the next request
+        
+        Returns:
+            The conversation history, fitted to the context budget if a
+            context manager is set
+        """
+        messages = self.state.get_messages()
+        if self.context_manager is None:
+            return messages
+        return self.context_manager.fit(messages)
+    
+    def select_tools(self, user_input: str) -> List[Dict[str, Any]]:
+        """Get the tool schemas to send with a request for the given input
         
         Args:
             user_input: User input message
             
         Returns:
-            Agent's response
+            List of tool schemas
         """
-        # Add user message to conversation
-        self.add_message("user", user_input, None)
+        if self.tool_selector is None:
+            return self._with_result_tools(self.tool_registry.list_tools())
         
-        # Get response from LLM with tools
-        tools = self.tool_registry.list_tools()
+        tools = self.tool_selector.select(user_input)
         
         if self.verbose:
-            logger.debug(f"Sending request to LLM with {len(tools)} tools")
+            stats = self.tool_selector.last_stats
+            logger.debug(
+                f"Selected {stats['tools_selected']}/{stats['tools_total']} tools, "
+                f"saving ~{stats['prompt_tokens_saved']} prompt tokens"
+            )
+        
+        return self._with_result_tools(tools)
+    
+    def _with_result_tools(self, tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Add the result store's tools to selected schemas
+        
+        The combined list is kept per snapshot it extends, so its JSON encoding
+        is cached as long as the selection does not change.
+        """
+        if not self._result_tools:
+            return tools
         
-        response = self.llm.generate_response(
-            self.state.get_messages(),
-            tools=tools
+        entry = self._tools_with_results.get(id(tools))
+        if entry is not None and entry[0] is tools:
+            self._tools_with_results.move_to_end(id(tools))
+            return entry[1]
+        
+        names = {schema["function"]["name"] for schema in tools}
+        combined = ToolSchemas(
+            list(tools) + [tool.get_schema() for name, tool in self._result_tools.items() if name not in names],
+            getattr(tools, "version", 0)
         )
+        # Holding the snapshot keeps its id from being reused
+        self._tools_with_results[id(tools)] = (tools, combined)
+        while len(self._tools_with_results) > 8:
+            self._tools_with_results.popitem(last=False)
+        return combined
+    
+    def execute_tool_calls(self, tool_calls: List[Dict[str, Any]]) -> List[Any]:
+        """Execute the tool calls requested in a single LLM turn
+        
+        In parallel mode the calls run together: synchronous tools on the
+        agent's thread pool and async tools on the shared background event
+        loop (without a thread each). Either kind runs at most
+        max_tool_concurrency calls at once. Otherwise they run one after another.
+        
+        Args:
+            tool_calls: Tool calls returned by the LLM
+            
+        Returns:
+            Tool results, in the same order as tool_calls
+        """
+        if self.parallel_tool_calls and len(tool_calls) > 1:
+            results: List[Any] = [None] * len(tool_calls)
+            futures = {}
+            async_indexes = []
+            for index, tool_call in enumerate(tool_calls):
+                tool = self._get_tool(tool_call["name"])
+                if tool is not None and tool.is_async and tool.executor is None:
+                    async_indexes.append(index)
+                else:
+                    # Run each call in a copy of this context so its spans nest under the turn
+                    futures[index] = self._get_tool_executor().submit(
+                        contextvars.copy_context().run,
+                        self.execute_tool, tool_call["name"], tool_call["arguments"]
+                    )
+            
+            if async_indexes:
+                async_results = get_background_loop().run(
+                    self._agather_tool_calls([tool_calls[index] for index in async_indexes])
+                )
+                for index, result in zip(async_indexes, async_results):
+                    results[index] = result
+            for index, future in futures.items():
+                results[index] = future.result()
+            return results
+        
+        return [
+            self.execute_tool(tool_call["name"], tool_call["arguments"])
+            for tool_call in tool_calls
+        ]
+    
+    async def aexecute_tool_calls(self, tool_calls: List[Dict[str, Any]]) -> List[Any]:
+        """Execute the tool calls requested in a single LLM turn asynchronously
+        
+        In parallel mode the calls are gathered, with at most
+        max_tool_concurrency of them running at once.
+        
+        Args:
+            tool_calls: Tool calls returned by the LLM
+            
+        Returns:
+            Tool results, in the same order as tool_calls
+        """
+        if self.parallel_tool_calls and len(tool_calls) > 1:
+            return await self._agather_tool_calls(tool_calls)
+        
+        results = []
+        for tool_call in tool_calls:
+            results.append(await self.aexecute_tool(tool_call["name"], tool_call["arguments"]))
+        return results
+    
+    async def _agather_tool_calls(self, tool_calls: List[Dict[str, Any]]) -> List[Any]:
+        """Run tool calls concurrently, at most max_tool_concurrency at once"""
+        semaphore = asyncio.Semaphore(self.max_tool_concurrency)
+        
+        async def run(tool_call: Dict[str, Any]) -> Any:
+            async with semaphore:
+                return await self.aexecute_tool(tool_call["name"], tool_call["arguments"])
+        
+        return list(await asyncio.gather(*(run(tool_call) for tool_call in tool_calls)))
+    
+    def _get_tool_executor(self) -> ThreadPoolExecutor:
+        """Get the agent's thread pool for parallel tool calls, creating it on first use"""
+        if self._tool_executor is None:
+            self._tool_executor = ThreadPoolExecutor(
+                max_workers=self.max_tool_concurrency,
+                thread_name_prefix=f"{self.name}-tool"
+            )
+        return self._tool_executor
+    
+    def close(self) -> None:
+        """Shut down the agent's thread pool for parallel tool calls
+        
+        The agent can still be used afterwards; the pool is recreated on demand.
+        """
+        executor, self._tool_executor = self._tool_executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+    
+    def __enter__(self) -> "Agent":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+    
+    def _record_tool_calls(self, tool_calls: List[Dict[str, Any]], results: List[Any]) -> None:
+        """Append tool calls and their results to the conversation in call order"""
+        for tool_call, result in zip(tool_calls, results):
+            # Add the tool call to the conversation
+            self.add_message("assistant", None, tool_call)
+            
+            # Add the tool result to the conversation
+            self.add_message("tool", str(result), None)
+    
+    def _record_usage(self, response: Dict[str, Any]) -> None:
+        """Record the server-side usage of an LLM response, if it reports any"""
+        usage = response.get("usage")
+        if usage:
+            self.usage_tracker.record(self.name, self.llm.model, usage)
+    
+    def _follow_up(self,
+                   turn: Any,
+                   response: Dict[str, Any],
+                   tool_calls: List[Dict[str, Any]],
+                   results: List[Any]) -> Generator[Tuple[str, Any], Any, str]:
+        """Finish a turn after its first tool calls ran, up to the final answer
         
-        # Process tool calls if present
-        if response.get("tool_calls"):
+        Large results moved to the result store can be read in up to
+        max_result_rounds extra tool rounds before the model must answer. The
+        rounds are the same for every way of running a turn, so this generator
+        only decides what happens next and leaves the I/O to its driver: it
+        yields ("llm", tools) when it needs the next LLM response (sent back as
+        the response dictionary) and ("tools", tool_calls) when tool calls must
+        run (sent back as their results).
+        
+        Args:
+            turn: Span of the turn
+            response: First LLM response of the turn
+            tool_calls: Tool calls of the first response
+            results: Results of those tool calls, already in the conversation
+            
+        Returns:
+            The answer, or a best-effort answer if the turn ran out of time
+        """
+        followup_tools = self._follow_up_tools(results)
+        rounds = 0
+        while True:
+            final_response = yield "llm", followup_tools
+            self._record_usage(final_response)
+            
+            if deadline.expired() and is_error_response(final_response):
+                return self._finish_best_effort(turn, response, tool_calls, results)
+            if not (followup_tools and final_response.get("tool_calls")):
+                break
+            
+            more_calls = final_response["tool_calls"]
+            more_results = yield "tools", more_calls
+            self._record_tool_calls(more_calls, more_results)
+            tool_calls, results = tool_calls + more_calls, results + more_results
+            
+            if deadline.expired():
+                return self._finish_best_effort(turn, response, tool_calls, results)
+            rounds += 1
+            if rounds >= self.max_result_rounds:
+                # No more tools: the next response is the answer
+                followup_tools = None
+        
+        # Add assistant's final response to conversation
+        self.add_message("assistant", final_response["content"], None)
+        return final_response["content"]
+    
+    def _run_follow_up(self, follow_up: Generator[Tuple[str, Any], Any, str]) -> str:
+        """Drive _follow_up with blocking LLM and tool calls"""
+        request = next(follow_up)
+        while True:
+            kind, payload = request
+            if kind == "llm":
+                reply = self.llm.generate_response(self.get_prompt_messages(), tools=payload)
+            else:
+                reply = self.execute_tool_calls(payload)
+            try:
+                request = follow_up.send(reply)
+            except StopIteration as stop:
+                return stop.value
+    
+    async def _arun_follow_up(self, follow_up: Generator[Tuple[str, Any], Any, str]) -> str:
+        """Drive _follow_up with awaited LLM and tool calls"""
+        request = next(follow_up)
+        while True:
+            kind, payload = request
+            if kind == "llm":
+                reply = await self.llm.agenerate_response(self.get_prompt_messages(), tools=payload)
+            else:
+                reply = await self.aexecute_tool_calls(payload)
+            try:
+                request = follow_up.send(reply)
+            except StopIteration as stop:
+                return stop.value
+    
+    def process_input(self, user_input: str, budget: Optional[float] = None) -> str:
+        """Process user input and generate a response
+        
+        Args:
+            user_input: User input message
+            budget: Seconds the whole turn may take (None for no limit); LLM
+                calls and tools get the time that is left, and a turn that runs
+                out ends with a best-effort answer
+            
+        Returns:
+            Agent's response
+        """
+        with deadline.budget(budget), session.bind(self.session_id), \
+                tracing.span("agent.turn", agent=self.name, mode="sync") as turn:
+            # Add user message to conversation
+            self.add_message("user", user_input, None)
+            
+            # Get response from LLM with tools
+            tools = self.select_tools(user_input)
+            turn.set_attribute("tools_sent", len(tools))
+            
             if self.verbose:
-                logger.debug(f"LLM requested tool calls: {len(response['tool_calls'])}")
+                logger.debug(f"Sending request to LLM with {len(tools)} tools")
+            
+            response = self.llm.generate_response(
+                self.get_prompt_messages(),
+                tools=tools
+            )
+            self._record_usage(response)
             
-            for tool_call in response["tool_calls"]:
-                tool_name = tool_call["name"]
-                arguments = tool_call["arguments"]
+            if deadline.expired() and is_error_response(response):
+                return self._finish_best_effort(turn, response)
+            
+            # Process tool calls if present
+            if response.get("tool_calls"):
+                if self.verbose:
+                    logger.debug(f"LLM requested tool calls: {len(response['tool_calls'])}")
+                
+                tool_calls = response["tool_calls"]
+                turn.set_attribute("tool_calls", len(tool_calls))
+                results = self.execute_tool_calls(tool_calls)
+                self._record_tool_calls(tool_calls, results)
                 
-                # Add the tool call to the conversation
-                self.add_message("assistant", None, tool_call)
+                # Answer from the tool results if there is no time for another LLM call
+                if deadline.expired():
+                    return self._finish_best_effort(turn, response, tool_calls, results)
                 
-                # Execute the tool
-                result = self.execute_tool(tool_name, arguments)
+                # Get final response from LLM after tool execution
+                if self.verbose:
+                    logger.debug("Getting final response after tool execution")
                 
-                # Add the tool result to the conversation
-                self.add_message("tool", str(result), None)
+                return self._run_follow_up(self._follow_up(turn, response, tool_calls, results))
+            else:
+                # No tool calls, just add the response to conversation
+                if self.verbose:
+                    logger.debug("No tool calls requested, returning direct response")
+                    
+                self.add_message("assistant", response["content"], None)
+                return response["content"]
+    
+    def stream_input(self, user_input: str, budget: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """Process user input, yielding response events as they arrive
+        
+        Yields the LLM's stream events (see BaseLLM.generate_stream) plus
+        {"type": "tool_result", "tool_call": ..., "result": ...} after each
+        tool runs. The final event is {"type": "done", "content": <response>}.
+        
+        Args:
+            user_input: User input message
+            budget: Seconds the whole turn may take (None for no limit); LLM
+                calls and tools get the time that is left, and a turn that runs
+                out ends with a best-effort answer
+            
+        Yields:
+            Stream events
+        """
+        # The turn's deadline, session and span live in context variables. Run
+        # every step of the turn in a context of its own, so they are not in
+        # effect in the consumer's code between events.
+        context = contextvars.copy_context()
+        steps = self._stream_turn(user_input, budget)
+        try:
+            while True:
+                try:
+                    event = context.run(next, steps)
+                except StopIteration:
+                    return
+                yield event
+        finally:
+            context.run(steps.close)
+    
+    def _stream_turn(self, user_input: str, budget: Optional[float]) -> Iterator[Dict[str, Any]]:
+        """Run a streamed turn (see stream_input), which drives it in a context of its own"""
+        with deadline.budget(budget), session.bind(self.session_id), \
+                tracing.span("agent.turn", agent=self.name, mode="stream") as turn:
+            # Add user message to conversation
+            self.add_message("user", user_input, None)
+            
+            # Stream response from LLM with tools
+            tools = self.select_tools(user_input)
+            turn.set_attribute("tools_sent", len(tools))
             
-            # Get final response from LLM after tool execution
             if self.verbose:
-                logger.debug("Getting final response after tool execution")
+                logger.debug(f"Streaming request to LLM with {len(tools)} tools")
+            
+            response = None
+            for event in self.llm.generate_stream(self.get_prompt_messages(), tools=tools):
+                if event["type"] == "done":
+                    response = event
+                    self._record_usage(event)
+                else:
+                    yield event
+            
+            if deadline.expired() and is_error_response(response):
+                yield {"type": "done", "content": self._finish_best_effort(turn, response)}
+                return
+            
+            # Process tool calls if present
+            if response.get("tool_calls"):
+                if self.verbose:
+                    logger.debug(f"LLM requested tool calls: {len(response['tool_calls'])}")
                 
-            final_response = self.llm.generate_response(
-                self.state.get_messages()
-            )
+                tool_calls = response["tool_calls"]
+                turn.set_attribute("tool_calls", len(tool_calls))
+                results = self.execute_tool_calls(tool_calls)
+                self._record_tool_calls(tool_calls, results)
+                
+                for tool_call, result in zip(tool_calls, results):
+                    yield {"type": "tool_result", "tool_call": tool_call, "result": result}
+                
+                # Answer from the tool results if there is no time for another LLM call
+                if deadline.expired():
+                    yield {"type": "done", "content": self._finish_best_effort(turn, response, tool_calls, results)}
+                    return
+                
+                # Stream final response from LLM after tool execution
+                if self.verbose:
+                    logger.debug("Streaming final response after tool execution")
+                
+                follow_up = self._follow_up(turn, response, tool_calls, results)
+                request = next(follow_up)
+                while True:
+                    kind, payload = request
+                    if kind == "llm":
+                        reply = None
+                        for event in self.llm.generate_stream(self.get_prompt_messages(), tools=payload):
+                            if event["type"] == "done":
+                                reply = event
+                            else:
+                                yield event
+                    else:
+                        reply = self.execute_tool_calls(payload)
+                        for tool_call, result in zip(payload, reply):
+                            yield {"type": "tool_result", "tool_call": tool_call, "result": result}
+                    try:
+                        request = follow_up.send(reply)
+                    except StopIteration as stop:
+                        yield {"type": "done", "content": stop.value}
+                        return
             
-            # Add assistant's final response to conversation
-            self.add_message("assistant", final_response["content"], None)
-            return final_response["content"]
-        else:
             # No tool calls, just add the response to conversation
+            self.add_message("assistant", response["content"], None)
+            yield {"type": "done", "content": response["content"]}
+    
+    async def aprocess_input(self, user_input: str, budget: Optional[float] = None) -> str:
+        """Process user input and generate a response asynchronously
+        
+        Awaits the LLM and tools instead of blocking, so a single event loop
+        can drive many agents (conversations) concurrently.
+        
+        Args:
+            user_input: User input message
+            budget: Seconds the whole turn may take (None for no limit); LLM
+                calls and tools get the time that is left, and a turn that runs
+                out ends with a best-effort answer
+            
+        Returns:
+            Agent's response
+        """
+        with deadline.budget(budget), session.bind(self.session_id), \
+                tracing.span("agent.turn", agent=self.name, mode="async") as turn:
+            # Add user message to conversation
+            self.add_message("user", user_input, None)
+            
+            # Get response from LLM with tools
+            tools = self.select_tools(user_input)
+            turn.set_attribute("tools_sent", len(tools))
+            
             if self.verbose:
-                logger.debug("No tool calls requested, returning direct response")
+                logger.debug(f"Sending request to LLM with {len(tools)} tools")
+            
+            response = await self.llm.agenerate_response(
+                self.get_prompt_messages(),
+                tools=tools
+            )
+            self._record_usage(response)
+            
+            if deadline.expired() and is_error_response(response):
+                return self._finish_best_effort(turn, response)
+            
+            # Process tool calls if present
+            if response.get("tool_calls"):
+                if self.verbose:
+                    logger.debug(f"LLM requested tool calls: {len(response['tool_calls'])}")
                 
-            self.add_message("assistant", response["content"], None)
-            return response["content"]
+                tool_calls = response["tool_calls"]
+                turn.set_attribute("tool_calls", len(tool_calls))
+                results = await self.aexecute_tool_calls(tool_calls)
+                self._record_tool_calls(tool_calls, results)
+                
+                # Answer from the tool results if there is no time for another LLM call
+                if deadline.expired():
+                    return self._finish_best_effort(turn, response, tool_calls, results)
+                
+                # Get final response from LLM after tool execution
+                if self.verbose:
+                    logger.debug("Getting final response after tool execution")
+                
+                return await self._arun_follow_up(self._follow_up(turn, response, tool_calls, results))
+            else:
+                # No tool calls, just add the response to conversation
+                if self.verbose:
+                    logger.debug("No tool calls requested, returning direct response")
+                    
+                self.add_message("assistant", response["content"], None)
+                return response["content"]
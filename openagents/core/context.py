@@ -0,0 +1,170 @@
+"""
+Context window management for OpenAgents framework.
+
+A ContextManager keeps the messages sent to the LLM under a token budget.
+The system prompt and the most recent turns (a user message and everything
+after it) are always kept; older messages are collapsed or dropped by a
+chain of pluggable policies.
+"""
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, List, Any, Optional
+
+from openagents.core.state import Message
+from openagents.utils.helpers import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Approximate per-message overhead of the chat template (role markers etc.)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+COLLAPSED_TOOL_OUTPUT = "[tool output omitted to save context]"
+
+
+def message_tokens(message: Dict[str, Any]) -> int:
+    """Estimate the tokens a message adds to the prompt
+    
+    Only role and content are sent, so a message without content (a tool
+    call kept in the history) adds nothing. The estimate is cached on Message
+    objects, so each is measured once; plain dicts are measured every time
+    and never modified.
+    
+    Args:
+        message: Conversation message
+    
+    Returns:
+        Estimated token count
+    """
+    if isinstance(message, Message):
+        if message._tokens is None:
+            message._tokens = _count_tokens(message)
+        return message._tokens
+    return _count_tokens(message)
+
+
+def _count_tokens(message: Dict[str, Any]) -> int:
+    """Estimate the tokens of a message without caching"""
+    content = message.get("content")
+    if content is None:
+        return 0
+    return MESSAGE_OVERHEAD_TOKENS + estimate_tokens(content if isinstance(content, str) else str(content))
+
+
+class ContextPolicy(ABC):
+    """Strategy for shrinking the older part of a conversation"""
+    
+    @abstractmethod
+    def apply(self, messages: List[Dict[str, Any]], excess: int) -> List[Dict[str, Any]]:
+        """Reduce messages by at least excess tokens if possible
+        
+        Args:
+            messages: Older messages that may be collapsed or dropped, oldest first
+            excess: Number of tokens over budget
+        
+        Returns:
+            The reduced list of messages (the input list must not be modified)
+        """
+        pass
+
+
+class DropToolOutputsPolicy(ContextPolicy):
+    """Collapse old tool outputs, oldest first, keeping the rest of the turn"""
+    
+    def apply(self, messages: List[Dict[str, Any]], excess: int) -> List[Dict[str, Any]]:
+        """Replace old tool outputs with a short placeholder"""
+        reduced = []
+        for message in messages:
+            if excess > 0 and message.get("role") == "tool":
+                collapsed = Message("tool", COLLAPSED_TOOL_OUTPUT)
+                excess -= message_tokens(message) - message_tokens(collapsed)
+                reduced.append(collapsed)
+            else:
+                reduced.append(message)
+        return reduced
+
+
+class SlidingWindowPolicy(ContextPolicy):
+    """Drop the oldest messages until the conversation fits"""
+    
+    def apply(self, messages: List[Dict[str, Any]], excess: int) -> List[Dict[str, Any]]:
+        """Drop messages from the start of the older part"""
+        start = 0
+        while start < len(messages) and excess > 0:
+            excess -= message_tokens(messages[start])
+            start += 1
+        return messages[start:]
+
+
+class ContextManager:
+    """Keeps the prompt under a token budget"""
+    
+    def __init__(self,
+                 max_tokens: int,
+                 keep_recent: int = 2,
+                 policies: Optional[List[ContextPolicy]] = None):
+        """Initialize the context manager
+        
+        Args:
+            max_tokens: Token budget for the messages sent to the LLM
+            keep_recent: Number of most recent turns that are always kept; a
+                turn is a user message and everything after it
+            policies: Policies applied in order until the budget is met
+                (defaults to collapsing tool outputs, then a sliding window)
+        """
+        self.max_tokens = max_tokens
+        self.keep_recent = keep_recent
+        self.policies = policies if policies is not None else [
+            DropToolOutputsPolicy(),
+            SlidingWindowPolicy()
+        ]
+    
+    def fit(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Select the messages to send so that they fit the token budget
+        
+        Messages are never removed from or rewritten in the history itself.
+        
+        Args:
+            messages: Full conversation history
+        
+        Returns:
+            Messages to send to the LLM
+        """
+        total = sum(message_tokens(message) for message in messages)
+        if total <= self.max_tokens:
+            return messages
+        
+        # Leading system messages and the most recent turns are protected
+        head = 0
+        while head < len(messages) and messages[head].get("role") == "system":
+            head += 1
+        tail = self._recent_turns_start(messages, head)
+        
+        older = messages[head:tail]
+        older_tokens = sum(message_tokens(message) for message in older)
+        excess = total - self.max_tokens
+        
+        for policy in self.policies:
+            if excess <= 0:
+                break
+            older = policy.apply(older, excess)
+            new_tokens = sum(message_tokens(message) for message in older)
+            excess -= older_tokens - new_tokens
+            older_tokens = new_tokens
+        
+        if excess > 0:
+            logger.warning(
+                f"Context still {excess} tokens over budget after applying all policies"
+            )
+        
+        return messages[:head] + older + messages[tail:]
+    
+    def _recent_turns_start(self, messages: List[Dict[str, Any]], head: int) -> int:
+        """Index of the user message that starts the protected recent turns"""
+        tail = len(messages)
+        turns = 0
+        while tail > head and turns < self.keep_recent:
+            tail -= 1
+            if messages[tail].get("role") == "user":
+                turns += 1
+        return tail
@@ -2,12 +2,12 @@
 Core registry interfaces for OpenAgents framework.
 """
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Type, TypeVar
+from typing import Any, Dict, Generic, List, Optional, Type, TypeVar
 
 T = TypeVar('T')
 
 
-class BaseRegistry(ABC, Generic=T):
+class BaseRegistry(ABC, Generic[T]):
     """Base registry interface for OpenAgents"""
     
     @abstractmethod
@@ -45,9 +45,15 @@ class BaseRegistry(ABC, Generic=T):
 class AgentRegistry(BaseRegistry):
     """Registry for agent instances"""
     
-    def __init__(self):
-        """Initialize the agent registry"""
+    def __init__(self, residency: Optional[Any] = None):
+        """Initialize the agent registry
+        
+        Args:
+            residency: Optional ModelResidencyManager that keeps the models of
+                registered agents loaded
+        """
         self.agents: Dict[str, Any] = {}
+        self.residency = residency
     
     def register(self, name: str, agent: Any) -> None:
         """Register an agent
@@ -57,6 +63,9 @@ class AgentRegistry(BaseRegistry):
             agent: Agent instance
         """
         self.agents[name] = agent
+        
+        if self.residency is not None and getattr(agent, "llm", None) is not None:
+            self.residency.preload(agent.llm.model, block=False)
     
     def get(self, name: str) -> Optional[Any]:
         """Get an agent by name
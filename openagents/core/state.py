@@ -1,36 +1,139 @@
 """
 Core state management for OpenAgents framework.
 """
-from typing import Dict, List, Any, Optional
+import json
+import sys
+from typing import Dict, List, Any, Optional, Iterator
 from dataclasses import dataclass, field
 
 
+class Message:
+    """Compact conversation message
+    
+    Uses __slots__ instead of a per-message dict, interns the role string and
+    interns system prompts so agents sharing a prompt share one string. Also
+    supports dict-style access (message["role"], message.get(...)) for code
+    written against the old dict messages.
+    
+    The serialized wire form is cached, so a message is JSON-encoded once no
+    matter how many requests it is sent in. Change fields through item
+    assignment (message["content"] = ...) so the cache is invalidated.
+    """
+    __slots__ = ("role", "content", "tool_call", "_tokens", "_json")
+    
+    def __init__(self, role: str, content: Optional[str] = None, tool_call: Optional[Dict[str, Any]] = None):
+        """Initialize the message
+        
+        Args:
+            role: Role of the message sender (system, user, assistant, tool)
+            content: Content of the message
+            tool_call: Optional tool call information
+        """
+        self.role = sys.intern(role)
+        if role == "system" and type(content) is str:
+            content = sys.intern(content)
+        self.content = content
+        self.tool_call = tool_call
+        self._tokens: Optional[int] = None
+        self._json: Optional[bytes] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the dict form used by earlier versions of AgentState
+        
+        Returns:
+            Dictionary with role and, when set, content and tool_call
+        """
+        message = {"role": self.role}
+        if self.content is not None:
+            message["content"] = self.content
+        if self.tool_call is not None:
+            message["tool_call"] = self.tool_call
+        return message
+    
+    def to_wire(self) -> Dict[str, Any]:
+        """Convert to the chat API wire format
+        
+        Returns:
+            Dictionary with role and content
+        """
+        return {"role": self.role, "content": self.content}
+    
+    def wire_json(self) -> bytes:
+        """Get the JSON encoding of the wire format, serializing it on first use
+        
+        Returns:
+            UTF-8 encoded JSON object
+        """
+        if self._json is None:
+            self._json = json.dumps(self.to_wire()).encode("utf-8")
+        return self._json
+    
+    def keys(self) -> List[str]:
+        """Names of the fields that are set, as in the dict form"""
+        keys = ["role"]
+        if self.content is not None:
+            keys.append("content")
+        if self.tool_call is not None:
+            keys.append("tool_call")
+        return keys
+    
+    def items(self) -> List[Any]:
+        """(name, value) pairs of the fields that are set, as in the dict form"""
+        return [(key, self[key]) for key in self.keys()]
+    
+    def get(self, key: str, default=None) -> Any:
+        """Get a field by name, as in the dict form"""
+        if key in self.__slots__ and (key == "role" or getattr(self, key) is not None):
+            return getattr(self, key)
+        return default
+    
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+    
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+        if key in ("role", "content", "tool_call"):
+            self._tokens = None
+            self._json = None
+    
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+    
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, Message):
+            other = other.to_dict()
+        return self.to_dict() == other
+    
+    def __repr__(self) -> str:
+        return f"Message({self.to_dict()!r})"
+
+
 @dataclass
 class AgentState:
     """Represents the state of an agent"""
-    conversation_history: List[Dict[str, Any]] = field(default_factory=list)
+    conversation_history: List[Message] = field(default_factory=list)
     memory: Dict[str, Any] = field(default_factory=dict)
     tool_results: Dict[str, Any] = field(default_factory=dict)
     
     def add_message(self, role: str, content: Optional[str], tool_call=None) -> None:
         """Add a message to the conversation history"""
-        message = {"role": role}
-        
-        if content is not None:
-            message["content"] = content
-            
-        if tool_call is not None:
-            message["tool_call"] = tool_call
-            
-        self.conversation_history.append(message)
-    
-    def get_last_message(self) -> Optional[Dict[str, Any]]:
+        self.conversation_history.append(Message(role, content, tool_call))
+    
+    def get_last_message(self) -> Optional[Message]:
         """Get the last message in the conversation history"""
         if self.conversation_history:
             return self.conversation_history[-1]
         return None
     
-    def get_messages(self) -> List[Dict[str, Any]]:
+    def get_messages(self) -> List[Message]:
         """Get all messages in conversation history"""
         return self.conversation_history
     
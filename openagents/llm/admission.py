@@ -0,0 +1,463 @@
+"""
+Admission control for OpenAgents framework.
+
+Interactive users and batch jobs share the same LLM backends. An
+AdmissionController sits in front of them and decides which request goes
+next:
+
+- per-tenant token buckets limit each tenant's request rate;
+- a fixed number of requests run at once, and the rest wait in one bounded
+  queue per priority class; free slots always go to the highest class with
+  waiting requests ("interactive" before "batch"), first come first served
+  within a class;
+- a request whose deadline passes while it waits (or that would have to wait
+  past its deadline for rate-limit tokens) is rejected instead of served late.
+
+Queue depths, waits and rejections are counted per class and per tenant.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from typing import Dict, List, Any, Iterator, Optional, Sequence, Tuple
+
+from openagents.llm.base import BaseLLM, LLMWrapper
+from openagents.utils.deadline import current as current_deadline
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_CLASSES = ("interactive", "batch")
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is not admitted"""
+    
+    def __init__(self, reason: str, tenant: str, priority: str):
+        """Initialize the exception
+        
+        Args:
+            reason: Why the request was rejected ("queue_full", "deadline" or "rate_limited")
+            tenant: Tenant that made the request
+            priority: Priority class of the request
+        """
+        super().__init__(f"Request from tenant '{tenant}' ({priority}) rejected: {reason}")
+        self.reason = reason
+        self.tenant = tenant
+        self.priority = priority
+
+
+class TokenBucket:
+    """Token bucket rate limit"""
+    
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        """Initialize the bucket (full)
+        
+        Args:
+            rate: Tokens added per second
+            burst: Bucket capacity (defaults to one second's worth, at least 1)
+        """
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+    
+    def reserve(self) -> float:
+        """Take a token, borrowing against the future if the bucket is empty
+        
+        Returns:
+            Seconds until the reserved token is actually available (0 if it is now)
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+    
+    def cancel(self) -> None:
+        """Give back a reserved token"""
+        self.tokens += 1
+
+
+class _Ticket:
+    """A request waiting for a slot, from a thread or from an event loop"""
+    
+    __slots__ = ("future", "loop", "tenant", "priority", "queued_at")
+    
+    def __init__(self, future: Any, loop: Optional[asyncio.AbstractEventLoop], tenant: str, priority: str):
+        """Initialize the ticket
+        
+        Args:
+            future: Future resolved when the slot is granted
+            loop: Event loop of an async waiter (None for a thread)
+            tenant: Tenant that made the request
+            priority: Priority class of the request
+        """
+        self.future = future
+        self.loop = loop
+        self.tenant = tenant
+        self.priority = priority
+        self.queued_at = time.monotonic()
+
+
+class AdmissionController:
+    """Admits requests by priority within per-tenant rate limits"""
+    
+    def __init__(self,
+                 max_concurrent: int = 4,
+                 max_queue: int = 64,
+                 priorities: Sequence[str] = PRIORITY_CLASSES,
+                 tenant_rate: Optional[float] = None,
+                 tenant_burst: Optional[float] = None,
+                 tenant_limits: Optional[Dict[str, Tuple[float, Optional[float]]]] = None):
+        """Initialize the controller
+        
+        Args:
+            max_concurrent: Requests admitted at the same time
+            max_queue: Maximum requests waiting per priority class
+            priorities: Priority classes, highest first
+            tenant_rate: Default requests per second per tenant (None for no limit)
+            tenant_burst: Default burst size per tenant
+            tenant_limits: Per-tenant (rate, burst) overrides
+        """
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+        
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.priorities = list(priorities)
+        self.tenant_rate = tenant_rate
+        self.tenant_burst = tenant_burst
+        self.tenant_limits = dict(tenant_limits or {})
+        
+        self.in_flight = 0
+        self._queues: Dict[str, "deque[_Ticket]"] = {priority: deque() for priority in self.priorities}
+        self._buckets: Dict[str, Optional[TokenBucket]] = {}
+        self._class_stats = {
+            priority: {"admitted": 0, "rejected": 0, "peak_depth": 0, "total_wait": 0.0}
+            for priority in self.priorities
+        }
+        self._tenant_stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+    
+    def acquire(self, tenant: str = "default", priority: str = "interactive", deadline: Optional[float] = None) -> None:
+        """Wait until a request is admitted
+        
+        Args:
+            tenant: Tenant making the request
+            priority: Priority class of the request
+            deadline: time.monotonic() value after which the request is rejected
+        
+        Raises:
+            AdmissionRejected: If the request cannot be admitted before its deadline
+        """
+        delay = self._reserve_token(tenant, priority, deadline)
+        if delay:
+            time.sleep(delay)
+        
+        with self._lock:
+            ticket = self._enter(Future(), None, tenant, priority, deadline)
+            if ticket is None:
+                return
+        
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        try:
+            ticket.future.result(timeout)
+            return
+        except FutureTimeoutError:
+            pass
+        
+        with self._lock:
+            if self._withdraw(ticket):
+                self._refund_token(tenant)
+                raise self._reject("deadline", tenant, priority)
+        # The slot was granted while timing out
+    
+    async def aacquire(self, tenant: str = "default", priority: str = "interactive", deadline: Optional[float] = None) -> None:
+        """Wait until a request is admitted, without blocking the event loop
+        
+        Args:
+            tenant: Tenant making the request
+            priority: Priority class of the request
+            deadline: time.monotonic() value after which the request is rejected
+        
+        Raises:
+            AdmissionRejected: If the request cannot be admitted before its deadline
+        """
+        delay = self._reserve_token(tenant, priority, deadline)
+        if delay:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                with self._lock:
+                    self._refund_token(tenant)
+                raise
+        
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            ticket = self._enter(loop.create_future(), loop, tenant, priority, deadline)
+            if ticket is None:
+                return
+        
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        try:
+            done, _ = await asyncio.wait({ticket.future}, timeout=timeout)
+            if not done:
+                with self._lock:
+                    if self._withdraw(ticket):
+                        self._refund_token(tenant)
+                        raise self._reject("deadline", tenant, priority)
+            # Granted (possibly while timing out; delivery is already scheduled)
+            await ticket.future
+        except asyncio.CancelledError:
+            with self._lock:
+                if self._withdraw(ticket):
+                    self._refund_token(tenant)
+                    raise
+            if ticket.future.done() and not ticket.future.cancelled():
+                self.release()
+            elif not ticket.future.done():
+                ticket.future.cancel()
+            # Otherwise the granted slot is handed back by _deliver
+            raise
+    
+    def release(self) -> None:
+        """Finish an admitted request, handing its slot to the next waiter"""
+        with self._lock:
+            self.in_flight -= 1
+            self._grant()
+    
+    @contextmanager
+    def admit(self, tenant: str = "default", priority: str = "interactive", deadline: Optional[float] = None):
+        """Context manager that holds an admission slot for its block
+        
+        Args:
+            tenant: Tenant making the request
+            priority: Priority class of the request
+            deadline: time.monotonic() value after which the request is rejected
+        """
+        self.acquire(tenant, priority, deadline)
+        try:
+            yield
+        finally:
+            self.release()
+    
+    def queue_depths(self) -> Dict[str, int]:
+        """Get the number of waiting requests per priority class
+        
+        Returns:
+            Mapping of priority class to queue depth
+        """
+        with self._lock:
+            return {priority: len(queue) for priority, queue in self._queues.items()}
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get admission statistics
+        
+        Returns:
+            Dictionary with slots in use and per-class and per-tenant counters
+        """
+        with self._lock:
+            classes = {}
+            for priority, counters in self._class_stats.items():
+                admitted = counters["admitted"]
+                classes[priority] = {
+                    "depth": len(self._queues[priority]),
+                    "peak_depth": counters["peak_depth"],
+                    "admitted": admitted,
+                    "rejected": counters["rejected"],
+                    "mean_wait_ms": 1000 * counters["total_wait"] / admitted if admitted else 0.0
+                }
+            return {
+                "in_flight": self.in_flight,
+                "max_concurrent": self.max_concurrent,
+                "classes": classes,
+                "tenants": {tenant: dict(counters) for tenant, counters in self._tenant_stats.items()}
+            }
+    
+    def _reserve_token(self, tenant: str, priority: str, deadline: Optional[float]) -> float:
+        """Take a rate-limit token for the tenant, returning how long to wait for it"""
+        if priority not in self._queues:
+            raise ValueError(f"Unknown priority class '{priority}'")
+        
+        with self._lock:
+            if tenant not in self._buckets:
+                rate, burst = self.tenant_limits.get(tenant, (self.tenant_rate, self.tenant_burst))
+                self._buckets[tenant] = TokenBucket(rate, burst) if rate else None
+            bucket = self._buckets[tenant]
+            if bucket is None:
+                return 0.0
+            
+            delay = bucket.reserve()
+            if delay and deadline is not None and time.monotonic() + delay > deadline:
+                bucket.cancel()
+                raise self._reject("rate_limited", tenant, priority)
+            if delay:
+                self._count_tenant(tenant, "rate_limited")
+            return delay
+    
+    def _refund_token(self, tenant: str) -> None:
+        """Give back the rate-limit token of a request that is not served (lock held)"""
+        bucket = self._buckets.get(tenant)
+        if bucket is not None:
+            bucket.cancel()
+    
+    def _enter(self,
+               future: Any,
+               loop: Optional[asyncio.AbstractEventLoop],
+               tenant: str,
+               priority: str,
+               deadline: Optional[float]) -> Optional[_Ticket]:
+        """Admit the request now, or queue it and return its ticket (lock held)"""
+        if not any(self._queues.values()) and self.in_flight < self.max_concurrent:
+            self.in_flight += 1
+            self._count_admitted(tenant, priority, 0.0)
+            return None
+        
+        if deadline is not None and time.monotonic() >= deadline:
+            self._refund_token(tenant)
+            raise self._reject("deadline", tenant, priority)
+        queue = self._queues[priority]
+        if len(queue) >= self.max_queue:
+            self._refund_token(tenant)
+            raise self._reject("queue_full", tenant, priority)
+        
+        ticket = _Ticket(future, loop, tenant, priority)
+        queue.append(ticket)
+        counters = self._class_stats[priority]
+        counters["peak_depth"] = max(counters["peak_depth"], len(queue))
+        return ticket
+    
+    def _withdraw(self, ticket: _Ticket) -> bool:
+        """Remove a ticket that is still waiting; False if it was already granted (lock held)"""
+        queue = self._queues[ticket.priority]
+        if ticket in queue:
+            queue.remove(ticket)
+            return True
+        return False
+    
+    def _grant(self) -> None:
+        """Hand free slots to the highest-priority waiters (lock held)"""
+        while self.in_flight < self.max_concurrent:
+            queue = next((queue for queue in self._queues.values() if queue), None)
+            if queue is None:
+                return
+            ticket = queue.popleft()
+            self.in_flight += 1
+            self._count_admitted(ticket.tenant, ticket.priority, time.monotonic() - ticket.queued_at)
+            if ticket.loop is None:
+                ticket.future.set_result(True)
+                continue
+            try:
+                ticket.loop.call_soon_threadsafe(self._deliver, ticket.future)
+            except RuntimeError:
+                # The waiter's event loop is closed
+                self.in_flight -= 1
+    
+    def _deliver(self, future: "asyncio.Future") -> None:
+        """Wake an async waiter on its own loop, or return the slot if it gave up"""
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(True)
+    
+    def _reject(self, reason: str, tenant: str, priority: str) -> AdmissionRejected:
+        """Count a rejection and build its exception (lock held)"""
+        self._class_stats[priority]["rejected"] += 1
+        self._count_tenant(tenant, "rejected")
+        logger.warning(f"Rejected request from tenant '{tenant}' ({priority}): {reason}")
+        return AdmissionRejected(reason, tenant, priority)
+    
+    def _count_admitted(self, tenant: str, priority: str, waited: float) -> None:
+        """Count an admitted request (lock held)"""
+        counters = self._class_stats[priority]
+        counters["admitted"] += 1
+        counters["total_wait"] += waited
+        self._count_tenant(tenant, "admitted")
+    
+    def _count_tenant(self, tenant: str, counter: str) -> None:
+        """Increment a per-tenant counter (lock held)"""
+        counters = self._tenant_stats.setdefault(tenant, {"admitted": 0, "rejected": 0, "rate_limited": 0})
+        counters[counter] += 1
+
+
+class AdmittedLLM(LLMWrapper):
+    """Provider wrapper that sends every request through an AdmissionController"""
+    
+    def __init__(self,
+                 llm: BaseLLM,
+                 controller: AdmissionController,
+                 tenant: str = "default",
+                 priority: str = "interactive",
+                 max_wait: Optional[float] = None):
+        """Initialize the admission wrapper
+        
+        Args:
+            llm: Provider whose requests are admitted
+            controller: Admission controller shared by the providers of all tenants
+            tenant: Tenant the requests are accounted to
+            priority: Priority class of the requests
+            max_wait: Seconds a request may wait for admission before it is rejected
+        """
+        super().__init__(llm)
+        self.controller = controller
+        self.tenant = tenant
+        self.priority = priority
+        self.max_wait = max_wait
+    
+    def generate_response(self,
+                         messages: List[Dict[str, Any]],
+                         tools: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Generate a response once the request is admitted"""
+        try:
+            self.controller.acquire(self.tenant, self.priority, self._deadline())
+        except AdmissionRejected as e:
+            return self._rejected(e)
+        try:
+            return self.llm.generate_response(messages, tools)
+        finally:
+            self.controller.release()
+    
+    async def agenerate_response(self,
+                                 messages: List[Dict[str, Any]],
+                                 tools: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Asynchronously generate a response once the request is admitted"""
+        try:
+            await self.controller.aacquire(self.tenant, self.priority, self._deadline())
+        except AdmissionRejected as e:
+            return self._rejected(e)
+        try:
+            return await self.llm.agenerate_response(messages, tools)
+        finally:
+            self.controller.release()
+    
+    def generate_stream(self,
+                        messages: List[Dict[str, Any]],
+                        tools: Optional[List[Dict[str, Any]]] = None) -> Iterator[Dict[str, Any]]:
+        """Stream a response once the request is admitted, holding the slot until it ends"""
+        try:
+            self.controller.acquire(self.tenant, self.priority, self._deadline())
+        except AdmissionRejected as e:
+            response = self._rejected(e)
+            yield {"type": "content", "content": response["content"]}
+            yield {"type": "done", **response}
+            return
+        try:
+            yield from self.llm.generate_stream(messages, tools)
+        finally:
+            self.controller.release()
+    
+    def _deadline(self) -> Optional[float]:
+        """Compute the admission deadline of a request made now (never past the turn deadline)"""
+        turn_deadline = current_deadline()
+        if self.max_wait is None:
+            return turn_deadline
+        wait_deadline = time.monotonic() + self.max_wait
+        return wait_deadline if turn_deadline is None else min(wait_deadline, turn_deadline)
+    
+    @staticmethod
+    def _rejected(error: AdmissionRejected) -> Dict[str, Any]:
+        """Build the error response for a rejected request"""
+        return {"content": f"Error: {error}", "tool_calls": None}
@@ -0,0 +1,532 @@
+"""
+Multi-endpoint load balancing for Ollama in OpenAgents framework.
+
+BalancedOllamaLLM spreads requests over several Ollama hosts. It routes each
+conversation to the endpoint with the fewest outstanding requests and keeps
+it there while that endpoint is healthy, so the server's prompt (KV) cache
+is reused. A conversation is identified by the session id its agent binds
+(see utils.session); requests without one are not sticky. Endpoints are probed in the background; an endpoint is ejected
+after repeated failures and readmitted once it answers again.
+
+Requests can optionally be hedged: if no response arrives within a latency
+threshold, the same request is sent to a second endpoint and the first good
+answer wins. Hedged requests always run as coroutines (synchronous calls
+submit them to the shared background loop) so that the losing request can
+be cancelled instead of running to completion.
+
+Routing state lives in an EndpointPool shared by every balancing client
+created for the same set of hosts, so load is balanced across all agents in
+the process rather than per agent.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Iterator, Sequence, Tuple
+
+from openagents.llm.base import BaseLLM, is_error_response
+from openagents.llm.ollama_me import OllamaLLM, is_caller_error
+from openagents.llm.transport import HTTPTransport, get_default_transport
+from openagents.utils import session
+from openagents.utils.loop import get_background_loop
+
+logger = logging.getLogger(__name__)
+
+
+class Endpoint:
+    """One Ollama host and its routing state"""
+    
+    def __init__(self, base_url: str):
+        """Initialize the endpoint
+        
+        Args:
+            base_url: Base URL of the Ollama host
+        """
+        self.base_url = base_url
+        self.healthy = True
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.consecutive_successes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get the endpoint's routing counters
+        
+        Returns:
+            Dictionary of endpoint statistics
+        """
+        return {
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures
+        }
+
+
+class EndpointPool:
+    """Routing and health state for a set of Ollama hosts"""
+    
+    def __init__(self,
+                 base_urls: Sequence[str],
+                 transport: HTTPTransport,
+                 health_interval: Optional[float] = 10.0,
+                 eject_after: int = 3,
+                 readmit_after: int = 1,
+                 max_sessions: int = 10000):
+        """Initialize the pool
+        
+        Args:
+            base_urls: Base URLs of the Ollama hosts
+            transport: HTTP transport used for health probes
+            health_interval: Seconds between health probes (None to disable probing)
+            eject_after: Consecutive failures after which an endpoint is ejected
+            readmit_after: Consecutive successful probes after which it is readmitted
+            max_sessions: Maximum number of session-to-endpoint assignments remembered
+        """
+        if not base_urls:
+            raise ValueError("At least one base URL is required")
+        
+        self.endpoints = [Endpoint(url) for url in base_urls]
+        self.transport = transport
+        self.health_interval = health_interval
+        self.eject_after = eject_after
+        self.readmit_after = readmit_after
+        self.max_sessions = max_sessions
+        
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, Endpoint]" = OrderedDict()
+        self._stop = threading.Event()
+        
+        if health_interval is not None:
+            threading.Thread(target=self._health_loop, name="ollama-health", daemon=True).start()
+    
+    def select(self, 
+               session_key: Optional[str] = None, 
+               exclude: Sequence[Endpoint] = ()) -> Optional[Endpoint]:
+        """Choose the endpoint for a request
+        
+        A session stays on the endpoint it was first assigned to while that
+        endpoint is healthy; otherwise the healthy endpoint with the fewest
+        outstanding requests is chosen.
+        
+        Args:
+            session_key: Key identifying the conversation (None for no stickiness)
+            exclude: Endpoints that must not be chosen
+            
+        Returns:
+            The selected endpoint, or None if every healthy endpoint is excluded
+        """
+        with self._lock:
+            if session_key is not None:
+                endpoint = self._sessions.get(session_key)
+                if endpoint is not None and endpoint.healthy and endpoint not in exclude:
+                    self._sessions.move_to_end(session_key)
+                    return endpoint
+            
+            candidates = [e for e in self.endpoints if e.healthy and e not in exclude]
+            if not candidates:
+                if exclude:
+                    return None
+                # Fail open: if every endpoint is ejected, still try the least loaded one
+                candidates = self.endpoints
+            endpoint = min(candidates, key=lambda e: (e.outstanding, e.requests))
+            
+            if session_key is not None:
+                self._sessions[session_key] = endpoint
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            
+            return endpoint
+    
+    @contextmanager
+    def acquire(self, session_key: Optional[str] = None) -> Iterator[Endpoint]:
+        """Select an endpoint and track a request as outstanding on it
+        
+        Args:
+            session_key: Key identifying the conversation (None for no stickiness)
+            
+        Yields:
+            The selected endpoint
+        """
+        with self.track(self.select(session_key)) as endpoint:
+            yield endpoint
+    
+    @contextmanager
+    def track(self, endpoint: Endpoint) -> Iterator[Endpoint]:
+        """Track a request as outstanding on an endpoint
+        
+        Args:
+            endpoint: Endpoint the request is sent to
+            
+        Yields:
+            The endpoint
+        """
+        with self._lock:
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+        try:
+            yield endpoint
+        finally:
+            with self._lock:
+                endpoint.outstanding -= 1
+    
+    def record_result(self, endpoint: Endpoint, ok: bool) -> None:
+        """Update an endpoint's health after a request or probe
+        
+        Args:
+            endpoint: Endpoint the request went to
+            ok: Whether the request succeeded
+        """
+        with self._lock:
+            if ok:
+                endpoint.consecutive_failures = 0
+                return
+            endpoint.failures += 1
+            endpoint.consecutive_failures += 1
+            endpoint.consecutive_successes = 0
+            if endpoint.healthy and endpoint.consecutive_failures >= self.eject_after:
+                endpoint.healthy = False
+                logger.warning(f"Ejected Ollama endpoint {endpoint.base_url}")
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get routing statistics for every endpoint
+        
+        Returns:
+            Dictionary of endpoint statistics keyed by base URL
+        """
+        with self._lock:
+            return {endpoint.base_url: endpoint.stats() for endpoint in self.endpoints}
+    
+    def close(self) -> None:
+        """Stop the background health probes"""
+        self._stop.set()
+    
+    def probe(self, endpoint: Endpoint) -> None:
+        """Check whether an endpoint answers and update its health
+        
+        Args:
+            endpoint: Endpoint to probe
+        """
+        try:
+            response = self.transport.get(
+                f"{endpoint.base_url}/api/version",
+                timeout=(self.transport.connect_timeout, self.health_interval or 5.0)
+            )
+            ok = response.status_code == 200
+        except Exception as e:
+            logger.debug(f"Health probe of {endpoint.base_url} failed: {e}")
+            ok = False
+        
+        if not ok:
+            self.record_result(endpoint, False)
+            return
+        
+        with self._lock:
+            endpoint.consecutive_failures = 0
+            endpoint.consecutive_successes += 1
+            if not endpoint.healthy and endpoint.consecutive_successes >= self.readmit_after:
+                endpoint.healthy = True
+                logger.info(f"Readmitted Ollama endpoint {endpoint.base_url}")
+    
+    def _health_loop(self) -> None:
+        """Probe every endpoint periodically until closed"""
+        while not self._stop.wait(self.health_interval):
+            for endpoint in self.endpoints:
+                self.probe(endpoint)
+
+
+_pools: Dict[Tuple[str, ...], EndpointPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_endpoint_pool(base_urls: Sequence[str], transport: HTTPTransport, **kwargs) -> EndpointPool:
+    """Get the process-wide pool for a set of hosts, creating it on first use
+    
+    Args:
+        base_urls: Base URLs of the Ollama hosts
+        transport: HTTP transport used for health probes
+        **kwargs: EndpointPool options, used only when the pool is created
+        
+    Returns:
+        The shared endpoint pool
+    """
+    key = tuple(base_urls)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = EndpointPool(key, transport, **kwargs)
+            _pools[key] = pool
+        return pool
+
+
+class BalancedOllamaLLM(BaseLLM):
+    """LLM client that balances requests over several Ollama hosts"""
+    
+    def __init__(self,
+                 model: str,
+                 base_urls: Sequence[str] = ("http://localhost:11434",),
+                 transport: Optional[HTTPTransport] = None,
+                 health_interval: Optional[float] = 10.0,
+                 eject_after: int = 3,
+                 readmit_after: int = 1,
+                 sticky_sessions: bool = True,
+                 pool: Optional[EndpointPool] = None,
+                 hedge_after: Optional[float] = None,
+                 hedge_percentile: Optional[float] = None,
+                 hedge_min_samples: int = 20,
+                 **kwargs):
+        """Initialize the balancing client
+        
+        Args:
+            model: Name of the Ollama model to use
+            base_urls: Base URLs of the Ollama hosts
+            transport: HTTP transport shared by all endpoints (defaults to the process-wide one)
+            health_interval: Seconds between health probes (None to disable probing)
+            eject_after: Consecutive failures after which an endpoint is ejected
+            readmit_after: Consecutive successful probes after which it is readmitted
+            sticky_sessions: Whether to keep a conversation on the same endpoint
+            pool: Endpoint pool to use (defaults to the process-wide pool for base_urls)
+            hedge_after: Seconds to wait before hedging a request to a second endpoint
+                (None disables static hedging)
+            hedge_percentile: Derive the hedging threshold from this percentile of
+                observed latencies, e.g. 0.95 (falls back to hedge_after until
+                hedge_min_samples latencies have been observed)
+            hedge_min_samples: Observed latencies needed before hedge_percentile is used
+            **kwargs: Additional parameters to pass to Ollama
+        """
+        super().__init__(model, **kwargs)
+        self.transport = transport or get_default_transport()
+        self.pool = pool or get_endpoint_pool(
+            base_urls,
+            self.transport,
+            health_interval=health_interval,
+            eject_after=eject_after,
+            readmit_after=readmit_after
+        )
+        self.sticky_sessions = sticky_sessions
+        self.clients: Dict[str, OllamaLLM] = {
+            endpoint.base_url: OllamaLLM(model, base_url=endpoint.base_url, transport=self.transport, **kwargs)
+            for endpoint in self.pool.endpoints
+        }
+        
+        self.hedge_after = hedge_after
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedged_requests = 0
+        self.hedges_fired = 0
+        self.hedges_won = 0
+        self._latencies: deque = deque(maxlen=1000)
+        self._stats_lock = threading.Lock()
+    
+    def generate_response(self, 
+                         messages: List[Dict[str, Any]], 
+                         tools: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Generate a response on the selected endpoint
+        
+        Args:
+            messages: List of message objects with role and content
+            tools: Optional list of tools to make available to the model
+            
+        Returns:
+            Dictionary with the response content and any tool calls
+        """
+        primary = self.pool.select(self._session_key())
+        threshold = self.hedge_threshold()
+        if threshold is None:
+            return self._call(primary, messages, tools)
+        
+        # Race on the background loop, where the losing request can be cancelled
+        return get_background_loop().run(self._hedged(primary, threshold, messages, tools))
+    
+    async def agenerate_response(self, 
+                                 messages: List[Dict[str, Any]], 
+                                 tools: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Generate a response on the selected endpoint without blocking the event loop
+        
+        Args:
+            messages: List of message objects with role and content
+            tools: Optional list of tools to make available to the model
+            
+        Returns:
+            Dictionary with the response content and any tool calls
+        """
+        primary = self.pool.select(self._session_key())
+        threshold = self.hedge_threshold()
+        if threshold is None:
+            return await self._acall(primary, messages, tools)
+        return await self._hedged(primary, threshold, messages, tools)
+    
+    def generate_stream(self, 
+                        messages: List[Dict[str, Any]], 
+                        tools: Optional[List[Dict[str, Any]]] = None) -> Iterator[Dict[str, Any]]:
+        """Stream a response from the selected endpoint
+        
+        Args:
+            messages: List of message objects with role and content
+            tools: Optional list of tools to make available to the model
+            
+        Yields:
+            Stream events (see BaseLLM.generate_stream)
+        """
+        # Streams are not hedged
+        with self.pool.acquire(self._session_key()) as endpoint:
+            for event in self.clients[endpoint.base_url].generate_stream(messages, tools):
+                if event["type"] == "done" and not is_caller_error(event):
+                    self.pool.record_result(endpoint, not is_error_response(event))
+                yield event
+    
+    def get_tools_format(self, tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Convert tools to the format expected by Ollama
+        
+        Args:
+            tools: List of tools in the standard OpenAgents format
+            
+        Returns:
+            List of tools in the format expected by Ollama
+        """
+        return tools
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get routing statistics for every endpoint
+        
+        Returns:
+            Dictionary of endpoint statistics keyed by base URL
+        """
+        return self.pool.stats()
+    
+    def hedge_threshold(self) -> Optional[float]:
+        """Get the current hedging threshold
+        
+        Returns:
+            Seconds after which a request is hedged, or None if hedging is off
+        """
+        if self.hedge_percentile is not None:
+            with self._stats_lock:
+                latencies = sorted(self._latencies)
+            if len(latencies) >= self.hedge_min_samples:
+                index = min(len(latencies) - 1, int(self.hedge_percentile * len(latencies)))
+                return latencies[index]
+        return self.hedge_after
+    
+    def hedging_stats(self) -> Dict[str, Any]:
+        """Get statistics on how often hedges fire and win
+        
+        Returns:
+            Dictionary of hedging statistics
+        """
+        threshold = self.hedge_threshold()
+        with self._stats_lock:
+            return {
+                "hedged_requests": self.hedged_requests,
+                "hedges_fired": self.hedges_fired,
+                "hedges_won": self.hedges_won,
+                "fire_rate": self.hedges_fired / self.hedged_requests if self.hedged_requests else 0.0,
+                "win_rate": self.hedges_won / self.hedges_fired if self.hedges_fired else 0.0,
+                "threshold": threshold
+            }
+    
+    async def _hedged(self,
+                      primary: Endpoint,
+                      threshold: float,
+                      messages: List[Dict[str, Any]],
+                      tools: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Send a request, hedging it to a second endpoint if it is slower than threshold
+        
+        Returns the first good response. Requests still running when this
+        returns (or is cancelled) are cancelled, which closes their connections
+        and frees their endpoint and concurrency slots.
+        """
+        with self._stats_lock:
+            self.hedged_requests += 1
+        
+        tasks: Dict[asyncio.Future, Endpoint] = {
+            asyncio.ensure_future(self._acall(primary, messages, tools)): primary
+        }
+        try:
+            done, _ = await asyncio.wait(set(tasks), timeout=threshold)
+            
+            if not done:
+                secondary = self.pool.select(None, exclude=[primary])
+                if secondary is not None:
+                    self._record_hedge_fired(primary, secondary, threshold)
+                    tasks[asyncio.ensure_future(self._acall(secondary, messages, tools))] = secondary
+            
+            pending = set(tasks)
+            response = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    response = task.result()
+                    if not is_error_response(response):
+                        self._record_hedge_result(tasks[task] is not primary)
+                        return response
+            return response
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    def _call(self, 
+              endpoint: Endpoint, 
+              messages: List[Dict[str, Any]], 
+              tools: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Send a request to an endpoint and record its outcome"""
+        with self.pool.track(endpoint):
+            start = time.monotonic()
+            response = self.clients[endpoint.base_url].generate_response(messages, tools)
+            self._record_outcome(endpoint, response, time.monotonic() - start)
+            return response
+    
+    async def _acall(self, 
+                     endpoint: Endpoint, 
+                     messages: List[Dict[str, Any]], 
+                     tools: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Send a request to an endpoint asynchronously and record its outcome"""
+        with self.pool.track(endpoint):
+            start = time.monotonic()
+            response = await self.clients[endpoint.base_url].agenerate_response(messages, tools)
+            self._record_outcome(endpoint, response, time.monotonic() - start)
+            return response
+    
+    def _record_outcome(self, endpoint: Endpoint, response: Dict[str, Any], latency: float) -> None:
+        """Update endpoint health and the latency history after a request
+        
+        Deadline errors and 4xx rejections are the caller's doing, so they
+        leave the endpoint's health unchanged.
+        """
+        if is_caller_error(response):
+            return
+        ok = not is_error_response(response)
+        self.pool.record_result(endpoint, ok)
+        if ok:
+            with self._stats_lock:
+                self._latencies.append(latency)
+    
+    def _record_hedge_fired(self, primary: Endpoint, secondary: Endpoint, threshold: float) -> None:
+        """Count a hedge being sent"""
+        with self._stats_lock:
+            self.hedges_fired += 1
+        logger.debug(
+            f"No response from {primary.base_url} after {threshold:.2f}s, "
+            f"hedging to {secondary.base_url}"
+        )
+    
+    def _record_hedge_result(self, hedge_won: bool) -> None:
+        """Count a hedge winning the race"""
+        if hedge_won:
+            with self._stats_lock:
+                self.hedges_won += 1
+    
+    def _session_key(self) -> Optional[str]:
+        """Identify the conversation a request belongs to
+        
+        Uses the session id bound by the calling agent (see utils.session),
+        so each conversation keeps its own endpoint and the server's prompt
+        cache for it.
+        """
+        if not self.sticky_sessions:
+            return None
+        return session.current()
@@ -1,8 +1,41 @@
 """
 Base LLM client interface for OpenAgents framework.
 """
+import asyncio
+import contextvars
+import functools
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator
+
+
+def is_error_response(response: Dict[str, Any]) -> bool:
+    """Check whether a response reports a provider error
+    
+    Providers report failures as a response whose content starts with "Error:".
+    
+    Args:
+        response: Response dictionary
+        
+    Returns:
+        True if the response is an error report
+    """
+    return (response.get("content") or "").startswith("Error:")
+
+
+def response_events(response: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Convert a complete response into stream events
+    
+    Args:
+        response: Response dictionary with content and tool calls
+        
+    Yields:
+        Stream events (see BaseLLM.generate_stream)
+    """
+    if response.get("content"):
+        yield {"type": "content", "content": response["content"]}
+    for tool_call in response.get("tool_calls") or []:
+        yield {"type": "tool_call", "tool_call": tool_call}
+    yield {"type": "done", **response}
 
 
 class BaseLLM(ABC):
@@ -29,6 +62,50 @@ class BaseLLM(ABC):
         """
         pass
     
+    async def agenerate_response(self, 
+                                 messages: List[Dict[str, Any]], 
+                                 tools: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Asynchronously generate a response from the LLM
+        
+        Providers with a native async client should override this. The default
+        runs the blocking generate_response in the event loop's executor, in a
+        copy of the caller's context (so the turn deadline and tracing span
+        carry over).
+        
+        Args:
+            messages: List of message objects with role and content
+            tools: Optional list of tools in a format understood by the model
+            
+        Returns:
+            Dictionary containing the response with content and possibly tool calls
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, contextvars.copy_context().run, functools.partial(self.generate_response, messages, tools)
+        )
+    
+    def generate_stream(self, 
+                        messages: List[Dict[str, Any]], 
+                        tools: Optional[List[Dict[str, Any]]] = None) -> Iterator[Dict[str, Any]]:
+        """Generate a response from the LLM as a stream of events
+        
+        Events are dictionaries with a "type" key:
+            - {"type": "content", "content": <text delta>}
+            - {"type": "tool_call", "tool_call": <tool call>}
+            - {"type": "done", "content": <full text>, "tool_calls": <list or None>}
+        
+        Providers that support incremental output should override this. The
+        default emits the complete response from generate_response at once.
+        
+        Args:
+            messages: List of message objects with role and content
+            tools: Optional list of tools in a format understood by the model
+            
+        Yields:
+            Stream events
+        """
+        yield from response_events(self.generate_response(messages, tools))
+    
     @abstractmethod
     def get_tools_format(self, tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Convert tools to the format expected by the LLM provider
@@ -40,3 +117,48 @@ class BaseLLM(ABC):
             List of tools in the format expected by the LLM provider
         """
         pass
+
+
+class LLMWrapper(BaseLLM):
+    """Base class for providers that add behaviour around another provider
+    
+    All calls are delegated to the wrapped provider; subclasses override the
+    ones they need to intercept.
+    """
+    
+    def __init__(self, llm: BaseLLM):
+        """Initialize the wrapper
+        
+        Args:
+            llm: Provider to delegate to
+        """
+        super().__init__(llm.model, **llm.kwargs)
+        self.llm = llm
+    
+    def generate_response(self, 
+                         messages: List[Dict[str, Any]], 
+                         tools: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Generate a response using the wrapped provider"""
+        return self.llm.generate_response(messages, tools)
+    
+    async def agenerate_response(self, 
+                                 messages: List[Dict[str, Any]], 
+                                 tools: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Asynchronously generate a response using the wrapped provider"""
+        return await self.llm.agenerate_response(messages, tools)
+    
+    def generate_stream(self, 
+                        messages: List[Dict[str, Any]], 
+                        tools: Optional[List[Dict[str, Any]]] = None) -> Iterator[Dict[str, Any]]:
+        """Stream a response from the wrapped provider"""
+        return self.llm.generate_stream(messages, tools)
+    
+    def get_tools_format(self, tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Convert tools using the wrapped provider"""
+        return self.llm.get_tools_format(tools)
+    
+    def __getattr__(self, name: str) -> Any:
+        # Expose provider-specific attributes (e.g. base_url) of the wrapped provider
+        if name == "llm":
+            raise AttributeError(name)
+        return getattr(self.llm, name)
@@ -0,0 +1,349 @@
+"""
+Exact-match response caching for OpenAgents framework.
+
+Responses are keyed on a stable hash of the canonicalized request
+(model, messages, tools and provider options). Entries live in a bounded
+in-memory LRU, optionally backed by a persistent SQLite store.
+"""
+import copy
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Iterator, Tuple
+
+from openagents.llm.base import BaseLLM, LLMWrapper, is_error_response, response_events
+
+logger = logging.getLogger(__name__)
+
+
+def _canonical_message(message: Any) -> Dict[str, Any]:
+    """Reduce a message to the fields that affect the model's output"""
+    if hasattr(message, "to_dict"):
+        message = message.to_dict()
+    return {k: v for k, v in message.items() if not k.startswith("_")}
+
+
+def generation_options(options: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Get the provider options that can be part of a request key
+    
+    Only plain JSON values (temperature, num_ctx, ...) are kept. Objects
+    passed as options, such as managers or transports, would be hashed by
+    their repr, which differs between processes.
+    
+    Args:
+        options: Provider options
+    
+    Returns:
+        The JSON-serializable options
+    """
+    kept = {}
+    for name, value in (options or {}).items():
+        try:
+            json.dumps(value)
+        except (TypeError, ValueError):
+            continue
+        kept[name] = value
+    return kept
+
+
+def request_key(model: str,
+                messages: List[Any],
+                tools: Optional[List[Dict[str, Any]]] = None,
+                options: Optional[Dict[str, Any]] = None) -> str:
+    """Compute a stable hash of an LLM request
+    
+    Args:
+        model: Model name
+        messages: Conversation messages
+        tools: Tool schemas sent with the request
+        options: Provider options that affect generation
+    
+    Returns:
+        Hex digest identifying the request
+    """
+    canonical = {
+        "model": model,
+        "messages": [_canonical_message(m) for m in messages],
+        "tools": tools or [],
+        "options": options or {}
+    }
+    encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Two-tier response cache: in-memory LRU over an optional SQLite store"""
+    
+    def __init__(self,
+                 max_entries: int = 1024,
+                 ttl: Optional[float] = None,
+                 path: Optional[str] = None,
+                 max_disk_bytes: Optional[int] = 256 * 1024 * 1024):
+        """Initialize the cache
+        
+        Args:
+            max_entries: Maximum number of entries kept in memory
+            ttl: Seconds an entry stays valid (None for no expiry)
+            path: SQLite database file for the persistent tier (None for memory only)
+            max_disk_bytes: Size limit of the persistent tier; least recently used
+                entries are evicted first (None for no limit)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.max_disk_bytes = max_disk_bytes
+        
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        self._memory: "OrderedDict[str, Tuple[Optional[float], Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._disk_bytes = 0
+        
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "expires_at REAL, accessed_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS responses_expires ON responses (expires_at)"
+            )
+            self._db.commit()
+            # Kept up to date on every write, so puts never have to scan the table
+            self._disk_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached response
+        
+        Args:
+            key: Request key from request_key
+        
+        Returns:
+            A copy of the cached response (callers may modify it), or None on a miss
+        """
+        now = time.time()
+        
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    self.memory_hits += 1
+                    return copy.deepcopy(value)
+                del self._memory[key]
+            
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires_at, size FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value_json, expires_at, size = row
+                    if expires_at is None or expires_at > now:
+                        self._db.execute(
+                            "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+                        )
+                        self._db.commit()
+                        value = json.loads(value_json)
+                        self._remember(key, expires_at, value)
+                        self.hits += 1
+                        self.disk_hits += 1
+                        return copy.deepcopy(value)
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+                    self._disk_bytes -= size
+            
+            self.misses += 1
+            return None
+    
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a response
+        
+        Args:
+            key: Request key from request_key
+            value: Response to cache
+        """
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl is not None else None
+        
+        # Keep a private copy so later changes by the caller don't reach the cache
+        value = copy.deepcopy(value)
+        
+        with self._lock:
+            self._remember(key, expires_at, value)
+            
+            if self._db is not None:
+                value_json = json.dumps(value)
+                row = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._disk_bytes -= row[0]
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, size, expires_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, value_json, len(value_json), expires_at, now)
+                )
+                self._disk_bytes += len(value_json)
+                self._prune_disk(now)
+                self._db.commit()
+    
+    def clear(self) -> None:
+        """Remove every entry from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+                self._disk_bytes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters
+        
+        Returns:
+            Dictionary of cache statistics
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "memory_entries": len(self._memory)
+        }
+    
+    def close(self) -> None:
+        """Close the persistent store"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+    
+    def _remember(self, key: str, expires_at: Optional[float], value: Dict[str, Any]) -> None:
+        """Insert into the memory tier, evicting the least recently used entry"""
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+    
+    def _prune_disk(self, now: float) -> None:
+        """Drop expired entries and enforce the size limit of the persistent tier
+        
+        Both use an index, so the cost is proportional to the entries removed
+        rather than to the size of the table.
+        """
+        expired = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses WHERE expires_at <= ?", (now,)
+        ).fetchone()[0]
+        if expired:
+            self._db.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+            self._disk_bytes -= expired
+        if self.max_disk_bytes is None:
+            return
+        
+        while self._disk_bytes > self.max_disk_bytes:
+            rows = self._db.execute(
+                "SELECT key, size FROM responses ORDER BY accessed_at ASC LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self._disk_bytes = 0
+                return
+            for key, size in rows:
+                if self._disk_bytes <= self.max_disk_bytes:
+                    break
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._disk_bytes -= size
+                self.evictions += 1
+
+
+class CachedLLM(LLMWrapper):
+    """Provider wrapper that serves repeated requests from a ResponseCache"""
+    
+    def __init__(self, llm: BaseLLM, cache: Optional[ResponseCache] = None):
+        """Initialize the caching wrapper
+        
+        Args:
+            llm: Provider to cache responses for
+            cache: Cache to use (a new in-memory cache if not given)
+        """
+        super().__init__(llm)
+        self.cache = cache or ResponseCache()
+    
+    def generate_response(self,
+                         messages: List[Dict[str, Any]],
+                         tools: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Generate a response, reusing a cached one for identical requests"""
+        key = self._key(messages, tools)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        response = self.llm.generate_response(messages, tools)
+        if self._is_cacheable(response):
+            self.cache.put(key, self._cache_value(response))
+        return response
+    
+    async def agenerate_response(self,
+                                 messages: List[Dict[str, Any]],
+                                 tools: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Asynchronously generate a response, reusing a cached one for identical requests"""
+        key = self._key(messages, tools)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        response = await self.llm.agenerate_response(messages, tools)
+        if self._is_cacheable(response):
+            self.cache.put(key, self._cache_value(response))
+        return response
+    
+    def generate_stream(self,
+                        messages: List[Dict[str, Any]],
+                        tools: Optional[List[Dict[str, Any]]] = None) -> Iterator[Dict[str, Any]]:
+        """Stream a response, replaying a cached one for identical requests"""
+        key = self._key(messages, tools)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield from response_events(cached)
+            return
+        
+        for event in self.llm.generate_stream(messages, tools):
+            if event["type"] == "done":
+                response = {k: v for k, v in event.items() if k != "type"}
+                if self._is_cacheable(response):
+                    self.cache.put(key, self._cache_value(response))
+            yield event
+    
+    def _key(self,
+             messages: List[Dict[str, Any]],
+             tools: Optional[List[Dict[str, Any]]]) -> str:
+        """Compute the cache key for a request to the wrapped provider"""
+        return request_key(self.model, messages, tools, generation_options(self.kwargs))
+    
+    @staticmethod
+    def _cache_value(response: Dict[str, Any]) -> Dict[str, Any]:
+        """Get the part of a response that is cached
+        
+        Usage describes the upstream call that produced the response, so it
+        is not replayed on cache hits (they cost the server nothing).
+        """
+        return {k: v for k, v in response.items() if k != "usage"}
+    
+    def _is_cacheable(self, response: Dict[str, Any]) -> bool:
+        """Whether a response may be cached (provider errors are not)"""
+        return not is_error_response(response)
@@ -0,0 +1,225 @@
+"""
+Request coalescing for OpenAgents framework.
+
+When identical requests are in flight at the same time (e.g. many workers
+starting the same agent with the same first question), only one of them is
+sent upstream and every caller receives its result. Works for thread-based
+and asyncio callers alike, including a mix of both.
+"""
+import asyncio
+import copy
+import logging
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Any, Awaitable, Callable, Optional, Set, Tuple
+
+from openagents.llm.base import BaseLLM, LLMWrapper
+from openagents.llm.cache import request_key
+from openagents.llm.ollama_me import DEADLINE_ERROR, is_deadline_error
+from openagents.utils import deadline
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls that share a key"""
+    
+    def __init__(self):
+        """Initialize the group"""
+        self.leaders = 0
+        self.coalesced = 0
+        self._inflight: Dict[str, Future] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+    
+    def do(self, key: str, fn: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """Run fn, or wait for the identical call already in flight
+        
+        Args:
+            key: Key identifying the call
+            fn: Function producing the result
+            timeout: Seconds to wait for a call in flight (None to wait until it finishes)
+        
+        Returns:
+            The result of the single upstream call
+        
+        Raises:
+            TimeoutError: If the call in flight did not finish within timeout
+        """
+        future, leader = self._join(key)
+        if leader:
+            self._run(key, future, fn)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            if future.done():
+                raise
+            raise TimeoutError(f"Identical call still in flight after {timeout:.3g}s")
+    
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Any]], timeout: Optional[float] = None) -> Any:
+        """Await fn(), or wait for the identical call already in flight
+        
+        The upstream call runs in its own task, so cancelling one waiter
+        (even the one that started it) or timing it out does not cancel it
+        for the others.
+        
+        Args:
+            key: Key identifying the call
+            fn: Coroutine function producing the result
+            timeout: Seconds to wait for the call (None to wait until it finishes)
+        
+        Returns:
+            The result of the single upstream call
+        
+        Raises:
+            TimeoutError: If the call did not finish within timeout
+        """
+        future, leader = self._join(key)
+        if leader:
+            # Keep a reference so the task is not garbage-collected while it runs
+            task = asyncio.ensure_future(self._arun(key, future, fn))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        try:
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+        except asyncio.TimeoutError:
+            if future.done():
+                raise
+            raise TimeoutError(f"Identical call still in flight after {timeout:.3g}s")
+    
+    def stats(self) -> Dict[str, int]:
+        """Get coalescing counters
+        
+        Returns:
+            Dictionary with upstream calls made and calls that were coalesced
+        """
+        return {
+            "upstream_calls": self.leaders,
+            "coalesced_calls": self.coalesced,
+            "in_flight": len(self._inflight)
+        }
+    
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        """Get the in-flight future for key, creating it if this caller leads"""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._inflight[key] = future
+            self.leaders += 1
+            return future, True
+    
+    def _finish(self, key: str) -> None:
+        """Stop sharing the call, so later requests go upstream again"""
+        with self._lock:
+            self._inflight.pop(key, None)
+    
+    def _run(self, key: str, future: Future, fn: Callable[[], Any]) -> None:
+        """Run a synchronous upstream call and publish its outcome"""
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key)
+            future.set_exception(e)
+            return
+        self._finish(key)
+        future.set_result(result)
+    
+    async def _arun(self, key: str, future: Future, fn: Callable[[], Awaitable[Any]]) -> None:
+        """Await an asynchronous upstream call and publish its outcome"""
+        try:
+            result = await fn()
+        except BaseException as e:
+            self._finish(key)
+            future.set_exception(e)
+            return
+        self._finish(key)
+        future.set_result(result)
+
+
+_default_group = SingleFlight()
+
+
+class CoalescingLLM(LLMWrapper):
+    """Provider wrapper that shares one upstream call between identical in-flight requests"""
+    
+    def __init__(self, llm: BaseLLM, group: Optional[SingleFlight] = None):
+        """Initialize the coalescing wrapper
+        
+        Args:
+            llm: Provider whose requests are coalesced
+            group: Group of in-flight calls to join (defaults to the process-wide group,
+                so requests coalesce across every agent in the process)
+        """
+        super().__init__(llm)
+        self.group = group or _default_group
+    
+    def generate_response(self,
+                         messages: List[Dict[str, Any]],
+                         tools: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Generate a response, sharing the call with identical in-flight requests
+        
+        A caller stops waiting for a shared call at its own turn deadline. If
+        the shared call was cut short by the deadline of the caller that made
+        it, the others still within their own deadline make the call themselves.
+        """
+        led = False
+        
+        def call() -> Dict[str, Any]:
+            nonlocal led
+            led = True
+            return self.llm.generate_response(messages, tools)
+        
+        try:
+            result = self.group.do(self._key(messages, tools), call, deadline.remaining())
+        except TimeoutError:
+            return dict(DEADLINE_ERROR)
+        if not led and is_deadline_error(result) and not deadline.expired():
+            return self.llm.generate_response(messages, tools)
+        return self._copy(result, led)
+    
+    async def agenerate_response(self,
+                                 messages: List[Dict[str, Any]],
+                                 tools: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Asynchronously generate a response, sharing the call with identical in-flight requests
+        
+        A caller stops waiting for a shared call at its own turn deadline. If
+        the shared call was cut short by the deadline of the caller that made
+        it, the others still within their own deadline make the call themselves.
+        """
+        led = False
+        
+        def call() -> Awaitable[Dict[str, Any]]:
+            nonlocal led
+            led = True
+            return self.llm.agenerate_response(messages, tools)
+        
+        try:
+            result = await self.group.ado(self._key(messages, tools), call, deadline.remaining())
+        except TimeoutError:
+            return dict(DEADLINE_ERROR)
+        if not led and is_deadline_error(result) and not deadline.expired():
+            return await self.llm.agenerate_response(messages, tools)
+        return self._copy(result, led)
+    
+    @staticmethod
+    def _copy(result: Dict[str, Any], led: bool) -> Dict[str, Any]:
+        """Give each caller its own (deep) copy of the shared response
+        
+        Only the caller that made the upstream call keeps its usage, so the
+        request is not accounted once per coalesced caller.
+        """
+        return copy.deepcopy({k: v for k, v in result.items() if led or k != "usage"})
+    
+    def _key(self,
+             messages: List[Dict[str, Any]],
+             tools: Optional[List[Dict[str, Any]]]) -> str:
+        """Compute the coalescing key, including which upstream serves the request"""
+        upstream = {
+            "provider": type(self.llm).__name__,
+            "base_url": getattr(self.llm, "base_url", None),
+            "options": self.kwargs
+        }
+        return request_key(self.model, messages, tools, upstream)
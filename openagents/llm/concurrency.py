@@ -0,0 +1,312 @@
+"""
+Adaptive concurrency limiting for OpenAgents framework.
+
+How many requests an Ollama server handles well at once depends on
+OLLAMA_NUM_PARALLEL, the model and the hardware. An AdaptiveConcurrencyLimiter
+caps the requests in flight to one backend and tunes that cap with AIMD
+(additive increase, multiplicative decrease):
+
+- while requests complete without signs of contention and the limit is in
+  use, the limit grows by about one per window of requests;
+- when Ollama's per-token prompt or generation time rises well above its
+  observed baseline (requests are sharing the GPU), when most of a request's
+  latency is spent outside prompt evaluation and generation (it waited in the
+  server's queue), or when a request fails, the limit is cut by a factor,
+  at most once per window.
+
+Requests over the limit wait in a FIFO queue, so the backend runs near its
+real capacity instead of queueing (or timing out) on the server.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _Waiter:
+    """A request queued for a slot, from a thread or from an event loop"""
+    
+    __slots__ = ("future", "loop", "queued_at")
+    
+    def __init__(self, future: Any, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Initialize the waiter
+        
+        Args:
+            future: Future resolved when the slot is granted
+            loop: Event loop of an async waiter (None for a thread)
+        """
+        self.future = future
+        self.loop = loop
+        self.queued_at = time.monotonic()
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD limit on the requests in flight to one backend"""
+    
+    def __init__(self,
+                 initial_limit: int = 4,
+                 min_limit: int = 1,
+                 max_limit: int = 64,
+                 backoff_ratio: float = 0.7,
+                 latency_tolerance: float = 2.0,
+                 queue_tolerance: float = 0.5,
+                 baseline_drift: float = 0.01):
+        """Initialize the limiter
+        
+        Args:
+            initial_limit: Requests allowed in flight at the start
+            min_limit: Lowest the limit may fall
+            max_limit: Highest the limit may grow
+            backoff_ratio: Factor the limit is multiplied by on contention
+            latency_tolerance: Ratio of per-token time to its baseline above which
+                the backend counts as contended
+            queue_tolerance: Fraction of a request's latency spent outside prompt
+                evaluation and generation above which it counts as queued
+            baseline_drift: Relative amount the per-token baselines rise per request,
+                so they follow the backend when it gets permanently slower
+        """
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("Limits must satisfy 1 <= min_limit <= initial_limit <= max_limit")
+        
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self.queue_tolerance = queue_tolerance
+        self.baseline_drift = baseline_drift
+        
+        self.in_flight = 0
+        self.increases = 0
+        self.decreases = 0
+        self.failures = 0
+        self.completed = 0
+        self.total_queued = 0
+        self.peak_queued = 0
+        self.total_wait = 0.0
+        
+        self._baselines: Dict[str, float] = {}
+        self._last_decrease = 0.0
+        self._waiters: "deque[_Waiter]" = deque()
+        self._lock = threading.Lock()
+    
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Take a slot, waiting in the queue while the backend is at its limit
+        
+        Args:
+            timeout: Seconds to wait for a slot (None to wait indefinitely)
+        
+        Returns:
+            True if a slot was taken, False on timeout
+        """
+        with self._lock:
+            if self._try_take():
+                return True
+            waiter = _Waiter(Future())
+            self._enqueue(waiter)
+        
+        try:
+            waiter.future.result(timeout)
+            return True
+        except FutureTimeoutError:
+            pass
+        
+        with self._lock:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+                return False
+        # The slot was granted while timing out
+        return True
+    
+    async def aacquire(self) -> None:
+        """Take a slot without blocking the event loop
+        
+        Cancelling the awaiting task gives up its place in the queue (or its
+        slot, if one was granted meanwhile).
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._try_take():
+                return
+            waiter = _Waiter(loop.create_future(), loop)
+            self._enqueue(waiter)
+        
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    raise
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted, but cancelled before the task resumed
+                self.release()
+            # Otherwise the granted slot is handed back by _deliver
+            raise
+    
+    def release(self,
+                latency: Optional[float] = None,
+                response_data: Optional[Dict[str, Any]] = None,
+                failed: bool = False) -> None:
+        """Return a slot and adapt the limit to what the request observed
+        
+        Args:
+            latency: Client-observed request latency in seconds (None if the
+                request was abandoned, which leaves the limit unchanged)
+            response_data: Decoded Ollama response with its timing fields
+            failed: Whether the request failed (connection error, timeout, 5xx)
+        """
+        with self._lock:
+            self.in_flight -= 1
+            if failed:
+                self.failures += 1
+                self._decrease(latency or 0.0, "request failed")
+            elif latency is not None:
+                self.completed += 1
+                self._adapt(latency, response_data or {})
+            self._grant()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get the limiter's state and counters
+        
+        Returns:
+            Dictionary of limiter statistics
+        """
+        with self._lock:
+            return {
+                "limit": self._effective_limit(),
+                "in_flight": self.in_flight,
+                "queued": len(self._waiters),
+                "peak_queued": self.peak_queued,
+                "total_queued": self.total_queued,
+                "mean_queue_wait_ms": 1000 * self.total_wait / self.total_queued if self.total_queued else 0.0,
+                "completed": self.completed,
+                "failures": self.failures,
+                "increases": self.increases,
+                "decreases": self.decreases
+            }
+    
+    def _effective_limit(self) -> int:
+        """Whole number of requests currently allowed in flight"""
+        return max(self.min_limit, int(self.limit))
+    
+    def _try_take(self) -> bool:
+        """Take a slot if one is free and nobody is queued (lock held)"""
+        if not self._waiters and self.in_flight < self._effective_limit():
+            self.in_flight += 1
+            return True
+        return False
+    
+    def _enqueue(self, waiter: _Waiter) -> None:
+        """Queue a waiter (lock held)"""
+        self._waiters.append(waiter)
+        self.total_queued += 1
+        self.peak_queued = max(self.peak_queued, len(self._waiters))
+    
+    def _grant(self) -> None:
+        """Hand free slots to queued waiters in arrival order (lock held)"""
+        while self._waiters and self.in_flight < self._effective_limit():
+            waiter = self._waiters.popleft()
+            self.in_flight += 1
+            self.total_wait += time.monotonic() - waiter.queued_at
+            if waiter.loop is None:
+                waiter.future.set_result(True)
+                continue
+            try:
+                waiter.loop.call_soon_threadsafe(self._deliver, waiter.future)
+            except RuntimeError:
+                # The waiter's event loop is closed
+                self.in_flight -= 1
+    
+    def _deliver(self, future: "asyncio.Future") -> None:
+        """Wake an async waiter on its own loop, or return the slot if it gave up"""
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(True)
+    
+    def _adapt(self, latency: float, response_data: Dict[str, Any]) -> None:
+        """Apply AIMD to a successful request (lock held)"""
+        prompt_eval = response_data.get("prompt_eval_duration", 0) / 1e9
+        generation = response_data.get("eval_duration", 0) / 1e9
+        
+        contention = max(
+            self._per_token_ratio("prompt_eval", prompt_eval, response_data.get("prompt_eval_count", 0)),
+            self._per_token_ratio("eval", generation, response_data.get("eval_count", 0))
+        )
+        if contention > self.latency_tolerance:
+            self._decrease(latency, f"per-token time {contention:.1f}x baseline")
+            return
+        
+        # Time outside prompt evaluation and generation, above its usual
+        # overhead (network, load), was spent queued. Without Ollama timings
+        # there is no way to tell queueing from work.
+        compute = prompt_eval + generation
+        if compute > 0 and latency > 0:
+            overhead = max(0.0, latency - compute)
+            queued = overhead - self._track("overhead", overhead)
+            if queued / latency > self.queue_tolerance:
+                self._decrease(latency, f"{queued:.2f}s of {latency:.2f}s spent queued")
+                return
+        
+        # Only grow a limit that is actually being used
+        if self._waiters or self.in_flight + 1 >= self._effective_limit():
+            if self.limit < self.max_limit:
+                before = self._effective_limit()
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+                if self._effective_limit() > before:
+                    self.increases += 1
+                    logger.debug(f"Concurrency limit raised to {self._effective_limit()}")
+    
+    def _per_token_ratio(self, series: str, seconds: float, tokens: int) -> float:
+        """Compare a request's per-token time with the series' baseline (lock held)"""
+        if seconds <= 0 or tokens <= 0:
+            return 0.0
+        per_token = seconds / tokens
+        return per_token / self._track(series, per_token)
+    
+    def _track(self, series: str, value: float) -> float:
+        """Update a series' slowly drifting minimum and return its previous value (lock held)"""
+        baseline = self._baselines.get(series)
+        if baseline is None:
+            baseline = value
+        self._baselines[series] = min(value, baseline * (1 + self.baseline_drift))
+        return baseline
+    
+    def _decrease(self, latency: float, reason: str) -> None:
+        """Cut the limit, at most once per window of in-flight requests (lock held)"""
+        now = time.monotonic()
+        if self.limit <= self.min_limit or now - latency < self._last_decrease:
+            # The request was already in flight at the last decrease
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.min_limit), self.limit * self.backoff_ratio)
+        self.decreases += 1
+        logger.debug(f"Concurrency limit lowered to {self._effective_limit()} ({reason})")
+
+
+_limiters: Dict[str, AdaptiveConcurrencyLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_concurrency_limiter(base_url: str, **kwargs) -> AdaptiveConcurrencyLimiter:
+    """Get the process-wide limiter for a backend, creating it on first use
+    
+    Args:
+        base_url: Base URL of the backend
+        **kwargs: AdaptiveConcurrencyLimiter options, used only when the limiter is created
+    
+    Returns:
+        The shared limiter
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(base_url)
+        if limiter is None:
+            limiter = AdaptiveConcurrencyLimiter(**kwargs)
+            _limiters[base_url] = limiter
+        return limiter
@@ -1,13 +1,22 @@
 """
 Ollama integration for OpenAgents framework.
 """
+import asyncio
 import json
+import re
+import time
 import requests
-from typing import Dict, List, Any, Optional
+import httpx
+from typing import Dict, List, Any, Optional, Iterator, Tuple
 import logging
 
 from ollama import chat
 from openagents.llm.base import BaseLLM
+from openagents.llm.concurrency import AdaptiveConcurrencyLimiter, get_concurrency_limiter
+from openagents.llm.residency import KeepAlive, ModelResidencyManager
+from openagents.llm.transport import HTTPTransport, get_default_transport
+from openagents.llm.usage import Usage
+from openagents.utils import deadline, tracing
 
 # Example API usage
 # $ curl http://localhost:11434/api/generate -d '{
@@ -18,20 +27,96 @@ from openagents.llm.base import BaseLLM
 
 logger = logging.getLogger(__name__)
 
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+DEADLINE_ERROR = {"content": "Error: Turn deadline exceeded", "tool_calls": None}
+
+
+def is_deadline_error(response: Dict[str, Any]) -> bool:
+    """Whether a response is the error returned for a request cut short by the caller's turn deadline
+    
+    Args:
+        response: Response dictionary
+    
+    Returns:
+        True for DEADLINE_ERROR responses
+    """
+    return response.get("content") == DEADLINE_ERROR["content"]
+
+
+# Error content of a 4xx response, as worded by requests and by httpx
+_CLIENT_ERROR = re.compile(r"^Error: (\d{3} Client Error|Client error '\d{3})")
+
+
+def is_caller_error(response: Dict[str, Any]) -> bool:
+    """Whether an error response was caused by the caller rather than the server
+    
+    Covers requests cut short by the turn deadline and requests the server
+    rejected with a 4xx status; neither says anything about the server's health.
+    
+    Args:
+        response: Response dictionary
+    
+    Returns:
+        True for deadline errors and 4xx rejections
+    """
+    return is_deadline_error(response) or bool(_CLIENT_ERROR.match(response.get("content") or ""))
+
+
+def is_server_failure(error: BaseException) -> bool:
+    """Whether a request error points at an overloaded or unreachable server
+    
+    Connection errors, timeouts and 5xx responses count; 4xx responses and
+    other client-side errors (bad URLs, invalid payloads) do not, and neither
+    does a timeout cut short by the caller's turn deadline.
+    
+    Args:
+        error: Exception that ended the request
+    
+    Returns:
+        True if the error should count against the server
+    """
+    if isinstance(error, (requests.exceptions.HTTPError, httpx.HTTPStatusError)):
+        return error.response is not None and error.response.status_code >= 500
+    if isinstance(error, (requests.exceptions.Timeout, httpx.TimeoutException)):
+        return not deadline.expired()
+    return isinstance(error, (requests.exceptions.ConnectionError, httpx.TransportError))
+
 
 class OllamaLLM(BaseLLM):
     """LLM client for Ollama"""    
-    def __init__(self, model: str, base_url: str = "http://localhost:11434", **kwargs):
+    def __init__(self, 
+                 model: str, 
+                 base_url: str = "http://localhost:11434", 
+                 transport: Optional[HTTPTransport] = None,
+                 keep_alive: Optional[KeepAlive] = None,
+                 residency: Optional[ModelResidencyManager] = None,
+                 adaptive_concurrency: bool = False,
+                 concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+                 **kwargs):
         """Initialize the Ollama LLM client
         
         Args:
             model: Name of the Ollama model to use (e.g., "llama3.2", "deepseek-r1:7b",  "mistral", "phi")
             base_url: Base URL for the Ollama API
+            transport: HTTP transport to use (defaults to the process-wide shared transport)
+            keep_alive: How long Ollama keeps the model loaded after a request (e.g. "30m")
+            residency: Optional residency manager that sets keep_alive and tracks
+                cold/warm latency for this model
+            adaptive_concurrency: Limit requests in flight to this server with the
+                process-wide adaptive limiter for base_url
+            concurrency_limiter: Explicit limiter to use instead (overrides adaptive_concurrency)
             **kwargs: Additional parameters to pass to Ollama
         """
         super().__init__(model, **kwargs)
         self.base_url = base_url
         self.chat_endpoint = f"{base_url}/api/chat"
+        self.transport = transport or get_default_transport()
+        self.keep_alive = keep_alive
+        self.residency = residency
+        if concurrency_limiter is None and adaptive_concurrency:
+            concurrency_limiter = get_concurrency_limiter(base_url)
+        self.concurrency_limiter = concurrency_limiter
         
     def generate_response(self, 
                          messages: List[Dict[str, Any]], 
@@ -45,51 +130,381 @@ class OllamaLLM(BaseLLM):
         Returns:
             Dictionary with the response content and any tool calls
         """
-        # Prepare the API call
+        with tracing.span("llm.chat", model=self.model, base_url=self.base_url,
+                          messages=len(messages), tools=len(tools or ())) as span:
+            body = self._encode_request(messages, tools)
+            if deadline.expired():
+                span.set_error("deadline exceeded")
+                return dict(DEADLINE_ERROR)
+            if self.concurrency_limiter is not None:
+                if not self.concurrency_limiter.acquire(deadline.remaining()):
+                    span.set_error("deadline exceeded")
+                    return dict(DEADLINE_ERROR)
+            start = time.monotonic()
+            outcome = None
+            
+            try:
+                # Make the API call to Ollama
+                response = self.transport.post(self.chat_endpoint, data=body, headers=JSON_HEADERS,
+                                               **self._timeout_kwargs())
+                response.raise_for_status()
+                outcome = response_data = response.json()
+                self._observe(response_data, time.monotonic() - start)
+                return self._parse_response(response_data, tools)
+                
+            except requests.exceptions.RequestException as e:
+                span.set_error(e)
+                if deadline.expired():
+                    # Cut short by the turn deadline, not a backend failure
+                    logger.warning(f"Ollama request stopped at the turn deadline: {e}")
+                    return dict(DEADLINE_ERROR)
+                outcome = e
+                logger.error(f"Error calling Ollama API: {e}")
+                return {"content": f"Error: {str(e)}", "tool_calls": None}
+            except Exception as e:
+                outcome = e
+                span.set_error(e)
+                logger.error(f"Unexpected error: {e}")
+                return {"content": f"Error: {str(e)}", "tool_calls": None}
+            finally:
+                self._release_slot(start, outcome)
+    
+    async def agenerate_response(self, 
+                                 messages: List[Dict[str, Any]], 
+                                 tools: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Generate a response using Ollama without blocking the event loop
+        
+        Args:
+            messages: List of message objects with role and content
+            tools: Optional list of tools to make available to the model
+            
+        Returns:
+            Dictionary with the response content and any tool calls
+        """
+        with tracing.span("llm.chat", model=self.model, base_url=self.base_url,
+                          messages=len(messages), tools=len(tools or ())) as span:
+            body = self._encode_request(messages, tools)
+            if deadline.expired():
+                span.set_error("deadline exceeded")
+                return dict(DEADLINE_ERROR)
+            if self.concurrency_limiter is not None:
+                try:
+                    await asyncio.wait_for(self.concurrency_limiter.aacquire(), deadline.remaining())
+                except asyncio.TimeoutError:
+                    span.set_error("deadline exceeded")
+                    return dict(DEADLINE_ERROR)
+            start = time.monotonic()
+            outcome = None
+            
+            try:
+                response = await asyncio.wait_for(
+                    self.transport.apost(self.chat_endpoint, content=body, headers=JSON_HEADERS),
+                    deadline.remaining()
+                )
+                response.raise_for_status()
+                outcome = response_data = response.json()
+                self._observe(response_data, time.monotonic() - start, block=False)
+                return self._parse_response(response_data, tools)
+                
+            except asyncio.TimeoutError:
+                # Cancelled at the turn deadline, not a backend failure
+                span.set_error("deadline exceeded")
+                logger.warning("Ollama request stopped at the turn deadline")
+                return dict(DEADLINE_ERROR)
+            except httpx.HTTPError as e:
+                outcome = e
+                span.set_error(e)
+                logger.error(f"Error calling Ollama API: {e}")
+                return {"content": f"Error: {str(e)}", "tool_calls": None}
+            except Exception as e:
+                outcome = e
+                span.set_error(e)
+                logger.error(f"Unexpected error: {e}")
+                return {"content": f"Error: {str(e)}", "tool_calls": None}
+            finally:
+                self._release_slot(start, outcome)
+    
+    def generate_stream(self, 
+                        messages: List[Dict[str, Any]], 
+                        tools: Optional[List[Dict[str, Any]]] = None) -> Iterator[Dict[str, Any]]:
+        """Generate a response using Ollama, yielding chunks as they arrive
+        
+        Ollama streams newline-delimited JSON objects; each one is decoded as
+        soon as its line is complete.
+        
+        Args:
+            messages: List of message objects with role and content
+            tools: Optional list of tools to make available to the model
+            
+        Yields:
+            Stream events (see BaseLLM.generate_stream)
+        """
+        with tracing.span("llm.chat", model=self.model, base_url=self.base_url,
+                          messages=len(messages), tools=len(tools or ()), stream=True) as span:
+            body = self._encode_request(messages, tools, stream=True)
+            content_parts: List[str] = []
+            tool_calls: List[Dict[str, Any]] = []
+            usage = None
+            if deadline.expired() or (self.concurrency_limiter is not None
+                                      and not self.concurrency_limiter.acquire(deadline.remaining())):
+                span.set_error("deadline exceeded")
+                yield {"type": "content", "content": DEADLINE_ERROR["content"]}
+                yield {"type": "done", "content": DEADLINE_ERROR["content"], "tool_calls": None}
+                return
+            start = time.monotonic()
+            outcome = None
+            
+            try:
+                with self.transport.post(self.chat_endpoint, data=body, headers=JSON_HEADERS, stream=True,
+                                         **self._timeout_kwargs()) as response:
+                    response.raise_for_status()
+                    
+                    for line in response.iter_lines(chunk_size=None):
+                        if not line:
+                            continue
+                        chunk = json.loads(line)
+                        message = chunk.get("message", {})
+                        
+                        delta = message.get("content")
+                        if delta:
+                            content_parts.append(delta)
+                            yield {"type": "content", "content": delta}
+                        
+                        if tools and message.get("tool_calls"):
+                            for tool_call in self._parse_tool_calls(message["tool_calls"]):
+                                tool_calls.append(tool_call)
+                                yield {"type": "tool_call", "tool_call": tool_call}
+                        
+                        if chunk.get("done"):
+                            outcome = chunk
+                            usage = Usage.from_ollama(chunk).to_dict()
+                            self._observe(chunk, time.monotonic() - start)
+                            break
+                        
+                        if deadline.expired():
+                            raise TimeoutError("Turn deadline exceeded")
+                            
+            except TimeoutError as e:
+                # Stopped at the turn deadline: the slot is released as abandoned
+                outcome = e
+                span.set_error("deadline exceeded")
+                logger.warning("Ollama stream stopped at the turn deadline")
+                content_parts = [DEADLINE_ERROR["content"]]
+            except requests.exceptions.RequestException as e:
+                span.set_error(e)
+                if deadline.expired():
+                    logger.warning(f"Ollama stream stopped at the turn deadline: {e}")
+                    outcome = TimeoutError(str(e))
+                    content_parts = [DEADLINE_ERROR["content"]]
+                else:
+                    outcome = e
+                    logger.error(f"Error calling Ollama API: {e}")
+                    content_parts = [f"Error: {str(e)}"]
+            except Exception as e:
+                outcome = e
+                span.set_error(e)
+                logger.error(f"Unexpected error: {e}")
+                content_parts = [f"Error: {str(e)}"]
+            finally:
+                # Also runs when the consumer stops iterating early
+                self._release_slot(start, outcome)
+            
+            if isinstance(outcome, Exception):
+                yield {"type": "content", "content": content_parts[0]}
+            
+            done = {
+                "type": "done",
+                "content": "".join(content_parts),
+                "tool_calls": tool_calls or None
+            }
+            if usage is not None:
+                done["usage"] = usage
+            yield done
+    
+    def _timeout_kwargs(self) -> Dict[str, Tuple[float, Optional[float]]]:
+        """Request timeout capped to the turn deadline (empty to use the transport's)"""
+        left = deadline.remaining()
+        if left is None:
+            return {}
+        # requests rejects a zero timeout; a nearly spent budget fails fast instead
+        left = max(left, 0.001)
+        read_timeout = self.transport.read_timeout
+        return {"timeout": (
+            min(self.transport.connect_timeout, left),
+            left if read_timeout is None else min(read_timeout, left)
+        )}
+    
+    def _observe(self, response_data: Dict[str, Any], latency: float, block: bool = True) -> None:
+        """Record a completed request
+        
+        Args:
+            response_data: Decoded Ollama response (the final chunk when streaming)
+            latency: Client-observed request latency in seconds
+            block: Whether blocking follow-up work (a residency refresh) may run
+                in the caller's thread; False on the event loop
+        """
+        if self.residency is not None:
+            self.residency.record_request(self.model, latency, response_data, block=block, base_url=self.base_url)
+        
+        span = tracing.current_span()
+        if span is not None and span.name == "llm.chat":
+            for key in ("prompt_eval_count", "eval_count", "load_duration", "prompt_eval_duration", "eval_duration"):
+                if key in response_data:
+                    span.set_attribute(key, response_data[key])
+    
+    def _release_slot(self, start: float, outcome: Any) -> None:
+        """Return the request's concurrency slot, reporting how it went
+        
+        Args:
+            start: Monotonic time the request was sent
+            outcome: Decoded response, the exception that ended the request, or
+                None if the request was abandoned (e.g. a cancelled hedge)
+        """
+        if self.concurrency_limiter is None:
+            return
+        latency = time.monotonic() - start
+        if isinstance(outcome, dict):
+            self.concurrency_limiter.release(latency, outcome)
+        elif isinstance(outcome, BaseException) and is_server_failure(outcome):
+            self.concurrency_limiter.release(latency, failed=True)
+        else:
+            self.concurrency_limiter.release()
+    
+    def _build_payload(self, 
+                       messages: List[Dict[str, Any]], 
+                       tools: Optional[List[Dict[str, Any]]] = None,
+                       stream: bool = False) -> Dict[str, Any]:
+        """Build the request body for the Ollama chat API
+        
+        Args:
+            messages: List of message objects with role and content
+            tools: Optional list of tools to make available to the model
+            stream: Whether to ask Ollama for a streamed response
+            
+        Returns:
+            Request body for /api/chat
+        """
         data = {
             "model": self.model,
             "messages": self._format_messages(messages),
-            "stream": False,
+            "stream": stream,
             # **self.kwargs
         }
         
+        keep_alive = self.residency.keep_alive_for(self.model) if self.residency else self.keep_alive
+        if keep_alive is not None:
+            data["keep_alive"] = keep_alive
+        
         # Add tools if provided and the model supports it
         if tools and self.model not in ["mistral", "phi", "deepseek-r1:7b"]:
             ollama_tools = self.get_tools_format(tools)
             data["tools"] = ollama_tools
         
-        try:
-            # Make the API call to Ollama
-            response = requests.post(self.chat_endpoint, json=data)
-            response.raise_for_status()
-            response_data = response.json()
-            
-            # Process the response
-            result = {
-                "content": response_data.get("message", {}).get("content", ""),
-                "tool_calls": None
-            }
+        return data
+    
+    def _encode_request(self, 
+                        messages: List[Dict[str, Any]], 
+                        tools: Optional[List[Dict[str, Any]]] = None,
+                        stream: bool = False) -> bytes:
+        """Serialize the request body for the Ollama chat API
+        
+        Produces the JSON encoding of _build_payload, but splices in each
+        message's cached JSON fragment (see Message.wire_json) and the tool
+        list's cached encoding (see ToolRegistry.list_tools) instead of
+        re-serializing them, so a turn only serializes what is new.
+        
+        Args:
+            messages: List of message objects with role and content
+            tools: Optional list of tools to make available to the model
+            stream: Whether to ask Ollama for a streamed response
             
-            # Extract tool calls if present
-            if tools and "tool_calls" in response_data.get("message", {}):
-                tool_calls = response_data["message"]["tool_calls"]
-                result["tool_calls"] = []
-                
-                for tool_call in tool_calls:
-                    result["tool_calls"].append({
-                        "id": tool_call.get("id", ""),
-                        "name": tool_call.get("name", ""),
-                        "arguments": self._parse_tool_arguments(tool_call.get("arguments", "{}"))
-                    })
-            
-            return result
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Error calling Ollama API: {e}")
-            return {"content": f"Error: {str(e)}", "tool_calls": None}
-        except Exception as e:
-            logger.error(f"Unexpected error: {e}")
-            return {"content": f"Error: {str(e)}", "tool_calls": None}
+        Returns:
+            UTF-8 encoded JSON
+        """
+        with tracing.span("llm.encode_request", messages=len(messages)) as span:
+            data = self._build_payload([], tools, stream=stream)
+            del data["messages"]
+            tools = data.pop("tools", None)
+            
+            parts = [
+                json.dumps(data)[:-1].encode("utf-8"),
+                b', "messages": [',
+                b", ".join(self._message_fragments(messages)),
+                b"]"
+            ]
+            if tools is not None:
+                tools_json = tools.to_json() if hasattr(tools, "to_json") else json.dumps(tools).encode("utf-8")
+                parts.append(b', "tools": ')
+                parts.append(tools_json)
+            parts.append(b"}")
+            body = b"".join(parts)
+            span.set_attribute("bytes", len(body))
+            return body
+    
+    def _message_fragments(self, messages: List[Dict[str, Any]]) -> List[bytes]:
+        """Get the JSON encoding of each message that is sent to Ollama
+        
+        Args:
+            messages: Messages in OpenAgents format
+            
+        Returns:
+            UTF-8 encoded JSON object per message with content
+        """
+        fragments = []
+        for message in messages:
+            # Only include messages with content
+            if "content" in message and message["content"] is not None:
+                if hasattr(message, "wire_json"):
+                    fragments.append(message.wire_json())
+                else:
+                    fragments.append(json.dumps({
+                        "role": message["role"],
+                        "content": message["content"]
+                    }).encode("utf-8"))
+        return fragments
+    
+    def _parse_response(self, 
+                        response_data: Dict[str, Any], 
+                        tools: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Convert an Ollama chat response into the OpenAgents format
+        
+        Args:
+            response_data: Decoded JSON body returned by /api/chat
+            tools: Tools that were sent with the request
+            
+        Returns:
+            Dictionary with the response content, any tool calls and the
+            request's usage (see Usage)
+        """
+        result = {
+            "content": response_data.get("message", {}).get("content", ""),
+            "tool_calls": None,
+            "usage": Usage.from_ollama(response_data).to_dict()
+        }
+        
+        # Extract tool calls if present
+        if tools and "tool_calls" in response_data.get("message", {}):
+            result["tool_calls"] = self._parse_tool_calls(response_data["message"]["tool_calls"])
+        
+        return result
+    
+    def _parse_tool_calls(self, tool_calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Convert Ollama tool calls into the OpenAgents format
+        
+        Args:
+            tool_calls: Tool calls from an Ollama message
+            
+        Returns:
+            List of tool calls with id, name and parsed arguments
+        """
+        return [
+            {
+                "id": tool_call.get("id", ""),
+                "name": tool_call.get("name", ""),
+                "arguments": self._parse_tool_arguments(tool_call.get("arguments", "{}"))
+            }
+            for tool_call in tool_calls
+        ]
     
     def get_tools_format(self, tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Convert tools to the format expected by Ollama
@@ -118,6 +533,9 @@ class OllamaLLM(BaseLLM):
         for message in messages:
             # Only include messages with content
             if "content" in message and message["content"] is not None:
+                if hasattr(message, "to_wire"):
+                    formatted_messages.append(message.to_wire())
+                    continue
                 formatted_message = {
                     "role": message["role"],
                     "content": message["content"]
@@ -4,6 +4,8 @@ LLM provider registry for OpenAgents framework.
 from typing import Dict, Type
 from openagents.llm.base import BaseLLM
 from openagents.llm.ollama_me import OllamaLLM
+from openagents.llm.balancer import BalancedOllamaLLM
+from openagents.llm.replay import ReplayLLM
 
 
 class LLMRegistry:
@@ -51,3 +53,5 @@ class LLMRegistry:
 
 # Register the built-in providers
 LLMRegistry.register_provider("ollama", OllamaLLM)
+LLMRegistry.register_provider("ollama_balanced", BalancedOllamaLLM)
+LLMRegistry.register_provider("replay", ReplayLLM)
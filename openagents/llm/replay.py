@@ -0,0 +1,494 @@
+"""
+Record/replay LLM provider for OpenAgents framework.
+
+Benchmarks and CI runs cannot depend on a live Ollama server. ReplayLLM
+records the requests and responses of a real provider to a cassette file
+(one JSON interaction per line) and later serves them back without a
+network, optionally sleeping for the recorded latency or a synthetic
+latency profile so timings stay realistic.
+
+ReplayServer serves a cassette over HTTP, speaking enough of the Ollama API
+(/api/chat with and without streaming, /api/version, /api/ps, /api/generate)
+to exercise OllamaLLM and the transport layer end to end.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Any, Callable, Iterator, Optional, Union
+
+from openagents.llm.base import BaseLLM
+from openagents.llm.cache import request_key
+from openagents.llm.ollama_me import OllamaLLM
+from openagents.utils.helpers import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# None (no delay), "recorded", a fixed number of seconds, or a function of the interaction
+LatencyProfile = Union[None, str, float, Callable[[Dict[str, Any]], float]]
+
+
+def cassette_key(model: str,
+                 messages: List[Any],
+                 tools: Optional[List[Dict[str, Any]]] = None) -> str:
+    """Compute the key an interaction is recorded under
+    
+    Only what is sent on the wire counts (role and content of messages with
+    content), so ReplayLLM and ReplayServer find the same interactions.
+    
+    Args:
+        model: Model name
+        messages: Conversation messages
+        tools: Tool schemas sent with the request
+    
+    Returns:
+        Hex digest identifying the request
+    """
+    wire = [
+        {"role": message["role"], "content": message["content"]}
+        for message in messages
+        if message.get("content") is not None
+    ]
+    return request_key(model, wire, tools)
+
+
+def synthetic_latency(base: float = 0.2, per_token: float = 0.02) -> Callable[[Dict[str, Any]], float]:
+    """Build a latency profile that grows with the length of the response
+    
+    Args:
+        base: Fixed seconds per request (prompt processing and overhead)
+        per_token: Seconds per generated token
+    
+    Returns:
+        Function mapping an interaction to its latency in seconds
+    """
+    def latency(interaction: Dict[str, Any]) -> float:
+        content = interaction["response"].get("content") or ""
+        return base + per_token * estimate_tokens(content)
+    return latency
+
+
+def replay_delay(interaction: Dict[str, Any], latency: LatencyProfile, latency_scale: float = 1.0) -> float:
+    """Get the seconds to wait before serving an interaction
+    
+    Args:
+        interaction: Recorded interaction
+        latency: Latency profile
+        latency_scale: Factor applied to the profile's latency
+    
+    Returns:
+        Delay in seconds
+    """
+    if latency is None:
+        return 0.0
+    if latency == "recorded":
+        seconds = interaction.get("latency", 0.0)
+    elif callable(latency):
+        seconds = latency(interaction)
+    else:
+        seconds = float(latency)
+    return seconds * latency_scale
+
+
+def _content_chunks(interaction: Dict[str, Any]) -> List[str]:
+    """Get the content deltas to stream for an interaction"""
+    if interaction.get("chunks"):
+        return interaction["chunks"]
+    content = interaction["response"].get("content") or ""
+    # Split after whitespace so the chunks join back to the exact content
+    chunks, start = [], 0
+    for i, char in enumerate(content):
+        if char.isspace():
+            chunks.append(content[start:i + 1])
+            start = i + 1
+    if start < len(content):
+        chunks.append(content[start:])
+    return chunks
+
+
+class Cassette:
+    """Recorded LLM interactions stored as JSON lines"""
+    
+    def __init__(self, path: str):
+        """Initialize the cassette, loading any interactions already recorded
+        
+        Args:
+            path: Cassette file
+        """
+        self.path = path
+        self.interactions: Dict[str, List[Dict[str, Any]]] = {}
+        self._cursors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        interaction = json.loads(line)
+                        self.interactions.setdefault(interaction["key"], []).append(interaction)
+        except FileNotFoundError:
+            pass
+    
+    def __len__(self) -> int:
+        """Number of recorded interactions"""
+        return sum(len(recorded) for recorded in self.interactions.values())
+    
+    def find(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get the next recorded interaction for a request
+        
+        A request recorded several times is answered with its recordings in
+        order, starting over after the last one.
+        
+        Args:
+            key: Request key (see cassette_key)
+        
+        Returns:
+            The interaction, or None if the request was never recorded
+        """
+        with self._lock:
+            recorded = self.interactions.get(key)
+            if not recorded:
+                return None
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+            return recorded[cursor % len(recorded)]
+    
+    def record(self, interaction: Dict[str, Any]) -> None:
+        """Append an interaction to the cassette
+        
+        Args:
+            interaction: Interaction with at least key and response
+        """
+        line = json.dumps(interaction, default=str)
+        with self._lock:
+            self.interactions.setdefault(interaction["key"], []).append(interaction)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+class ReplayLLM(BaseLLM):
+    """Provider that records a real provider's interactions or replays them offline"""
+    
+    def __init__(self,
+                 model: str,
+                 cassette: Union[str, Cassette] = "cassette.jsonl",
+                 mode: str = "replay",
+                 llm: Optional[BaseLLM] = None,
+                 latency: LatencyProfile = None,
+                 latency_scale: float = 1.0,
+                 **kwargs):
+        """Initialize the record/replay provider
+        
+        Args:
+            model: Model name
+            cassette: Cassette file (or a loaded Cassette)
+            mode: "record" to call the real provider and record, "replay" to serve recordings
+            llm: Provider to record (defaults to OllamaLLM created with kwargs)
+            latency: Latency profile applied in replay mode
+            latency_scale: Factor applied to the profile's latency
+            **kwargs: Arguments for the default OllamaLLM in record mode
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown mode '{mode}' (expected 'record' or 'replay')")
+        
+        super().__init__(model, **kwargs)
+        self.cassette = cassette if isinstance(cassette, Cassette) else Cassette(cassette)
+        self.mode = mode
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self.llm = llm if llm is not None or mode == "replay" else OllamaLLM(model, **kwargs)
+    
+    def generate_response(self,
+                         messages: List[Dict[str, Any]],
+                         tools: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Generate a response by recording the real provider or replaying the cassette
+        
+        Args:
+            messages: List of message objects with role and content
+            tools: Optional list of tools to make available to the model
+        
+        Returns:
+            Dictionary with the response content and any tool calls
+        """
+        key = cassette_key(self.model, messages, tools)
+        if self.mode == "record":
+            start = time.monotonic()
+            response = self.llm.generate_response(messages, tools)
+            self._record(key, messages, tools, response, time.monotonic() - start)
+            return response
+        
+        interaction = self.cassette.find(key)
+        if interaction is None:
+            return self._missing()
+        time.sleep(replay_delay(interaction, self.latency, self.latency_scale))
+        return dict(interaction["response"])
+    
+    async def agenerate_response(self,
+                                 messages: List[Dict[str, Any]],
+                                 tools: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Asynchronously generate a response by recording or replaying
+        
+        Args:
+            messages: List of message objects with role and content
+            tools: Optional list of tools to make available to the model
+        
+        Returns:
+            Dictionary with the response content and any tool calls
+        """
+        key = cassette_key(self.model, messages, tools)
+        if self.mode == "record":
+            start = time.monotonic()
+            response = await self.llm.agenerate_response(messages, tools)
+            self._record(key, messages, tools, response, time.monotonic() - start)
+            return response
+        
+        interaction = self.cassette.find(key)
+        if interaction is None:
+            return self._missing()
+        await asyncio.sleep(replay_delay(interaction, self.latency, self.latency_scale))
+        return dict(interaction["response"])
+    
+    def generate_stream(self,
+                        messages: List[Dict[str, Any]],
+                        tools: Optional[List[Dict[str, Any]]] = None) -> Iterator[Dict[str, Any]]:
+        """Stream a response by recording or replaying
+        
+        Replayed content is streamed in its recorded chunks (or word by word),
+        with the latency spread evenly over the chunks.
+        
+        Args:
+            messages: List of message objects with role and content
+            tools: Optional list of tools to make available to the model
+        
+        Yields:
+            Stream events (see BaseLLM.generate_stream)
+        """
+        key = cassette_key(self.model, messages, tools)
+        if self.mode == "record":
+            start = time.monotonic()
+            chunks = []
+            for event in self.llm.generate_stream(messages, tools):
+                if event["type"] == "content":
+                    chunks.append(event["content"])
+                elif event["type"] == "done":
+                    response = {k: v for k, v in event.items() if k != "type"}
+                    self._record(key, messages, tools, response, time.monotonic() - start, chunks)
+                yield event
+            return
+        
+        interaction = self.cassette.find(key)
+        if interaction is None:
+            response = self._missing()
+            yield {"type": "content", "content": response["content"]}
+            yield {"type": "done", **response}
+            return
+        
+        response = interaction["response"]
+        chunks = _content_chunks(interaction)
+        pause = replay_delay(interaction, self.latency, self.latency_scale) / max(1, len(chunks))
+        for chunk in chunks:
+            time.sleep(pause)
+            yield {"type": "content", "content": chunk}
+        for tool_call in response.get("tool_calls") or []:
+            yield {"type": "tool_call", "tool_call": tool_call}
+        yield {"type": "done", **response}
+    
+    def get_tools_format(self, tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Convert tools to the recorded provider's format
+        
+        Args:
+            tools: List of tools in the standard OpenAgents format
+        
+        Returns:
+            List of tools in the provider's format
+        """
+        return self.llm.get_tools_format(tools) if self.llm is not None else tools
+    
+    def _record(self,
+                key: str,
+                messages: List[Dict[str, Any]],
+                tools: Optional[List[Dict[str, Any]]],
+                response: Dict[str, Any],
+                latency: float,
+                chunks: Optional[List[str]] = None) -> None:
+        """Write an interaction to the cassette"""
+        interaction = {
+            "key": key,
+            "model": self.model,
+            "messages": [
+                {"role": message["role"], "content": message["content"]}
+                for message in messages
+                if message.get("content") is not None
+            ],
+            "tools": [tool["function"]["name"] for tool in tools or []],
+            "response": response,
+            "latency": latency
+        }
+        if chunks is not None:
+            interaction["chunks"] = chunks
+        self.cassette.record(interaction)
+    
+    def _missing(self) -> Dict[str, Any]:
+        """Build the error response for a request that was never recorded"""
+        logger.warning(f"No recorded response in {self.cassette.path} for this request")
+        return {"content": "Error: No recorded response for this request", "tool_calls": None}
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    """Serves a ReplayServer's cassette through the Ollama HTTP API"""
+    
+    protocol_version = "HTTP/1.1"
+    server: "ReplayServer"
+    
+    def log_message(self, format: str, *args: Any) -> None:
+        """Log requests at debug level instead of writing to stderr"""
+        logger.debug(f"{self.address_string()} {format % args}")
+    
+    def do_GET(self) -> None:
+        """Answer health and model listing requests"""
+        if self.path == "/api/version":
+            self._send_json({"version": "replay"})
+        elif self.path == "/api/ps":
+            self._send_json({"models": []})
+        else:
+            self._send_json({"error": f"unknown path {self.path}"}, 404)
+    
+    def do_POST(self) -> None:
+        """Answer chat and model load requests"""
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.path == "/api/generate":
+            # Load/unload requests; nothing to do
+            self._send_json({"model": body.get("model"), "response": "", "done": True})
+        elif self.path == "/api/chat":
+            self._chat(body)
+        else:
+            self._send_json({"error": f"unknown path {self.path}"}, 404)
+    
+    def _chat(self, body: Dict[str, Any]) -> None:
+        """Answer a chat request from the cassette"""
+        model = body.get("model", "")
+        key = cassette_key(model, body.get("messages", []), body.get("tools"))
+        interaction = self.server.cassette.find(key)
+        if interaction is None:
+            self._send_json({"error": "no recorded response for this request"}, 404)
+            return
+        
+        delay = replay_delay(interaction, self.server.latency, self.server.latency_scale)
+        response = interaction["response"]
+        timings = {
+            "total_duration": int(delay * 1e9),
+            "load_duration": 0,
+            "eval_count": estimate_tokens(response.get("content") or ""),
+            "eval_duration": int(delay * 1e9)
+        }
+        message = {"role": "assistant", "content": response.get("content") or ""}
+        if response.get("tool_calls"):
+            # Encoded the way OllamaLLM parses tool calls
+            message["tool_calls"] = [
+                {
+                    "id": tool_call.get("id", ""),
+                    "name": tool_call["name"],
+                    "arguments": json.dumps(tool_call.get("arguments", {}))
+                }
+                for tool_call in response["tool_calls"]
+            ]
+        
+        if not body.get("stream", True):
+            time.sleep(delay)
+            self._send_json({"model": model, "message": message, "done": True, **timings})
+            return
+        
+        # Ollama streams newline-delimited JSON with chunked transfer encoding
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        chunks = _content_chunks(interaction)
+        pause = delay / max(1, len(chunks))
+        for chunk in chunks:
+            time.sleep(pause)
+            self._write_chunk({"model": model, "message": {"role": "assistant", "content": chunk}, "done": False})
+        message["content"] = ""
+        self._write_chunk({"model": model, "message": message, "done": True, **timings})
+        self.wfile.write(b"0\r\n\r\n")
+    
+    def _write_chunk(self, obj: Dict[str, Any]) -> None:
+        """Write one NDJSON line as an HTTP chunk"""
+        data = json.dumps(obj).encode("utf-8") + b"\n"
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+    
+    def _send_json(self, obj: Dict[str, Any], status: int = 200) -> None:
+        """Send a complete JSON response"""
+        data = json.dumps(obj).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """Local stand-in for an Ollama server that answers from a cassette
+    
+    Use as a context manager, or call start() and stop():
+        
+        with ReplayServer("session.jsonl") as server:
+            llm = OllamaLLM("llama3.2", base_url=server.url)
+    """
+    
+    daemon_threads = True
+    
+    def __init__(self,
+                 cassette: Union[str, Cassette],
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 latency: LatencyProfile = None,
+                 latency_scale: float = 1.0):
+        """Initialize the server (port 0 picks a free port)
+        
+        Args:
+            cassette: Cassette file (or a loaded Cassette)
+            host: Interface to listen on
+            port: Port to listen on
+            latency: Latency profile for responses
+            latency_scale: Factor applied to the profile's latency
+        """
+        super().__init__((host, port), _ReplayHandler)
+        self.cassette = cassette if isinstance(cassette, Cassette) else Cassette(cassette)
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def url(self) -> str:
+        """Base URL to pass to OllamaLLM"""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def start(self) -> "ReplayServer":
+        """Serve requests in a background thread
+        
+        Returns:
+            The server
+        """
+        self._thread = threading.Thread(target=self.serve_forever, name="replay-server", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self) -> None:
+        """Stop serving and close the socket"""
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+    
+    def __enter__(self) -> "ReplayServer":
+        """Start serving"""
+        return self.start()
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        """Stop serving"""
+        self.stop()
@@ -0,0 +1,336 @@
+"""
+Model residency management for Ollama in OpenAgents framework.
+
+Ollama unloads idle models, and the first request after that pays a
+multi-second load. The ModelResidencyManager preloads models when agents are
+created, sets keep_alive per model on every request, and keeps the hot set of
+models of each server within a memory budget by unloading the least recently
+used model first. Cold-load and warm-request latencies are tracked separately.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Union
+
+from openagents.llm.transport import HTTPTransport, get_default_transport
+
+logger = logging.getLogger(__name__)
+
+KeepAlive = Union[str, int, float]
+
+
+def _model_key(name: str) -> str:
+    """Normalize a model name ("llama3.2:latest" and "llama3.2" are the same model)"""
+    return name[:-len(":latest")] if name.endswith(":latest") else name
+
+
+class LatencyStats:
+    """Running count, mean and max of a latency series (in seconds)"""
+    
+    def __init__(self):
+        """Initialize empty statistics"""
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def add(self, seconds: float) -> None:
+        """Add an observation
+        
+        Args:
+            seconds: Observed latency
+        """
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+    
+    def to_dict(self) -> Dict[str, float]:
+        """Summarize the series
+        
+        Returns:
+            Dictionary with count, mean_ms and max_ms
+        """
+        return {
+            "count": self.count,
+            "mean_ms": 1000 * self.total / self.count if self.count else 0.0,
+            "max_ms": 1000 * self.max
+        }
+
+
+class ModelResidencyManager:
+    """Keeps frequently used models loaded in one or more Ollama servers
+    
+    Residency is tracked per server: each host has its own resident set and
+    memory budget. Methods take the host's base_url, defaulting to the
+    manager's own base_url.
+    """
+    
+    def __init__(self,
+                 base_url: str = "http://localhost:11434",
+                 transport: Optional[HTTPTransport] = None,
+                 memory_budget_mb: Optional[float] = None,
+                 default_keep_alive: KeepAlive = "30m",
+                 keep_alive: Optional[Dict[str, KeepAlive]] = None,
+                 cold_load_threshold: float = 0.1):
+        """Initialize the residency manager
+        
+        Args:
+            base_url: Base URL of the Ollama server used when no host is given
+            transport: HTTP transport to use (defaults to the process-wide shared transport)
+            memory_budget_mb: Memory the resident models of each server may use (None for no limit)
+            default_keep_alive: keep_alive sent for models without their own setting
+                (an Ollama duration such as "30m", seconds, or -1 to keep forever)
+            keep_alive: Per-model keep_alive overrides
+            cold_load_threshold: Seconds of server-reported load time above which a
+                request counts as a cold load
+        """
+        self.base_url = base_url
+        self.transport = transport or get_default_transport()
+        self.memory_budget_mb = memory_budget_mb
+        self.default_keep_alive = default_keep_alive
+        self.keep_alive = {_model_key(model): value for model, value in (keep_alive or {}).items()}
+        self.cold_load_threshold = cold_load_threshold
+        
+        # Per server: resident models in least to most recently used order, with their size in MB
+        self.resident: Dict[str, "OrderedDict[str, float]"] = {}
+        self.cold_loads: Dict[str, LatencyStats] = {}
+        self.warm_requests: Dict[str, LatencyStats] = {}
+        self._lock = threading.Lock()
+    
+    def keep_alive_for(self, model: str) -> KeepAlive:
+        """Get the keep_alive to send with requests for a model
+        
+        Args:
+            model: Model name
+        
+        Returns:
+            Ollama keep_alive value
+        """
+        return self.keep_alive.get(_model_key(model), self.default_keep_alive)
+    
+    def is_resident(self, model: str, base_url: Optional[str] = None) -> bool:
+        """Whether a model is known to be loaded on a server
+        
+        Args:
+            model: Model name
+            base_url: Base URL of the server (defaults to the manager's)
+        
+        Returns:
+            True if the model is in the server's resident set
+        """
+        with self._lock:
+            return _model_key(model) in self.resident.get(base_url or self.base_url, {})
+    
+    def preload(self, model: str, block: bool = True, base_url: Optional[str] = None) -> None:
+        """Load a model into memory ahead of its first request
+        
+        Args:
+            model: Model name
+            block: Whether to wait for the load to finish (otherwise it runs in the background)
+            base_url: Base URL of the server (defaults to the manager's)
+        """
+        base_url = base_url or self.base_url
+        if not block:
+            threading.Thread(
+                target=self.preload, args=(model, True, base_url), name=f"preload-{model}", daemon=True
+            ).start()
+            return
+        
+        start = time.monotonic()
+        try:
+            # A generate request without a prompt only loads the model
+            response = self.transport.post(
+                f"{base_url}/api/generate",
+                json={"model": model, "keep_alive": self.keep_alive_for(model)}
+            )
+            response.raise_for_status()
+        except Exception as e:
+            logger.warning(f"Failed to preload model '{model}' on {base_url}: {e}")
+            return
+        
+        self.record_request(model, time.monotonic() - start, response.json(), base_url=base_url)
+        logger.debug(f"Preloaded model '{model}' on {base_url}")
+    
+    def preload_for(self, llm: Any, block: bool = True) -> None:
+        """Preload an LLM client's model on every server it sends requests to
+        
+        Args:
+            llm: OllamaLLM or BalancedOllamaLLM, possibly inside provider wrappers
+            block: Whether to wait for the loads to finish
+        """
+        for base_url in self._hosts(llm):
+            if not self.is_resident(llm.model, base_url):
+                self.preload(llm.model, block=block, base_url=base_url)
+    
+    def unload(self, model: str, base_url: Optional[str] = None) -> bool:
+        """Unload a model from memory
+        
+        Args:
+            model: Model name
+            base_url: Base URL of the server (defaults to the manager's)
+        
+        Returns:
+            Whether the server unloaded it (the model stays tracked as resident otherwise)
+        """
+        base_url = base_url or self.base_url
+        try:
+            response = self.transport.post(
+                f"{base_url}/api/generate",
+                json={"model": model, "keep_alive": 0}
+            )
+            response.raise_for_status()
+        except Exception as e:
+            logger.warning(f"Failed to unload model '{model}' on {base_url}: {e}")
+            return False
+        
+        with self._lock:
+            self.resident.get(base_url, OrderedDict()).pop(_model_key(model), None)
+        logger.debug(f"Unloaded model '{model}' on {base_url}")
+        return True
+    
+    def record_request(self,
+                       model: str,
+                       latency: float,
+                       response_data: Dict[str, Any],
+                       block: bool = True,
+                       base_url: Optional[str] = None) -> None:
+        """Record a completed request and mark its model as most recently used
+        
+        The first request for a model on a server refreshes that server's
+        resident set, which may unload other models to stay within the budget.
+        
+        Args:
+            model: Model name
+            latency: Client-observed request latency in seconds
+            response_data: Decoded Ollama response (its load_duration tells cold from warm)
+            block: Whether to wait for that refresh (otherwise it runs in the
+                background, e.g. when called from an event loop)
+            base_url: Base URL of the server that answered (defaults to the manager's)
+        """
+        base_url = base_url or self.base_url
+        model = _model_key(model)
+        load_seconds = response_data.get("load_duration", 0) / 1e9
+        is_cold = load_seconds > self.cold_load_threshold
+        evict = False
+        
+        with self._lock:
+            series = self.cold_loads if is_cold else self.warm_requests
+            series.setdefault(model, LatencyStats()).add(latency)
+            
+            resident = self.resident.setdefault(base_url, OrderedDict())
+            if model not in resident:
+                resident[model] = 0.0
+                evict = True
+            resident.move_to_end(model)
+        
+        if evict:
+            # Learn the new model's size, then make room for it
+            if block:
+                self.refresh(base_url)
+            else:
+                threading.Thread(
+                    target=self.refresh, args=(base_url,), name=f"refresh-{model}", daemon=True
+                ).start()
+    
+    def refresh(self, base_url: Optional[str] = None) -> None:
+        """Update a server's resident models and their sizes from its /api/ps
+        
+        Args:
+            base_url: Base URL of the server (defaults to the manager's)
+        """
+        base_url = base_url or self.base_url
+        try:
+            response = self.transport.get(f"{base_url}/api/ps")
+            response.raise_for_status()
+            running = {
+                _model_key(m["name"]): m.get("size", 0) / (1024 * 1024)
+                for m in response.json().get("models", [])
+            }
+        except Exception as e:
+            logger.warning(f"Failed to list running models on {base_url}: {e}")
+            return
+        
+        with self._lock:
+            resident = self.resident.setdefault(base_url, OrderedDict())
+            for model in list(resident):
+                if model not in running:
+                    del resident[model]
+            for model, size_mb in running.items():
+                if model not in resident:
+                    # Loaded by someone else; treat as least recently used
+                    resident[model] = size_mb
+                    resident.move_to_end(model, last=False)
+                else:
+                    resident[model] = size_mb
+        
+        self.enforce_budget(base_url)
+    
+    def enforce_budget(self, base_url: Optional[str] = None) -> None:
+        """Unload least recently used models until a server's resident set fits the budget
+        
+        The most recently used model is never unloaded. A model the server
+        fails to unload stays tracked, and no further models are unloaded
+        until the next refresh.
+        
+        Args:
+            base_url: Base URL of the server (defaults to the manager's)
+        """
+        if self.memory_budget_mb is None:
+            return
+        base_url = base_url or self.base_url
+        
+        while True:
+            with self._lock:
+                resident = self.resident.get(base_url, OrderedDict())
+                if len(resident) <= 1 or sum(resident.values()) <= self.memory_budget_mb:
+                    return
+                victim = next(iter(resident))
+            logger.info(f"Unloading '{victim}' from {base_url} to stay within {self.memory_budget_mb} MB")
+            if not self.unload(victim, base_url):
+                return
+    
+    def sync_with_registry(self, agent_registry: Any, block: bool = True) -> None:
+        """Preload every model used by the agents in an AgentRegistry
+        
+        Each model is loaded on every server its agent's client sends requests to.
+        
+        Args:
+            agent_registry: Registry whose agents' models should be resident
+            block: Whether to wait for the loads to finish
+        """
+        for agent in agent_registry.list().values():
+            if getattr(agent, "llm", None) is not None:
+                self.preload_for(agent.llm, block=block)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get residency and latency statistics
+        
+        Returns:
+            Dictionary with resident models per server and cold/warm latency per model
+        """
+        with self._lock:
+            models = set(self.cold_loads) | set(self.warm_requests)
+            for resident in self.resident.values():
+                models |= set(resident)
+            return {
+                "resident": {base_url: dict(resident) for base_url, resident in self.resident.items()},
+                "resident_mb": {base_url: sum(resident.values()) for base_url, resident in self.resident.items()},
+                "memory_budget_mb": self.memory_budget_mb,
+                "models": {
+                    model: {
+                        "cold_load": self.cold_loads.get(model, LatencyStats()).to_dict(),
+                        "warm": self.warm_requests.get(model, LatencyStats()).to_dict()
+                    }
+                    for model in sorted(models)
+                }
+            }
+    
+    def _hosts(self, llm: Any) -> List[str]:
+        """Base URLs an LLM client sends requests to"""
+        # Look through provider wrappers (caching, coalescing, admission)
+        while getattr(llm, "llm", None) is not None:
+            llm = llm.llm
+        clients = getattr(llm, "clients", None)
+        if clients:
+            return list(clients)
+        return [getattr(llm, "base_url", self.base_url)]
@@ -0,0 +1,193 @@
+"""
+HTTP transport for LLM providers in OpenAgents framework.
+
+A transport owns the pooled keep-alive connections, timeouts and retry policy
+used to talk to an LLM server. One default transport is shared by every
+provider in the process unless a provider is given its own.
+"""
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Any, Optional, Tuple
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPTransport:
+    """Pooled HTTP transport with timeouts and exponential-backoff retries"""
+    
+    def __init__(self,
+                 pool_size: int = 10,
+                 connect_timeout: float = 5.0,
+                 read_timeout: Optional[float] = 300.0,
+                 max_retries: int = 3,
+                 backoff_factor: float = 0.5,
+                 retry_statuses: Tuple[int, ...] = (500, 502, 503, 504)):
+        """Initialize the transport
+        
+        Args:
+            pool_size: Maximum number of keep-alive connections per host
+            connect_timeout: Seconds to wait for a connection to be established
+            read_timeout: Seconds to wait between bytes of the response (None to wait forever)
+            max_retries: Retries on connection errors and retryable status codes
+            backoff_factor: Base delay in seconds; retry n waits backoff_factor * 2 ** (n - 1)
+            retry_statuses: Response status codes that trigger a retry
+        """
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.retry_statuses = tuple(retry_statuses)
+        
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=self._build_retry()
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        
+        # httpx pools are bound to the event loop that created them
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = \
+            weakref.WeakKeyDictionary()
+    
+    @property
+    def timeout(self) -> Tuple[float, Optional[float]]:
+        """(connect, read) timeout tuple in the form requests expects"""
+        return (self.connect_timeout, self.read_timeout)
+    
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Send a POST request over the pooled session
+        
+        Args:
+            url: URL to post to
+            **kwargs: Arguments passed to requests.Session.post
+        
+        Returns:
+            HTTP response
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.post(url, **kwargs)
+    
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Send a GET request over the pooled session
+        
+        Args:
+            url: URL to fetch
+            **kwargs: Arguments passed to requests.Session.get
+        
+        Returns:
+            HTTP response
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.get(url, **kwargs)
+    
+    async def apost(self, url: str, **kwargs) -> httpx.Response:
+        """Send a POST request over the pooled async client, with retries
+        
+        Args:
+            url: URL to post to
+            **kwargs: Arguments passed to httpx.AsyncClient.post
+        
+        Returns:
+            HTTP response
+        """
+        client = self.get_async_client()
+        attempt = 0
+        
+        while True:
+            try:
+                response = await client.post(url, **kwargs)
+                if response.status_code not in self.retry_statuses or attempt >= self.max_retries:
+                    return response
+                logger.warning(f"Retrying POST {url} after status {response.status_code}")
+            except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                logger.warning(f"Retrying POST {url} after connection error: {e}")
+            
+            attempt += 1
+            await asyncio.sleep(self.backoff_factor * (2 ** (attempt - 1)))
+    
+    def get_async_client(self) -> httpx.AsyncClient:
+        """Get the pooled async client for the running event loop
+        
+        Returns:
+            Async HTTP client
+        """
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.pool_size,
+                    max_keepalive_connections=self.pool_size
+                ),
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout)
+            )
+            self._async_clients[loop] = client
+        return client
+    
+    def close(self) -> None:
+        """Close the pooled sync session"""
+        self.session.close()
+    
+    async def aclose(self) -> None:
+        """Close the async client bound to the running event loop"""
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+    
+    def _build_retry(self) -> Retry:
+        """Build the urllib3 retry policy for the sync session"""
+        retry_kwargs: Any = dict(
+            total=self.max_retries,
+            connect=self.max_retries,
+            read=0,
+            status=self.max_retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=self.retry_statuses,
+            raise_on_status=False
+        )
+        try:
+            return Retry(allowed_methods=frozenset(["GET", "POST"]), **retry_kwargs)
+        except TypeError:
+            # urllib3 < 1.26
+            return Retry(method_whitelist=frozenset(["GET", "POST"]), **retry_kwargs)
+
+
+_default_transport: Optional[HTTPTransport] = None
+_default_transport_lock = threading.Lock()
+
+
+def get_default_transport() -> HTTPTransport:
+    """Get the process-wide transport shared by providers without their own
+    
+    Returns:
+        The default transport
+    """
+    global _default_transport
+    if _default_transport is None:
+        with _default_transport_lock:
+            if _default_transport is None:
+                _default_transport = HTTPTransport()
+    return _default_transport
+
+
+def set_default_transport(transport: HTTPTransport) -> None:
+    """Replace the process-wide default transport
+    
+    Args:
+        transport: Transport to share between providers created from now on
+    """
+    global _default_transport
+    with _default_transport_lock:
+        _default_transport = transport
@@ -0,0 +1,225 @@
+"""
+LLM usage and timing accounting for OpenAgents framework.
+
+Ollama reports how long each request spent loading the model, evaluating the
+prompt and generating tokens, and how many tokens each phase processed.
+OllamaLLM returns these as a "usage" entry on every response; agents feed
+them into a UsageTracker, which aggregates them per agent and per model and
+exports them in the Prometheus text exposition format.
+"""
+import threading
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Any, Tuple
+
+
+@dataclass
+class Usage:
+    """Token counts and server-side timings of one LLM request (durations in seconds)"""
+    total_duration: float = 0.0
+    load_duration: float = 0.0
+    prompt_eval_count: int = 0
+    prompt_eval_duration: float = 0.0
+    eval_count: int = 0
+    eval_duration: float = 0.0
+    
+    @classmethod
+    def from_ollama(cls, response_data: Dict[str, Any]) -> "Usage":
+        """Extract usage from an Ollama response (durations there are in nanoseconds)
+        
+        Args:
+            response_data: Decoded /api/chat response, or the final streamed chunk
+        
+        Returns:
+            Usage of the request
+        """
+        return cls(
+            total_duration=response_data.get("total_duration", 0) / 1e9,
+            load_duration=response_data.get("load_duration", 0) / 1e9,
+            prompt_eval_count=response_data.get("prompt_eval_count", 0),
+            prompt_eval_duration=response_data.get("prompt_eval_duration", 0) / 1e9,
+            eval_count=response_data.get("eval_count", 0),
+            eval_duration=response_data.get("eval_duration", 0) / 1e9
+        )
+    
+    @property
+    def tokens_per_second(self) -> float:
+        """Generation (decode) speed"""
+        return self.eval_count / self.eval_duration if self.eval_duration else 0.0
+    
+    @property
+    def prompt_tokens_per_second(self) -> float:
+        """Prompt evaluation (prefill) speed"""
+        return self.prompt_eval_count / self.prompt_eval_duration if self.prompt_eval_duration else 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the plain dictionary carried in responses
+        
+        Returns:
+            Dictionary of the usage fields
+        """
+        return asdict(self)
+
+
+class UsageAggregate:
+    """Running totals of the usage of many requests"""
+    
+    FIELDS = ("total_duration", "load_duration", "prompt_eval_count",
+              "prompt_eval_duration", "eval_count", "eval_duration")
+    
+    def __init__(self):
+        """Initialize empty totals"""
+        self.requests = 0
+        self.totals: Dict[str, float] = dict.fromkeys(self.FIELDS, 0)
+    
+    def add(self, usage: Dict[str, Any]) -> None:
+        """Add one request's usage
+        
+        Args:
+            usage: Usage dictionary from a response
+        """
+        self.requests += 1
+        for field_name in self.FIELDS:
+            self.totals[field_name] += usage.get(field_name, 0)
+    
+    def merge(self, other: "UsageAggregate") -> None:
+        """Add another aggregate's totals
+        
+        Args:
+            other: Aggregate to add
+        """
+        self.requests += other.requests
+        for field_name in self.FIELDS:
+            self.totals[field_name] += other.totals[field_name]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Summarize the totals
+        
+        Returns:
+            Dictionary with request count, token counts, time per phase and speeds
+        """
+        t = self.totals
+        return {
+            "requests": self.requests,
+            "prompt_tokens": t["prompt_eval_count"],
+            "completion_tokens": t["eval_count"],
+            "total_seconds": t["total_duration"],
+            "load_seconds": t["load_duration"],
+            "prompt_eval_seconds": t["prompt_eval_duration"],
+            "eval_seconds": t["eval_duration"],
+            "prompt_tokens_per_second": t["prompt_eval_count"] / t["prompt_eval_duration"] if t["prompt_eval_duration"] else 0.0,
+            "tokens_per_second": t["eval_count"] / t["eval_duration"] if t["eval_duration"] else 0.0,
+            "mean_request_seconds": t["total_duration"] / self.requests if self.requests else 0.0
+        }
+
+
+# Prometheus counters exported per agent and model: (metric name, help, aggregate field)
+_COUNTERS = [
+    ("openagents_llm_requests_total", "LLM requests with server-side usage", None),
+    ("openagents_llm_prompt_tokens_total", "Prompt tokens evaluated", "prompt_eval_count"),
+    ("openagents_llm_completion_tokens_total", "Tokens generated", "eval_count"),
+    ("openagents_llm_request_seconds_total", "Server-side request time", "total_duration"),
+    ("openagents_llm_load_seconds_total", "Time spent loading models", "load_duration"),
+    ("openagents_llm_prompt_eval_seconds_total", "Time spent evaluating prompts", "prompt_eval_duration"),
+    ("openagents_llm_eval_seconds_total", "Time spent generating tokens", "eval_duration"),
+]
+
+
+def _label_value(value: str) -> str:
+    """Escape a Prometheus label value"""
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class UsageTracker:
+    """Aggregates LLM usage per agent and per model"""
+    
+    def __init__(self):
+        """Initialize the tracker"""
+        self._aggregates: Dict[Tuple[str, str], UsageAggregate] = {}
+        self._lock = threading.Lock()
+    
+    def record(self, agent: str, model: str, usage: Dict[str, Any]) -> None:
+        """Record the usage of one request
+        
+        Args:
+            agent: Name of the agent that made the request
+            model: Model that served it
+            usage: Usage dictionary from the response
+        """
+        with self._lock:
+            aggregate = self._aggregates.get((agent, model))
+            if aggregate is None:
+                aggregate = self._aggregates[(agent, model)] = UsageAggregate()
+            aggregate.add(usage)
+    
+    def by_agent(self) -> Dict[str, Dict[str, Any]]:
+        """Get usage totals per agent
+        
+        Returns:
+            Mapping of agent name to usage summary
+        """
+        return self._group(0)
+    
+    def by_model(self) -> Dict[str, Dict[str, Any]]:
+        """Get usage totals per model
+        
+        Returns:
+            Mapping of model name to usage summary
+        """
+        return self._group(1)
+    
+    def reset(self) -> None:
+        """Forget all recorded usage"""
+        with self._lock:
+            self._aggregates.clear()
+    
+    def to_prometheus(self) -> str:
+        """Export the usage in Prometheus text exposition format
+        
+        Counters are labelled with agent and model; per-model prefill and
+        decode speeds are exported as gauges.
+        
+        Returns:
+            Metrics text
+        """
+        with self._lock:
+            items = sorted(self._aggregates.items())
+        
+        lines: List[str] = []
+        for name, help_text, field_name in _COUNTERS:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for (agent, model), aggregate in items:
+                value = aggregate.requests if field_name is None else aggregate.totals[field_name]
+                lines.append(f'{name}{{agent="{_label_value(agent)}",model="{_label_value(model)}"}} {value}')
+        
+        models = self.by_model()
+        for name, help_text, key in [
+            ("openagents_llm_tokens_per_second", "Generation speed", "tokens_per_second"),
+            ("openagents_llm_prompt_tokens_per_second", "Prompt evaluation speed", "prompt_tokens_per_second"),
+        ]:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for model, summary in models.items():
+                lines.append(f'{name}{{model="{_label_value(model)}"}} {summary[key]}')
+        
+        return "\n".join(lines) + "\n"
+    
+    def _group(self, index: int) -> Dict[str, Dict[str, Any]]:
+        """Sum aggregates by agent (index 0) or model (index 1)"""
+        groups: Dict[str, UsageAggregate] = {}
+        with self._lock:
+            for key, aggregate in self._aggregates.items():
+                groups.setdefault(key[index], UsageAggregate()).merge(aggregate)
+        return {name: aggregate.to_dict() for name, aggregate in sorted(groups.items())}
+
+
+_default_tracker = UsageTracker()
+
+
+def get_usage_tracker() -> UsageTracker:
+    """Get the process-wide usage tracker that agents record into by default
+    
+    Returns:
+        The shared tracker
+    """
+    return _default_tracker
@@ -13,6 +13,7 @@ Features:
 
 This package requires Python 3.7+ and the following dependencies:
 - requests
+- httpx (async Ollama client)
 - (optional) psutil for memory monitoring
 
 For examples, see the examples/ directory.
@@ -43,6 +44,7 @@ setup(
     python_requires=">=3.7",
     install_requires=[
         "requests>=2.25.0",
+        "httpx>=0.23.0",
     ],
     extras_require={
         "dev": [
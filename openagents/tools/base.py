@@ -3,32 +3,275 @@ Base tool interface for OpenAgents framework.
 """
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Dict, Any, Callable, Optional, List
+from typing import Dict, Any, Callable, Optional, List, Tuple
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
 import inspect
 
+from openagents.utils import tracing
+from openagents.utils.deadline import run_with_timeout
+from openagents.utils.loop import get_background_loop
+
+# Cache policies: whether an agent may reuse a tool's result for identical arguments
+CACHE_NEVER = "never"  # always execute (side effects, or results that change)
+CACHE_PURE = "pure"    # the result depends only on the arguments
+CACHE_TTL = "ttl"      # results stay valid for cache_ttl seconds
+CACHE_POLICIES = (CACHE_NEVER, CACHE_PURE, CACHE_TTL)
+
+
+async def resolve_async_result(result: Any) -> Any:
+    """Await a coroutine or drain an async generator returned by a tool
+    
+    The items of an async generator are concatenated if they are all
+    strings, otherwise returned as a list.
+    
+    Args:
+        result: Return value of a tool function
+        
+    Returns:
+        The final result (other values are returned unchanged)
+    """
+    if inspect.isasyncgen(result):
+        items = [item async for item in result]
+        if all(isinstance(item, str) for item in items):
+            return "".join(items)
+        return items
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
+
+class ToolTimeoutError(TimeoutError):
+    """A tool call did not finish within its timeout"""
+
+
+async def _capture(awaitable: Any) -> Tuple[bool, Any]:
+    """Await something, returning (True, result) or (False, the exception it raised)
+    
+    Used under a timeout, so that a TimeoutError raised by the tool itself
+    is not mistaken for the timeout expiring.
+    """
+    try:
+        return True, await awaitable
+    except Exception as e:
+        return False, e
+
+
+def _capture_call(function: Callable, arguments: Dict[str, Any]) -> Tuple[bool, Any]:
+    """Call a function, returning (True, result) or (False, the exception it raised)"""
+    try:
+        return True, function(**arguments)
+    except Exception as e:
+        return False, e
+
+
+class ToolExecutor(ABC):
+    """Runs tool functions somewhere other than the calling thread"""
+    
+    @abstractmethod
+    def run(self, function: Callable, arguments: Dict[str, Any], timeout: Optional[float] = None) -> Any:
+        """Run a tool function and return its result
+        
+        Args:
+            function: Tool function
+            arguments: Keyword arguments for the function
+            timeout: Seconds the call may take (None for the executor's default)
+            
+        Returns:
+            Result of the function
+            
+        Raises:
+            ToolTimeoutError: If the call did not finish in time
+        """
+        pass
+    
+    async def arun(self, function: Callable, arguments: Dict[str, Any], timeout: Optional[float] = None) -> Any:
+        """Run a tool function without blocking the event loop
+        
+        By default run is called in the loop's thread pool, in a copy of the
+        caller's context.
+        
+        Args:
+            function: Tool function
+            arguments: Keyword arguments for the function
+            timeout: Seconds the call may take (None for the executor's default)
+            
+        Returns:
+            Result of the function
+            
+        Raises:
+            ToolTimeoutError: If the call did not finish in time
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, contextvars.copy_context().run, self.run, function, arguments, timeout
+        )
+
 
 @dataclass
 class Tool:
-    """Represents a tool that can be called by an agent"""
+    """Represents a tool that can be called by an agent
+    
+    cache declares whether results may be memoized (see CACHE_POLICIES);
+    with CACHE_TTL, cache_ttl gives the seconds a result stays valid. If an
+    executor is set, the function runs there (e.g. in a SandboxExecutor's
+    worker processes) instead of inline.
+    
+    The function may be a coroutine function or an async generator function;
+    see is_async and aexecute. timeout caps the seconds a call may take.
+    """
     name: str
     description: str
     function: Callable
     parameters: Dict[str, Any] = field(default_factory=dict)
+    cache: str = CACHE_NEVER
+    cache_ttl: Optional[float] = None
+    timeout: Optional[float] = None
+    executor: Optional[ToolExecutor] = field(default=None, repr=False, compare=False)
+    _schema: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        """Validate the cache declaration"""
+        if self.cache not in CACHE_POLICIES:
+            raise ValueError(f"Unknown cache policy '{self.cache}' (expected one of {', '.join(CACHE_POLICIES)})")
+        if self.cache == CACHE_TTL and not (self.cache_ttl and self.cache_ttl > 0):
+            raise ValueError(f"Tool '{self.name}' uses the ttl cache policy but has no positive cache_ttl")
+    
+    @property
+    def is_async(self) -> bool:
+        """Whether the function is a coroutine function or an async generator function"""
+        function = self.function
+        while isinstance(function, functools.partial):
+            function = function.func
+        return inspect.iscoroutinefunction(function) or inspect.isasyncgenfunction(function)
+    
+    @property
+    def cacheable(self) -> bool:
+        """Whether results of this tool may be memoized"""
+        return self.cache != CACHE_NEVER
     
     def execute(self, **kwargs) -> Any:
         """Execute the tool with the given arguments
         
+        Async tools run on the shared background event loop, so this must not
+        be called from a coroutine running there; use aexecute instead.
+        
         Args:
             **kwargs: Arguments to pass to the tool function
             
         Returns:
             Result of the tool execution
         """
-        return self.function(**kwargs)
+        return self.call(kwargs, self.timeout)
+    
+    async def aexecute(self, **kwargs) -> Any:
+        """Execute the tool with the given arguments without blocking the event loop
+        
+        Async tools are awaited on the running loop, tools with an executor
+        are handed to it, and synchronous tools run in the loop's default
+        thread pool.
+        
+        Args:
+            **kwargs: Arguments to pass to the tool function
+            
+        Returns:
+            Result of the tool execution
+        """
+        return await self.acall(kwargs, self.timeout)
+    
+    def call(self, arguments: Dict[str, Any], timeout: Optional[float] = None) -> Any:
+        """Execute the tool, giving up after a timeout
+        
+        Async tools are cancelled when they overrun, and so are tools in a
+        SandboxExecutor (their worker is replaced). Synchronous inline tools
+        cannot be stopped: they are abandoned and finish in the background.
+        
+        Args:
+            arguments: Arguments to pass to the tool function
+            timeout: Seconds the call may take (None for no limit)
+            
+        Returns:
+            Result of the tool execution
+            
+        Raises:
+            ToolTimeoutError: If the call did not finish in time (exceptions
+                raised by the tool itself, TimeoutError included, propagate unchanged)
+        """
+        if self.executor is not None:
+            return self.executor.run(self.function, arguments, timeout)
+        if timeout is None:
+            if self.is_async:
+                return get_background_loop().run(resolve_async_result(self.function(**arguments)))
+            return self.function(**arguments)
+        
+        if self.is_async:
+            try:
+                ok, value = get_background_loop().run(_capture(resolve_async_result(self.function(**arguments))), timeout)
+            except concurrent.futures.TimeoutError:
+                raise ToolTimeoutError(f"Tool '{self.name}' did not finish within {timeout:.3g}s")
+        else:
+            try:
+                ok, value = run_with_timeout(functools.partial(_capture_call, self.function, arguments), timeout)
+            except TimeoutError as e:
+                raise ToolTimeoutError(f"Tool '{self.name}' {e}")
+        if not ok:
+            raise value
+        return value
+    
+    async def acall(self, arguments: Dict[str, Any], timeout: Optional[float] = None) -> Any:
+        """Execute the tool without blocking the event loop, giving up after a timeout
+        
+        Args:
+            arguments: Arguments to pass to the tool function
+            timeout: Seconds the call may take (None for no limit)
+            
+        Returns:
+            Result of the tool execution
+            
+        Raises:
+            ToolTimeoutError: If the call did not finish in time (async tools are
+                cancelled; exceptions raised by the tool itself propagate unchanged)
+        """
+        if self.executor is not None:
+            return await self.executor.arun(self.function, arguments, timeout)
+        if self.is_async:
+            try:
+                ok, value = await asyncio.wait_for(_capture(resolve_async_result(self.function(**arguments))), timeout)
+            except asyncio.TimeoutError:
+                raise ToolTimeoutError(f"Tool '{self.name}' did not finish within {timeout:.3g}s")
+            if not ok:
+                raise value
+            return value
+        
+        # Run in a copy of this context so the turn deadline and tracing span carry over
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, contextvars.copy_context().run, functools.partial(self.call, arguments, timeout)
+        )
     
     def get_schema(self) -> Dict[str, Any]:
         """Get the JSON schema for this tool
         
+        The schema is built on first use and cached; call invalidate_schema
+        after changing the tool's name, description or function.
+        
+        Returns:
+            Tool schema in JSON format suitable for LLM function calling
+        """
+        if self._schema is None:
+            with tracing.span("tool.build_schema", tool=self.name):
+                self._schema = self._build_schema()
+        return self._schema
+    
+    def invalidate_schema(self) -> None:
+        """Discard the cached schema so it is rebuilt on next use"""
+        self._schema = None
+    
+    def _build_schema(self) -> Dict[str, Any]:
+        """Build the JSON schema from the function signature and docstring
+        
         Returns:
             Tool schema in JSON format suitable for LLM function calling
         """
@@ -39,6 +282,7 @@ class Tool:
             "properties": {},
             "required": []
         }
+        doclines = self.function.__doc__.split('\n') if self.function.__doc__ else []
         
         for param_name, param in sig.parameters.items():
             if param.default == inspect.Parameter.empty:
@@ -69,12 +313,10 @@ class Tool:
             
             # Add parameter description from docstring if available
             param_desc = f"Parameter: {param_name}"
-            if self.function.__doc__:
-                doclines = self.function.__doc__.split('\n')
-                for line in doclines:
-                    if f"{param_name}:" in line:
-                        param_desc = line.split(f"{param_name}:")[1].strip()
-                        break
+            for line in doclines:
+                if f"{param_name}:" in line:
+                    param_desc = line.split(f"{param_name}:")[1].strip()
+                    break
             
             parameters["properties"][param_name] = {
                 "type": param_type,
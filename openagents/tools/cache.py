@@ -0,0 +1,180 @@
+"""
+Tool result memoization for OpenAgents framework.
+
+Tools declare whether their results may be reused (Tool.cache: pure, ttl or
+never). Agents given a ToolResultCache look results up by tool name, the
+function behind the tool and canonicalized arguments before executing a
+cacheable tool. One cache can be shared by several agents, so identical calls
+made by any of them run once, while same-named tools backed by different
+functions keep separate results.
+"""
+import copy
+import functools
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+from openagents.tools.base import Tool
+
+# (tool name, function identity, canonicalized arguments)
+ToolCallKey = Tuple[str, str, str]
+
+
+def tool_identity(tool: Tool) -> str:
+    """Get the qualified name of the function behind a tool
+    
+    Args:
+        tool: Tool to identify
+    
+    Returns:
+        Module and qualified name of the function (e.g. "openagents.tools.general.GeneralTools.calculate")
+    """
+    function = tool.function
+    while isinstance(function, functools.partial):
+        function = function.func
+    qualname = getattr(function, "__qualname__", None) or type(function).__qualname__
+    return f"{getattr(function, '__module__', None) or ''}.{qualname}"
+
+
+def tool_call_key(tool_name: str, arguments: Dict[str, Any], identity: str = "") -> ToolCallKey:
+    """Compute the cache key of a tool call
+    
+    Arguments are canonicalized (sorted keys, compact separators), so the same
+    arguments in a different order map to the same key.
+    
+    Args:
+        tool_name: Name of the tool
+        arguments: Arguments of the call
+        identity: Identity of the function behind the tool (see tool_identity)
+    
+    Returns:
+        Key identifying the call
+    """
+    encoded = json.dumps(arguments, sort_keys=True, separators=(",", ":"), default=str)
+    return tool_name, identity, encoded
+
+
+class ToolResultCache:
+    """Bounded LRU of tool results with hit-rate statistics
+    
+    Results are deep-copied on the way in and out, so callers may modify what
+    they get without changing what other callers are given.
+    """
+    
+    def __init__(self, max_entries: int = 1024):
+        """Initialize the cache
+        
+        Args:
+            max_entries: Maximum number of results kept; the least recently
+                used are evicted first
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        self._entries: "OrderedDict[ToolCallKey, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._per_tool: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+    
+    def key_for(self, tool: Tool, arguments: Dict[str, Any]) -> Optional[ToolCallKey]:
+        """Get the cache key of a call, if the tool allows memoization
+        
+        Args:
+            tool: Tool being called
+            arguments: Arguments of the call
+        
+        Returns:
+            The key, or None if the tool's results must not be cached
+        """
+        if not tool.cacheable:
+            return None
+        return tool_call_key(tool.name, arguments, tool_identity(tool))
+    
+    def get(self, key: ToolCallKey) -> Tuple[bool, Any]:
+        """Look up a result
+        
+        Args:
+            key: Key from key_for
+        
+        Returns:
+            (True, copy of the result) on a hit, (False, None) on a miss
+        """
+        tool_name = key[0]
+        now = time.monotonic()
+        with self._lock:
+            counts = self._per_tool.setdefault(tool_name, {"hits": 0, "misses": 0})
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    counts["hits"] += 1
+                    return True, copy.deepcopy(value)
+                del self._entries[key]
+            
+            self.misses += 1
+            counts["misses"] += 1
+            return False, None
+    
+    def put(self, key: ToolCallKey, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a result
+        
+        Args:
+            key: Key from key_for
+            value: Result of the call
+            ttl: Seconds the result stays valid (None for no expiry)
+        """
+        # Keep a private copy so later changes by the caller don't reach the cache
+        value = copy.deepcopy(value)
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def invalidate(self, tool_name: Optional[str] = None) -> None:
+        """Drop cached results
+        
+        Args:
+            tool_name: Only drop results of this tool (None for all)
+        """
+        with self._lock:
+            if tool_name is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k[0] == tool_name]:
+                del self._entries[key]
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics
+        
+        Returns:
+            Dictionary with overall and per-tool hits, misses and hit rates
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "tools": {
+                    name: {
+                        "hits": counts["hits"],
+                        "misses": counts["misses"],
+                        "hit_rate": counts["hits"] / (counts["hits"] + counts["misses"])
+                    }
+                    for name, counts in sorted(self._per_tool.items())
+                }
+            }
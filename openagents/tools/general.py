@@ -6,12 +6,21 @@ import datetime
 import random
 from typing import List, Dict, Any, Optional
 
-from openagents.tools.base import Tool, BaseToolProvider
+from openagents.tools.base import Tool, BaseToolProvider, ToolExecutor, CACHE_PURE, CACHE_TTL
 
 
 class GeneralTools(BaseToolProvider):
     """Provider of general purpose tools"""
     
+    def __init__(self, executor: Optional[ToolExecutor] = None):
+        """Initialize the provider
+        
+        Args:
+            executor: Optional executor (e.g. a SandboxExecutor) that the
+                calculator runs in, so expensive expressions cannot stall the agent
+        """
+        self.executor = executor
+    
     def get_tools(self) -> List[Tool]:
         """Get all general purpose tools
         
@@ -22,7 +31,9 @@ class GeneralTools(BaseToolProvider):
             Tool(
                 name="calculator",
                 description="Evaluate a mathematical expression",
-                function=self.calculate
+                function=self.calculate,
+                cache=CACHE_PURE,
+                executor=self.executor
             ),
             Tool(
                 name="get_current_time",
@@ -37,7 +48,9 @@ class GeneralTools(BaseToolProvider):
             Tool(
                 name="get_weather",
                 description="Get weather information for a location (simulated)",
-                function=self.get_weather
+                function=self.get_weather,
+                cache=CACHE_TTL,
+                cache_ttl=600
             ),
             Tool(
                 name="generate_random_number",
@@ -46,7 +59,8 @@ class GeneralTools(BaseToolProvider):
             )
         ]
     
-    def calculate(self, expression: str) -> str:
+    @staticmethod
+    def calculate(expression: str) -> str:
         """Calculate the result of a mathematical expression
         
         Args:
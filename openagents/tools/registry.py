@@ -2,13 +2,44 @@
 Tool registry for OpenAgents framework.
 """
 from typing import Dict, List, Any, Type, Optional
+import json
 import logging
 
 from openagents.tools.base import BaseToolProvider, Tool
+from openagents.utils import tracing
 
 logger = logging.getLogger(__name__)
 
 
+class ToolSchemas(list):
+    """Read-only snapshot of a registry's tool schemas
+    
+    Carries the registry version it was taken at and lazily caches its
+    JSON encoding so the tools array is serialized once per version.
+    """
+    
+    def __init__(self, schemas: List[Dict[str, Any]], version: int):
+        """Initialize the snapshot
+        
+        Args:
+            schemas: Tool schemas
+            version: Registry version the schemas belong to
+        """
+        super().__init__(schemas)
+        self.version = version
+        self._json: Optional[bytes] = None
+    
+    def to_json(self) -> bytes:
+        """Get the JSON encoding of the tools array
+        
+        Returns:
+            UTF-8 encoded JSON
+        """
+        if self._json is None:
+            self._json = json.dumps(self).encode("utf-8")
+        return self._json
+
+
 class ToolRegistry:
     """Registry for tools that can be used by agents"""
     
@@ -16,6 +47,8 @@ class ToolRegistry:
         """Initialize the tool registry"""
         self.tools: Dict[str, Tool] = {}
         self.providers: List[BaseToolProvider] = []
+        self.version = 0
+        self._snapshot: Optional[ToolSchemas] = None
     
     def register_tool(self, tool: Tool) -> None:
         """Register a single tool
@@ -26,9 +59,28 @@ class ToolRegistry:
         if tool.name in self.tools:
             logger.warning(f"Tool with name '{tool.name}' already registered. Overwriting.")
         
+        # Build the schema now so the turn loop never has to
+        tool.get_schema()
+        
         self.tools[tool.name] = tool
+        self._invalidate()
         logger.debug(f"Registered tool: {tool.name}")
     
+    def unregister_tool(self, name: str) -> Optional[Tool]:
+        """Remove a tool
+        
+        Args:
+            name: Name of the tool
+            
+        Returns:
+            The removed tool, or None if not found
+        """
+        tool = self.tools.pop(name, None)
+        if tool is not None:
+            self._invalidate()
+            logger.debug(f"Unregistered tool: {name}")
+        return tool
+    
     def register_provider(self, provider: BaseToolProvider) -> None:
         """Register a tool provider and all its tools
         
@@ -52,13 +104,22 @@ class ToolRegistry:
         """
         return self.tools.get(name)
     
-    def list_tools(self) -> List[Dict[str, Any]]:
+    def list_tools(self) -> ToolSchemas:
         """List all registered tools in a format suitable for LLM function calling
         
+        The snapshot is shared until a tool is registered or removed, so
+        callers must not modify it.
+        
         Returns:
             List of tool schemas
         """
-        return [tool.get_schema() for tool in self.tools.values()]
+        if self._snapshot is None:
+            with tracing.span("tools.list", tools=len(self.tools), version=self.version):
+                self._snapshot = ToolSchemas(
+                    [tool.get_schema() for tool in self.tools.values()],
+                    self.version
+                )
+        return self._snapshot
     
     def get_tool_names(self) -> List[str]:
         """Get a list of all registered tool names
@@ -67,3 +128,8 @@ class ToolRegistry:
             List of tool names
         """
         return list(self.tools.keys())
+    
+    def _invalidate(self) -> None:
+        """Bump the registry version and drop the cached schema snapshot"""
+        self.version += 1
+        self._snapshot = None
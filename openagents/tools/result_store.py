@@ -0,0 +1,278 @@
+"""
+Large tool result storage for OpenAgents framework.
+
+A tool that returns a large payload (a fetched web page, a database dump)
+would otherwise be copied in full into the conversation and resent with
+every later request. Agents given a ResultStore keep results above a size
+threshold on disk instead, content-addressed by their SHA-256, and put a
+short preview plus a handle into the conversation. The store also provides
+tools the model calls to read slices of a stored result or search it:
+
+    read_result(handle="3f2a...", offset=8000, length=4000)
+    search_result(handle="3f2a...", query="price")
+
+Slices are read through mmap, so only the requested part is loaded.
+"""
+import hashlib
+import logging
+import mmap
+import os
+import re
+import shutil
+import tempfile
+import weakref
+from typing import Dict, List, Any, Optional
+
+from openagents.tools.base import Tool, BaseToolProvider, CACHE_PURE
+
+logger = logging.getLogger(__name__)
+
+_HANDLE_RE = re.compile(r"^[0-9a-f]{16,64}$")
+
+# Tools the model reads stored results with
+RESULT_TOOLS = ("read_result", "search_result")
+
+
+class ResultPreview(str):
+    """Conversation form of a stored result: the preview text, carrying its handle"""
+    
+    def __new__(cls, text: str, handle: str) -> "ResultPreview":
+        preview = super().__new__(cls, text)
+        preview.handle = handle
+        return preview
+
+
+class ResultStore(BaseToolProvider):
+    """Content-addressed on-disk store for large tool results"""
+    
+    def __init__(self,
+                 directory: Optional[str] = None,
+                 threshold: int = 8000,
+                 preview_chars: int = 1500,
+                 handle_length: int = 16):
+        """Initialize the store
+        
+        Args:
+            directory: Directory the results are kept in (defaults to a new
+                temporary directory, deleted when the store is closed or
+                garbage collected)
+            threshold: Results longer than this many characters are stored
+                and replaced by a preview in the conversation
+            preview_chars: Number of leading characters kept as the preview
+            handle_length: Number of hex digits of the SHA-256 used as handle
+        """
+        if preview_chars >= threshold:
+            raise ValueError("preview_chars must be smaller than threshold")
+        
+        self.directory = directory or tempfile.mkdtemp(prefix="openagents-results-")
+        os.makedirs(self.directory, exist_ok=True)
+        self.threshold = threshold
+        self.preview_chars = preview_chars
+        self.handle_length = handle_length
+        
+        # Only a directory the store created itself is removed
+        self._finalizer = None
+        if directory is None:
+            self._finalizer = weakref.finalize(self, shutil.rmtree, self.directory, True)
+    
+    def close(self) -> None:
+        """Delete the store's temporary directory, if it created one
+        
+        Handles from the store cannot be read afterwards.
+        """
+        if self._finalizer is not None:
+            self._finalizer()
+    
+    def __enter__(self) -> "ResultStore":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+    
+    def put(self, text: str) -> str:
+        """Store a text, once per distinct content
+        
+        Args:
+            text: Text to store
+        
+        Returns:
+            Handle of the stored text
+        """
+        data = text.encode("utf-8")
+        handle = hashlib.sha256(data).hexdigest()[:self.handle_length]
+        path = self._path(handle)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temporary file first so readers never see a partial result
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        return handle
+    
+    def size(self, handle: str) -> int:
+        """Get the size of a stored text
+        
+        Args:
+            handle: Handle from put
+        
+        Returns:
+            Size in bytes of its UTF-8 encoding
+        """
+        return os.path.getsize(self._existing_path(handle))
+    
+    def read(self, handle: str, offset: int = 0, length: Optional[int] = None) -> str:
+        """Read a slice of a stored text
+        
+        Offsets count bytes of the UTF-8 encoding (the same as characters for
+        ASCII text); a multi-byte character cut by the slice is dropped.
+        
+        Args:
+            handle: Handle from put
+            offset: Start of the slice
+            length: Length of the slice (None for the rest of the text)
+        
+        Returns:
+            The slice
+        """
+        path = self._existing_path(handle)
+        offset = max(0, offset)
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return ""
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                end = len(view) if length is None else min(len(view), offset + max(0, length))
+                return view[offset:end].decode("utf-8", errors="ignore")
+    
+    def search(self, handle: str, query: str, max_matches: int = 10, context: int = 100) -> List[Dict[str, Any]]:
+        """Find occurrences of a text in a stored text
+        
+        Args:
+            handle: Handle from put
+            query: Text to look for (case-sensitive)
+            max_matches: Maximum number of matches returned
+            context: Bytes of surrounding text included with each match
+        
+        Returns:
+            Matches as dictionaries with offset and snippet
+        """
+        path = self._existing_path(handle)
+        needle = query.encode("utf-8")
+        matches = []
+        if not needle:
+            return matches
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return matches
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                position = view.find(needle)
+                while position != -1 and len(matches) < max_matches:
+                    start = max(0, position - context)
+                    end = min(len(view), position + len(needle) + context)
+                    matches.append({
+                        "offset": position,
+                        "snippet": view[start:end].decode("utf-8", errors="ignore")
+                    })
+                    position = view.find(needle, position + len(needle))
+        return matches
+    
+    def compact(self, tool_name: str, text: str) -> str:
+        """Get the conversation form of a tool result
+        
+        Args:
+            tool_name: Name of the tool that produced the result
+            text: Full result text
+        
+        Returns:
+            The text itself if it is within the threshold, otherwise a
+            ResultPreview with the handle to read the rest
+        """
+        if len(text) <= self.threshold:
+            return text
+        
+        handle = self.put(text)
+        size = self.size(handle)
+        logger.debug(f"Stored {size} byte result of {tool_name} as {handle}")
+        return ResultPreview(
+            f"[Result of {tool_name} is {size} bytes, stored as handle \"{handle}\". "
+            f"First {self.preview_chars} characters:]\n"
+            f"{text[:self.preview_chars]}\n"
+            f"[Truncated. Use read_result(handle=\"{handle}\", offset=..., length=...) "
+            f"to read more, or search_result(handle=\"{handle}\", query=...) to find text in it.]",
+            handle
+        )
+    
+    def get_tools(self) -> List[Tool]:
+        """Get the tools that let the model read stored results
+        
+        Returns:
+            The read_result and search_result tools
+        """
+        return [
+            Tool(
+                name="read_result",
+                description="Read part of a large tool result that was stored under a handle",
+                function=self.read_result,
+                cache=CACHE_PURE
+            ),
+            Tool(
+                name="search_result",
+                description="Find text in a large tool result that was stored under a handle",
+                function=self.search_result,
+                cache=CACHE_PURE
+            )
+        ]
+    
+    def read_result(self, handle: str, offset: int = 0, length: int = 4000) -> str:
+        """Read part of a stored tool result
+        
+        Args:
+            handle: Handle of the stored result
+            offset: Byte offset to start reading at
+            length: Number of bytes to read
+        
+        Returns:
+            The requested part of the result
+        """
+        try:
+            size = self.size(handle)
+        except (ValueError, FileNotFoundError) as e:
+            return f"Error: {str(e)}"
+        
+        # Keep slices small enough that they are not stored again
+        length = max(0, min(length, self.threshold - 200))
+        text = self.read(handle, offset, length)
+        end = min(size, offset + length)
+        return f"[Bytes {offset}-{end} of {size}]\n{text}"
+    
+    def search_result(self, handle: str, query: str) -> str:
+        """Find text in a stored tool result
+        
+        Args:
+            handle: Handle of the stored result
+            query: Text to look for (case-sensitive)
+        
+        Returns:
+            Byte offsets of the matches with surrounding text
+        """
+        try:
+            matches = self.search(handle, query)
+        except (ValueError, FileNotFoundError) as e:
+            return f"Error: {str(e)}"
+        
+        if not matches:
+            return f"No matches for '{query}'"
+        return "\n".join(f"[offset {m['offset']}] ...{m['snippet']}..." for m in matches)
+    
+    def _path(self, handle: str) -> str:
+        """File path of a handle"""
+        if not _HANDLE_RE.match(handle):
+            raise ValueError(f"Invalid result handle '{handle}'")
+        return os.path.join(self.directory, handle[:2], handle)
+    
+    def _existing_path(self, handle: str) -> str:
+        """File path of a handle that must have been stored"""
+        path = self._path(handle)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No stored result with handle '{handle}'")
+        return path
@@ -0,0 +1,233 @@
+"""
+Tool retrieval for OpenAgents framework.
+
+Large registries make every request carry every tool schema. A ToolSelector
+ranks tools against the user's input with a BM25 index over tool names,
+descriptions and parameter descriptions (optionally blended with embedding
+similarity) and sends only the top-k tools plus a pinned set.
+"""
+import logging
+import math
+import re
+from collections import Counter, OrderedDict
+from typing import Dict, List, Any, Callable, Optional, Sequence, Tuple
+
+from openagents.tools.registry import ToolRegistry, ToolSchemas
+from openagents.utils.helpers import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase alphanumeric terms (snake_case names split on '_')
+    
+    Args:
+        text: Text to tokenize
+    
+    Returns:
+        List of terms
+    """
+    return _TOKEN_RE.findall(text.lower())
+
+
+class BM25Index:
+    """Okapi BM25 index over a small set of named documents"""
+    
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """Initialize the index
+        
+        Args:
+            k1: Term frequency saturation parameter
+            b: Document length normalization parameter
+        """
+        self.k1 = k1
+        self.b = b
+        self.doc_terms: Dict[str, Counter] = {}
+        self.doc_lengths: Dict[str, int] = {}
+        self.idf: Dict[str, float] = {}
+        self.avg_length = 0.0
+    
+    def build(self, documents: Dict[str, str]) -> None:
+        """Index a set of documents, replacing any previous contents
+        
+        Args:
+            documents: Mapping of document name to text
+        """
+        self.doc_terms = {name: Counter(tokenize(text)) for name, text in documents.items()}
+        self.doc_lengths = {name: sum(terms.values()) for name, terms in self.doc_terms.items()}
+        self.avg_length = (sum(self.doc_lengths.values()) / len(self.doc_lengths)) if self.doc_lengths else 0.0
+        
+        doc_freq: Counter = Counter()
+        for terms in self.doc_terms.values():
+            doc_freq.update(terms.keys())
+        
+        n = len(self.doc_terms)
+        self.idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for term, df in doc_freq.items()
+        }
+    
+    def score(self, query: str) -> Dict[str, float]:
+        """Score every document against a query
+        
+        Args:
+            query: Query text
+        
+        Returns:
+            Mapping of document name to BM25 score
+        """
+        query_terms = [term for term in tokenize(query) if term in self.idf]
+        scores = {}
+        
+        for name, terms in self.doc_terms.items():
+            length_norm = 1 - self.b + self.b * self.doc_lengths[name] / (self.avg_length or 1)
+            score = 0.0
+            for term in query_terms:
+                tf = terms.get(term, 0)
+                if tf:
+                    score += self.idf[term] * tf * (self.k1 + 1) / (tf + self.k1 * length_norm)
+            scores[name] = score
+        
+        return scores
+
+
+class ToolSelector:
+    """Selects the tools most relevant to a request from a ToolRegistry"""
+    
+    def __init__(self,
+                 registry: ToolRegistry,
+                 top_k: int = 5,
+                 pinned: Optional[Sequence[str]] = None,
+                 embed_fn: Optional[Callable[[List[str]], List[List[float]]]] = None,
+                 embedding_weight: float = 0.5,
+                 max_cached_subsets: int = 64):
+        """Initialize the selector
+        
+        Args:
+            registry: Registry to select tools from
+            top_k: Number of ranked tools to send (pinned tools are added on top)
+            pinned: Names of tools that are always sent
+            embed_fn: Optional function mapping a list of texts to embedding vectors
+            embedding_weight: Weight of embedding similarity versus BM25 when embed_fn is set
+            max_cached_subsets: Number of distinct tool subsets whose snapshots are kept
+        """
+        self.registry = registry
+        self.top_k = top_k
+        self.pinned = list(pinned or [])
+        self.embed_fn = embed_fn
+        self.embedding_weight = embedding_weight
+        self.max_cached_subsets = max_cached_subsets
+        
+        self.index = BM25Index()
+        self.last_stats: Dict[str, int] = {}
+        self.total_tokens_saved = 0
+        
+        self._indexed_version: Optional[int] = None
+        self._full_tokens = 0
+        self._tool_embeddings: Dict[str, List[float]] = {}
+        self._subsets: "OrderedDict[Tuple[str, ...], ToolSchemas]" = OrderedDict()
+    
+    def select(self, query: str) -> ToolSchemas:
+        """Select the tools to send with a request
+        
+        Args:
+            query: Text to rank tools against (usually the user's input)
+        
+        Returns:
+            Schemas of the pinned tools followed by the top-k ranked tools
+        """
+        all_tools = self.registry.list_tools()
+        self._refresh(all_tools)
+        
+        if len(all_tools) <= self.top_k + len(self.pinned):
+            self._record_stats(all_tools, all_tools)
+            return all_tools
+        
+        scores = self._score(query)
+        pinned = [name for name in self.pinned if name in self.registry.tools]
+        ranked = sorted(
+            (name for name in scores if name not in pinned),
+            key=lambda name: scores[name],
+            reverse=True
+        )
+        names = tuple(pinned + ranked[:self.top_k])
+        
+        selected = self._subsets.get(names)
+        if selected is None:
+            by_name = {schema["function"]["name"]: schema for schema in all_tools}
+            selected = ToolSchemas([by_name[name] for name in names], all_tools.version)
+            self._subsets[names] = selected
+            while len(self._subsets) > self.max_cached_subsets:
+                self._subsets.popitem(last=False)
+        else:
+            self._subsets.move_to_end(names)
+        
+        self._record_stats(all_tools, selected)
+        return selected
+    
+    def _refresh(self, all_tools: ToolSchemas) -> None:
+        """Rebuild the index if the registry changed since it was built"""
+        if self._indexed_version == all_tools.version:
+            return
+        
+        documents = {schema["function"]["name"]: self._document(schema) for schema in all_tools}
+        self.index.build(documents)
+        self._subsets.clear()
+        
+        if self.embed_fn is not None:
+            names = list(documents)
+            vectors = self.embed_fn([documents[name] for name in names])
+            self._tool_embeddings = dict(zip(names, vectors))
+        
+        self._full_tokens = estimate_tokens(all_tools.to_json().decode("utf-8"))
+        self._indexed_version = all_tools.version
+        logger.debug(f"Indexed {len(documents)} tools for retrieval")
+    
+    def _score(self, query: str) -> Dict[str, float]:
+        """Score every tool against a query"""
+        scores = self.index.score(query)
+        if self.embed_fn is None or not scores:
+            return scores
+        
+        # Blend max-normalized BM25 with cosine similarity
+        top = max(scores.values()) or 1.0
+        query_vector = self.embed_fn([query])[0]
+        return {
+            name: (1 - self.embedding_weight) * score / top
+            + self.embedding_weight * _cosine(query_vector, self._tool_embeddings.get(name, []))
+            for name, score in scores.items()
+        }
+    
+    def _record_stats(self, all_tools: ToolSchemas, selected: ToolSchemas) -> None:
+        """Record how many prompt tokens the selection saved"""
+        full_tokens = self._full_tokens
+        selected_tokens = estimate_tokens(selected.to_json().decode("utf-8"))
+        self.last_stats = {
+            "tools_total": len(all_tools),
+            "tools_selected": len(selected),
+            "prompt_tokens_full": full_tokens,
+            "prompt_tokens_selected": selected_tokens,
+            "prompt_tokens_saved": full_tokens - selected_tokens
+        }
+        self.total_tokens_saved += full_tokens - selected_tokens
+    
+    @staticmethod
+    def _document(schema: Dict[str, Any]) -> str:
+        """Build the indexed text for a tool schema"""
+        function = schema["function"]
+        parts = [function["name"], function.get("description", "")]
+        for param_name, param in function.get("parameters", {}).get("properties", {}).items():
+            parts.append(param_name)
+            parts.append(param.get("description", ""))
+        return " ".join(parts)
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    """Cosine similarity of two vectors (0.0 if either is empty)"""
+    if not a or not b:
+        return 0.0
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
@@ -0,0 +1,396 @@
+"""
+Process-pool sandboxed tool execution for OpenAgents framework.
+
+Tools normally run inline on the agent's thread, so a CPU-heavy call (say
+calculator("factorial(100000)")) holds the GIL and stalls the agent, and a
+runaway or hostile one can take the whole process down. A SandboxExecutor
+runs the functions of selected tools in a pool of warm worker processes:
+
+    sandbox = SandboxExecutor(workers=2, timeout=10, memory_limit=512 * 1024 * 1024)
+    registry.register_tool(sandbox.wrap(Tool("crunch", "Crunch numbers", crunch)))
+
+Each call has a wall-clock timeout; a worker that does not answer in time is
+killed and replaced, as is one that crashes. Memory (address space) and CPU
+time are capped with resource limits where the platform supports them. Large
+results come back through shared memory instead of the worker's pipe.
+
+Functions are sent to the workers by pickling, so they must be importable:
+module-level functions, static methods, or methods of picklable objects.
+Requires Python 3.8+ (multiprocessing.shared_memory); the openagents package
+only imports this module when SandboxExecutor is first used.
+"""
+import asyncio
+import importlib
+import inspect
+import logging
+import math
+import multiprocessing
+import pickle
+import queue
+import signal
+import threading
+import traceback
+from dataclasses import replace
+from multiprocessing import shared_memory
+from typing import Dict, Any, Callable, List, Optional, Sequence
+
+from openagents.tools.base import Tool, ToolExecutor, ToolTimeoutError, resolve_async_result
+
+logger = logging.getLogger(__name__)
+
+
+class ToolExecutionError(RuntimeError):
+    """A sandboxed tool call failed or its worker process died
+    
+    Attributes:
+        remote_traceback: Traceback from the worker, if the function raised
+    """
+    
+    def __init__(self, message: str, remote_traceback: Optional[str] = None):
+        super().__init__(message)
+        self.remote_traceback = remote_traceback
+
+
+class CpuTimeExceeded(Exception):
+    """Raised inside a worker when a call uses up its CPU time"""
+
+
+def _load_resource() -> Any:
+    """Import the resource module (POSIX only)"""
+    try:
+        import resource
+        return resource
+    except ImportError:
+        return None
+
+
+def _on_cpu_limit(signum, frame):
+    raise CpuTimeExceeded("CPU time limit exceeded")
+
+
+def _set_cpu_limit(resource: Any, seconds: Optional[float]) -> None:
+    """Allow the worker `seconds` more CPU time from now (None for no limit)"""
+    if resource is None:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if seconds is None:
+        soft = hard
+    else:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        soft = math.ceil(usage.ru_utime + usage.ru_stime + seconds)
+        if hard != resource.RLIM_INFINITY:
+            soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _worker_main(conn: Any,
+                 memory_limit: Optional[int],
+                 cpu_limit: Optional[float],
+                 shm_threshold: int,
+                 preload: Sequence[str]) -> None:
+    """Serve calls from the parent until the pipe closes"""
+    # Interrupts are the parent's to handle; it stops the workers itself
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    
+    # Import tool modules up front so the first call does not pay for it
+    for module in preload:
+        try:
+            importlib.import_module(module)
+        except Exception as e:
+            logger.warning(f"Tool worker could not preload {module}: {e}")
+    
+    resource = _load_resource()
+    if resource is not None:
+        if memory_limit is not None:
+            _, hard = resource.getrlimit(resource.RLIMIT_AS)
+            resource.setrlimit(resource.RLIMIT_AS, (memory_limit, hard))
+        if cpu_limit is not None:
+            signal.signal(signal.SIGXCPU, _on_cpu_limit)
+    
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            return
+        if request is None:
+            return
+        
+        function, arguments = request
+        try:
+            if cpu_limit is not None:
+                _set_cpu_limit(resource, cpu_limit)
+            try:
+                result = function(**arguments)
+                if inspect.isawaitable(result) or inspect.isasyncgen(result):
+                    result = asyncio.run(resolve_async_result(result))
+            finally:
+                if cpu_limit is not None:
+                    _set_cpu_limit(resource, None)
+            payload = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+            del result
+            
+            if len(payload) >= shm_threshold:
+                block = shared_memory.SharedMemory(create=True, size=len(payload))
+                block.buf[:len(payload)] = payload
+                reply = ("shm", block.name, len(payload))
+                # The parent unlinks the block once it has read it
+                block.close()
+            else:
+                reply = ("ok", payload)
+        except Exception as e:
+            message = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+            reply = ("error", message, traceback.format_exc())
+        
+        try:
+            conn.send(reply)
+        except (EOFError, OSError):
+            return
+
+
+class _Worker:
+    """A worker process and the parent's end of its pipe"""
+    
+    def __init__(self, context: Any, args: tuple):
+        parent_conn, child_conn = context.Pipe()
+        self.conn = parent_conn
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn,) + args,
+            name="openagents-tool-worker",
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.calls = 0
+    
+    def stop(self, kill: bool = False) -> None:
+        """Stop the process, politely unless kill is set"""
+        if not kill and self.process.is_alive():
+            try:
+                self.conn.send(None)
+            except (EOFError, OSError):
+                pass
+            self.process.join(1.0)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(1.0)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class SandboxExecutor(ToolExecutor):
+    """Runs tool functions in a pool of warm, resource-limited worker processes"""
+    
+    def __init__(self,
+                 workers: int = 2,
+                 timeout: Optional[float] = 30.0,
+                 memory_limit: Optional[int] = None,
+                 cpu_limit: Optional[float] = None,
+                 shm_threshold: int = 1024 * 1024,
+                 preload: Sequence[str] = ("openagents.tools.general",),
+                 start_method: Optional[str] = None):
+        """Initialize the executor and start its workers
+        
+        Args:
+            workers: Number of worker processes (calls beyond this wait for a free worker)
+            timeout: Default wall-clock seconds per call (None for no limit)
+            memory_limit: Address-space limit of each worker in bytes (None for no limit)
+            cpu_limit: CPU seconds each call may use (None for no limit). The
+                resource limit counts whole seconds, so fractions are rounded up.
+                It is checked between Python bytecodes, so long native calls are
+                stopped by the timeout instead
+            shm_threshold: Results whose pickle is at least this many bytes are
+                returned through shared memory
+            preload: Modules each worker imports when it starts, so the
+                first calls to their tools are not slowed by imports
+            start_method: multiprocessing start method (defaults to forkserver
+                where available, otherwise spawn; both are safe with threads)
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if cpu_limit is not None and cpu_limit <= 0:
+            raise ValueError("cpu_limit must be positive")
+        if (memory_limit is not None or cpu_limit is not None) and _load_resource() is None:
+            logger.warning("resource module not available. Sandbox memory and CPU limits are not enforced.")
+        
+        if start_method is None:
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        
+        self.workers = workers
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.cpu_limit = cpu_limit
+        self.shm_threshold = shm_threshold
+        self.preload = tuple(preload)
+        
+        self.calls = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.replacements = 0
+        self.shm_transfers = 0
+        
+        self._context = multiprocessing.get_context(start_method)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._all: List[_Worker] = []
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        for _ in range(workers):
+            self._idle.put(self._spawn())
+    
+    def wrap(self, tool: Tool) -> Tool:
+        """Get a copy of a tool that runs in this sandbox
+        
+        Args:
+            tool: Tool to sandbox
+        
+        Returns:
+            The sandboxed tool
+        """
+        return replace(tool, executor=self)
+    
+    def run(self, function: Callable, arguments: Dict[str, Any], timeout: Optional[float] = None) -> Any:
+        """Run a tool function in a worker process
+        
+        Args:
+            function: Picklable tool function
+            arguments: Keyword arguments for the function
+            timeout: Wall-clock seconds for this call (defaults to the executor's timeout)
+        
+        Returns:
+            Result of the function
+        
+        Raises:
+            ToolTimeoutError: If the call did not finish in time (its worker is replaced)
+            ToolExecutionError: If the function raised, or its worker died
+        """
+        if timeout is None:
+            timeout = self.timeout
+        worker = self._checkout()
+        # Whether the pipe is free of a pending answer, so the worker can be reused
+        answered = True
+        try:
+            with self._lock:
+                self.calls += 1
+            worker.calls += 1
+            try:
+                worker.conn.send((function, arguments))
+            except Exception as e:
+                # Pickling fails before anything is written; a dead worker is replaced on checkin
+                raise ToolExecutionError(f"Tool call cannot be sent to a worker: {e}")
+            answered = False
+            
+            if not worker.conn.poll(timeout):
+                with self._lock:
+                    self.timeouts += 1
+                raise ToolTimeoutError(f"Tool call timed out after {timeout:.3g}s")
+            
+            try:
+                reply = worker.conn.recv()
+            except (EOFError, OSError):
+                worker.process.join(1.0)
+                with self._lock:
+                    self.failures += 1
+                raise ToolExecutionError(f"Tool worker died (exit code {worker.process.exitcode})")
+            answered = True
+        finally:
+            self._checkin(worker, answered)
+        
+        return self._decode(reply)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get executor statistics
+        
+        Returns:
+            Dictionary with worker count, calls, timeouts, failures, worker
+            replacements and shared-memory transfers
+        """
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "idle_workers": self._idle.qsize(),
+                "calls": self.calls,
+                "timeouts": self.timeouts,
+                "failures": self.failures,
+                "replacements": self.replacements,
+                "shm_transfers": self.shm_transfers
+            }
+    
+    def close(self) -> None:
+        """Stop all workers"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            workers = list(self._all)
+            self._all.clear()
+        for worker in workers:
+            worker.stop()
+    
+    def __enter__(self) -> "SandboxExecutor":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+    
+    def _spawn(self) -> _Worker:
+        """Start a worker and track it"""
+        worker = _Worker(self._context, (self.memory_limit, self.cpu_limit, self.shm_threshold, self.preload))
+        with self._lock:
+            self._all.append(worker)
+        return worker
+    
+    def _checkout(self) -> _Worker:
+        """Wait for an idle worker"""
+        while True:
+            if self._closed:
+                raise RuntimeError("SandboxExecutor is closed")
+            try:
+                return self._idle.get(timeout=0.5)
+            except queue.Empty:
+                continue
+    
+    def _checkin(self, worker: _Worker, healthy: bool) -> None:
+        """Return a worker to the pool, replacing it if it cannot be reused"""
+        if healthy and worker.process.is_alive():
+            self._idle.put(worker)
+            return
+        
+        with self._lock:
+            if worker in self._all:
+                self._all.remove(worker)
+            closed = self._closed
+        worker.stop(kill=True)
+        if closed:
+            return
+        
+        logger.warning(f"Replacing tool worker {worker.process.pid} after {worker.calls} calls")
+        with self._lock:
+            self.replacements += 1
+        self._idle.put(self._spawn())
+    
+    def _decode(self, reply: tuple) -> Any:
+        """Turn a worker's reply into the result, or raise its error"""
+        kind = reply[0]
+        if kind == "ok":
+            return pickle.loads(reply[1])
+        if kind == "shm":
+            _, name, size = reply
+            block = shared_memory.SharedMemory(name=name)
+            try:
+                view = block.buf[:size]
+                try:
+                    return pickle.loads(view)
+                finally:
+                    view.release()
+            finally:
+                block.close()
+                block.unlink()
+                with self._lock:
+                    self.shm_transfers += 1
+        
+        _, message, remote_traceback = reply
+        with self._lock:
+            self.failures += 1
+        raise ToolExecutionError(message, remote_traceback)
@@ -0,0 +1,235 @@
+"""
+Turn deadlines for OpenAgents framework.
+
+A caller gives a turn a time budget:
+
+    with deadline.budget(30):
+        ...  # LLM calls and tools see deadline.remaining()
+
+The deadline (a time.monotonic() value) lives in a context variable, so it
+follows the turn into LLM wrappers, tool threads and async tasks without
+being passed around. Nested budgets can only shorten it. LLM clients cap
+their request timeouts with remaining(), and agents cap each tool call.
+"""
+import concurrent.futures
+import contextvars
+import functools
+import queue
+import threading
+import time
+from typing import Any, Callable, Optional
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("openagents_deadline", default=None)
+
+
+class _Budget:
+    """Context manager that sets a deadline for its block"""
+    __slots__ = ("seconds", "_token")
+    
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self._token = None
+    
+    def __enter__(self) -> float:
+        current = _deadline.get()
+        new = time.monotonic() + max(0.0, self.seconds)
+        if current is not None:
+            new = min(new, current)
+        self._token = _deadline.set(new)
+        return new
+    
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        try:
+            _deadline.reset(self._token)
+        except ValueError:
+            # Ended in another context (e.g. a generator closed elsewhere)
+            pass
+        return False
+
+
+class _NoBudget:
+    """Stand-in returned by budget(None): keeps the enclosing deadline"""
+    __slots__ = ()
+    
+    def __enter__(self) -> Optional[float]:
+        return _deadline.get()
+    
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NO_BUDGET = _NoBudget()
+
+
+def budget(seconds: Optional[float]) -> Any:
+    """Limit the code in a with block to a time budget
+    
+    Entering the block yields the effective deadline (a time.monotonic()
+    value), or None if it is unbounded.
+    
+    Args:
+        seconds: Seconds from now (None to keep the enclosing deadline, if any)
+    
+    Returns:
+        Context manager setting the deadline
+    """
+    if seconds is None:
+        return _NO_BUDGET
+    return _Budget(seconds)
+
+
+def current() -> Optional[float]:
+    """Get the deadline in effect
+    
+    Returns:
+        time.monotonic() value, or None if there is no deadline
+    """
+    return _deadline.get()
+
+
+def remaining() -> Optional[float]:
+    """Get the time left before the deadline
+    
+    Returns:
+        Seconds left (0.0 once the deadline has passed), or None if there is no deadline
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def expired() -> bool:
+    """Whether the deadline in effect has passed
+    
+    Returns:
+        True if there is a deadline and it has passed
+    """
+    deadline = _deadline.get()
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def cap(timeout: Optional[float]) -> Optional[float]:
+    """Limit a timeout to the time left before the deadline
+    
+    Args:
+        timeout: Timeout in seconds (None for no limit of its own)
+    
+    Returns:
+        The smaller of the timeout and the remaining time, or None if neither is set
+    """
+    left = remaining()
+    if left is None:
+        return timeout
+    if timeout is None:
+        return left
+    return min(timeout, left)
+
+
+# Worker threads shared by run_with_timeout, and how many of them may be stuck
+# in calls that overran before further calls are refused
+TIMED_CALL_WORKERS = 32
+MAX_ABANDONED_CALLS = 16
+
+
+class _TimedCallPool:
+    """Bounded pool of daemon threads that run_with_timeout runs calls in
+    
+    Unlike ThreadPoolExecutor's workers, daemon threads do not hold up
+    interpreter exit when a call they run never returns.
+    """
+    
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self.abandoned = 0
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._idle = threading.Semaphore(0)
+        self._lock = threading.Lock()
+        self._workers = 0
+    
+    def submit(self, function: Callable[[], Any]) -> concurrent.futures.Future:
+        """Queue a call, starting a worker if none is idle and the pool is not full"""
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        self._queue.put((future, function))
+        if not self._idle.acquire(blocking=False):
+            with self._lock:
+                if self._workers < self.max_workers:
+                    self._workers += 1
+                    threading.Thread(
+                        target=self._work, name=f"openagents-timed-call-{self._workers}", daemon=True
+                    ).start()
+        return future
+    
+    def abandon(self, future: concurrent.futures.Future) -> None:
+        """Count a call that overran until it finishes"""
+        with self._lock:
+            self.abandoned += 1
+        future.add_done_callback(self._finished_abandoned)
+    
+    def _finished_abandoned(self, future: concurrent.futures.Future) -> None:
+        with self._lock:
+            self.abandoned -= 1
+    
+    def _work(self) -> None:
+        """Worker body: run queued calls forever"""
+        while True:
+            future, function = self._queue.get()
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(function())
+                except BaseException as e:
+                    future.set_exception(e)
+            self._idle.release()
+
+
+_timed_call_pool: Optional[_TimedCallPool] = None
+_timed_call_pool_lock = threading.Lock()
+
+
+def _get_timed_call_pool() -> _TimedCallPool:
+    """Get the process-wide pool for run_with_timeout, creating it on first use"""
+    global _timed_call_pool
+    with _timed_call_pool_lock:
+        if _timed_call_pool is None:
+            _timed_call_pool = _TimedCallPool(TIMED_CALL_WORKERS)
+        return _timed_call_pool
+
+
+def run_with_timeout(function: Callable[[], Any], timeout: Optional[float]) -> Any:
+    """Run a blocking function, giving up on it after a timeout
+    
+    The function runs on a shared pool of daemon threads (in a copy of the
+    caller's context) so that the caller can stop waiting. Threads cannot be
+    killed: a function that overruns keeps its thread until it returns, and
+    its result is dropped. Once MAX_ABANDONED_CALLS such calls are still
+    running, further calls fail immediately instead of piling up.
+    
+    Args:
+        function: Function to call without arguments
+        timeout: Seconds to wait (None to call the function directly)
+    
+    Returns:
+        Result of the function
+    
+    Raises:
+        TimeoutError: If the function did not finish in time, or was not
+            started because too many earlier calls overran
+    """
+    if timeout is None:
+        return function()
+    
+    pool = _get_timed_call_pool()
+    if pool.abandoned >= MAX_ABANDONED_CALLS:
+        raise TimeoutError(f"was not started: {pool.abandoned} earlier timed-out calls are still running")
+    
+    future = pool.submit(functools.partial(contextvars.copy_context().run, function))
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        if future.done():
+            # The function itself raised a timeout
+            raise
+        if not future.cancel():
+            # Already running: it finishes in the background
+            pool.abandon(future)
+        raise TimeoutError(f"did not finish within {timeout:.3g}s")
@@ -58,6 +58,21 @@ def truncate_text(text: str, max_length: int = 100) -> str:
     return text[:max_length] + "..."
 
 
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in a text
+    
+    Uses the common ~4 characters per token heuristic, which is close enough
+    for budgeting without loading a tokenizer.
+    
+    Args:
+        text: Text to estimate
+        
+    Returns:
+        Estimated token count
+    """
+    return (len(text) + 3) // 4
+
+
 def get_memory_usage() -> Dict[str, float]:
     """Get current memory usage
     
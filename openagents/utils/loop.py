@@ -0,0 +1,135 @@
+"""
+Managed background event loop for OpenAgents framework.
+
+Synchronous code (Agent.process_input, Tool.execute) uses it to run
+coroutines, such as async tools, without starting an event loop per call:
+one daemon thread runs a loop forever, and coroutines submitted from any
+thread run there concurrently.
+"""
+import asyncio
+import concurrent.futures
+import contextvars
+import threading
+from typing import Any, Coroutine, Optional
+
+
+class BackgroundLoop:
+    """An event loop running in a daemon thread"""
+    
+    def __init__(self, name: str = "openagents-loop"):
+        """Start the loop
+        
+        Args:
+            name: Name of the loop's thread
+        """
+        self.loop = asyncio.new_event_loop()
+        self._started = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        self._started.wait()
+    
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        """Schedule a coroutine on the loop
+        
+        The coroutine runs in a copy of the caller's context, so context
+        variables (e.g. the current tracing span) carry over.
+        
+        Args:
+            coro: Coroutine to run
+        
+        Returns:
+            Future of the coroutine's result
+        """
+        if self.loop.is_closed():
+            coro.close()
+            raise RuntimeError("Background loop is closed")
+        
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        context = contextvars.copy_context()
+        self.loop.call_soon_threadsafe(context.run, self._start, coro, future)
+        return future
+    
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the loop and wait for its result
+        
+        Args:
+            coro: Coroutine to run
+            timeout: Seconds to wait (None to wait indefinitely); on timeout the
+                coroutine is cancelled
+        
+        Returns:
+            Result of the coroutine
+        
+        Raises:
+            RuntimeError: If called from the loop's own thread, which would deadlock
+            concurrent.futures.TimeoutError: If the timeout expires
+        """
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("Cannot block on the background loop from inside it; await instead")
+        
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+    
+    def close(self) -> None:
+        """Stop the loop and its thread"""
+        if self.loop.is_closed():
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+    
+    def _run(self) -> None:
+        """Thread body: run the loop until stopped"""
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(self._started.set)
+        self.loop.run_forever()
+    
+    def _start(self, coro: Coroutine, future: concurrent.futures.Future) -> None:
+        """Create the task for a submitted coroutine (runs on the loop, in the caller's context)"""
+        if future.cancelled():
+            coro.close()
+            return
+        task = self.loop.create_task(coro)
+        
+        def on_future_done(f: concurrent.futures.Future) -> None:
+            # The caller gave up (timeout or cancel): stop the coroutine too
+            if f.cancelled():
+                self.loop.call_soon_threadsafe(task.cancel)
+        
+        def on_task_done(t: "asyncio.Task") -> None:
+            if t.cancelled():
+                future.cancel()
+                return
+            try:
+                if t.exception() is not None:
+                    future.set_exception(t.exception())
+                else:
+                    future.set_result(t.result())
+            except concurrent.futures.InvalidStateError:
+                # Cancelled by the caller meanwhile
+                pass
+        
+        future.add_done_callback(on_future_done)
+        task.add_done_callback(on_task_done)
+
+
+_default_loop: Optional[BackgroundLoop] = None
+_default_loop_lock = threading.Lock()
+
+
+def get_background_loop() -> BackgroundLoop:
+    """Get the process-wide background loop, starting it on first use
+    
+    Returns:
+        The shared loop
+    """
+    global _default_loop
+    with _default_loop_lock:
+        if _default_loop is None or _default_loop.loop.is_closed():
+            _default_loop = BackgroundLoop()
+        return _default_loop
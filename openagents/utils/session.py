@@ -0,0 +1,61 @@
+"""
+Conversation sessions for OpenAgents framework.
+
+An agent binds its session id for the duration of each turn:
+
+    with session.bind(agent.session_id):
+        ...  # LLM calls see session.current()
+
+Providers that route by conversation (BalancedOllamaLLM keeps a session on
+the host that has its prompt cached) read the id instead of deriving one
+from the messages, which would make identical conversations of different
+users collide and would change when old messages are dropped. Like the turn
+deadline, the id lives in a context variable and follows the turn into
+threads and async tasks.
+"""
+import contextvars
+from typing import Optional
+
+_session: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("openagents_session", default=None)
+
+
+class _Binding:
+    """Context manager that sets the session id for its block"""
+    __slots__ = ("session_id", "_token")
+    
+    def __init__(self, session_id: Optional[str]):
+        self.session_id = session_id
+        self._token = None
+    
+    def __enter__(self) -> Optional[str]:
+        self._token = _session.set(self.session_id)
+        return self.session_id
+    
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        try:
+            _session.reset(self._token)
+        except ValueError:
+            # Ended in another context (e.g. a generator closed elsewhere)
+            pass
+        return False
+
+
+def bind(session_id: Optional[str]) -> _Binding:
+    """Identify the conversation that the code in a with block belongs to
+    
+    Args:
+        session_id: Session id (None for no session)
+    
+    Returns:
+        Context manager setting the session id
+    """
+    return _Binding(session_id)
+
+
+def current() -> Optional[str]:
+    """Get the session id in effect
+    
+    Returns:
+        Session id, or None outside a session
+    """
+    return _session.get()
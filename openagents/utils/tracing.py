@@ -0,0 +1,341 @@
+"""
+Lightweight tracing for OpenAgents framework.
+
+Agent turns, LLM calls, tool executions, schema building and request
+serialization are wrapped in spans:
+
+    with tracing.span("tool.execute", tool=name) as s:
+        ...
+        s.set_attribute("result_chars", len(text))
+
+A span records its duration, attributes, error status and parent span, and is
+handed to every registered sink when it ends. Spans nest through contextvars,
+so they follow asyncio tasks. When no sink is registered, span() returns a
+shared no-op object and tracing costs one function call.
+
+Sinks: JSONLSink (one JSON object per line), RingBufferSink (the most recent
+spans, in memory) and OTelSink (forwards to OpenTelemetry; requires the
+opentelemetry-api package).
+"""
+import contextvars
+import json
+import logging
+import random
+import threading
+import time
+from abc import ABC
+from collections import deque
+from typing import Dict, List, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_sinks: Tuple["SpanSink", ...] = ()
+_sinks_lock = threading.Lock()
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("openagents_span", default=None)
+
+
+class SpanSink(ABC):
+    """Receives spans as they start and end"""
+    
+    def on_start(self, span: "Span") -> None:
+        """Called when a span starts
+        
+        Args:
+            span: The started span
+        """
+        pass
+    
+    def on_end(self, span: "Span") -> None:
+        """Called when a span ends
+        
+        Args:
+            span: The finished span
+        """
+        pass
+
+
+class Span:
+    """A timed operation with attributes"""
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_time", "duration",
+                 "attributes", "status", "error", "_started", "_token")
+    
+    def __init__(self, name: str, attributes: Dict[str, Any]):
+        """Initialize the span (it starts when entered)
+        
+        Args:
+            name: Operation name
+            attributes: Initial attributes
+        """
+        self.name = name
+        self.attributes = attributes
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.trace_id = ""
+        self.parent_id: Optional[str] = None
+        self.start_time = 0.0
+        self.duration: Optional[float] = None
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self._started = 0.0
+        self._token = None
+    
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set an attribute
+        
+        Args:
+            key: Attribute name
+            value: Attribute value
+        """
+        self.attributes[key] = value
+    
+    def set_error(self, error: Any) -> None:
+        """Mark the span as failed
+        
+        Args:
+            error: Exception or error message
+        """
+        self.status = "error"
+        self.error = str(error)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dictionary
+        
+        Returns:
+            Dictionary with ids, timing, status and attributes
+        """
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "duration_ms": None if self.duration is None else 1000 * self.duration,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes
+        }
+    
+    def __enter__(self) -> "Span":
+        parent = _current.get()
+        if parent is not None:
+            self.trace_id = parent.trace_id
+            self.parent_id = parent.span_id
+        else:
+            self.trace_id = f"{random.getrandbits(128):032x}"
+        self._token = _current.set(self)
+        self.start_time = time.time()
+        self._started = time.perf_counter()
+        _notify("on_start", self)
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.duration = time.perf_counter() - self._started
+        if exc is not None:
+            self.set_error(exc)
+        try:
+            _current.reset(self._token)
+        except ValueError:
+            # Ended in another context (e.g. a generator closed elsewhere)
+            pass
+        _notify("on_end", self)
+        return False
+
+
+class _NoopSpan:
+    """Stand-in returned by span() while tracing is disabled"""
+    __slots__ = ()
+    
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+    
+    def set_error(self, error: Any) -> None:
+        pass
+    
+    def __enter__(self) -> "_NoopSpan":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name: str, **attributes: Any) -> Any:
+    """Create a span to use as a context manager
+    
+    Args:
+        name: Operation name (e.g. "llm.chat")
+        **attributes: Initial attributes
+    
+    Returns:
+        A Span, or a no-op stand-in if no sink is registered
+    """
+    if not _sinks:
+        return _NOOP_SPAN
+    return Span(name, attributes)
+
+
+def enabled() -> bool:
+    """Whether any sink is registered
+    
+    Returns:
+        True if spans are being recorded
+    """
+    return bool(_sinks)
+
+
+def current_span() -> Optional[Span]:
+    """Get the innermost active span in this context
+    
+    Returns:
+        The span, or None
+    """
+    return _current.get()
+
+
+def add_sink(sink: SpanSink) -> SpanSink:
+    """Register a sink, enabling tracing
+    
+    Args:
+        sink: Sink to register
+    
+    Returns:
+        The sink
+    """
+    global _sinks
+    with _sinks_lock:
+        _sinks = _sinks + (sink,)
+    return sink
+
+
+def remove_sink(sink: SpanSink) -> None:
+    """Unregister a sink (tracing is disabled once none are left)
+    
+    Args:
+        sink: Sink to remove
+    """
+    global _sinks
+    with _sinks_lock:
+        _sinks = tuple(s for s in _sinks if s is not sink)
+
+
+def _notify(method: str, span: Span) -> None:
+    """Pass a span to every sink; a failing sink never breaks the traced code"""
+    for sink in _sinks:
+        try:
+            getattr(sink, method)(span)
+        except Exception as e:
+            logger.warning(f"Tracing sink {type(sink).__name__} failed: {e}")
+
+
+class RingBufferSink(SpanSink):
+    """Keeps the most recent finished spans in memory"""
+    
+    def __init__(self, capacity: int = 1024):
+        """Initialize the buffer
+        
+        Args:
+            capacity: Number of spans kept
+        """
+        self.buffer: "deque[Span]" = deque(maxlen=capacity)
+    
+    def on_end(self, span: Span) -> None:
+        """Store the span"""
+        self.buffer.append(span)
+    
+    def spans(self, name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get the buffered spans, oldest first
+        
+        Args:
+            name: Only return spans with this name
+        
+        Returns:
+            List of span dictionaries
+        """
+        return [s.to_dict() for s in list(self.buffer) if name is None or s.name == name]
+    
+    def clear(self) -> None:
+        """Drop all buffered spans"""
+        self.buffer.clear()
+
+
+class JSONLSink(SpanSink):
+    """Appends finished spans to a file, one JSON object per line"""
+    
+    def __init__(self, path: str):
+        """Initialize the sink
+        
+        Args:
+            path: File to append to
+        """
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+    
+    def on_end(self, span: Span) -> None:
+        """Write the span"""
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+    
+    def close(self) -> None:
+        """Close the file"""
+        with self._lock:
+            self._file.close()
+
+
+class OTelSink(SpanSink):
+    """Forwards spans to OpenTelemetry
+    
+    Each span is mirrored by an OpenTelemetry span with the same name, timing,
+    parent and attributes, so the configured OpenTelemetry exporter (OTLP,
+    Jaeger, console, ...) receives them.
+    """
+    
+    def __init__(self, tracer: Any = None):
+        """Initialize the sink
+        
+        Args:
+            tracer: OpenTelemetry tracer (defaults to one from the global tracer provider)
+        
+        Raises:
+            ImportError: If opentelemetry-api is not installed
+        """
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            raise ImportError("OTelSink requires opentelemetry-api (pip install opentelemetry-sdk)")
+        
+        self._trace = trace
+        self.tracer = tracer or trace.get_tracer("openagents")
+        self._open: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+    
+    def on_start(self, span: Span) -> None:
+        """Start the mirrored OpenTelemetry span"""
+        with self._lock:
+            parent = self._open.get(span.parent_id) if span.parent_id else None
+        context = self._trace.set_span_in_context(parent) if parent is not None else None
+        otel_span = self.tracer.start_span(
+            span.name,
+            context=context,
+            start_time=int(span.start_time * 1e9)
+        )
+        with self._lock:
+            self._open[span.span_id] = otel_span
+    
+    def on_end(self, span: Span) -> None:
+        """Copy attributes and status to the mirrored span and end it"""
+        with self._lock:
+            otel_span = self._open.pop(span.span_id, None)
+        if otel_span is None:
+            return
+        
+        for key, value in span.attributes.items():
+            if value is not None:
+                otel_span.set_attribute(key, value if isinstance(value, (str, bool, int, float)) else str(value))
+        if span.status == "error":
+            from opentelemetry.trace import Status, StatusCode
+            otel_span.set_status(Status(StatusCode.ERROR, span.error))
+        otel_span.end(end_time=int((span.start_time + (span.duration or 0.0)) * 1e9))
@@ -0,0 +1,65 @@
+"""
+Shared fixtures for the OpenAgents tests.
+
+LLM traffic is served by ReplayServer from cassettes written by the tests
+themselves, so no Ollama server is needed.
+"""
+import json
+from typing import Dict, List, Any, Optional
+
+import pytest
+
+from openagents.llm.replay import ReplayServer, cassette_key
+
+MODEL = "test-model"
+
+
+class CassetteWriter:
+    """Writes interactions to a cassette file for a ReplayServer"""
+    
+    def __init__(self, path: str):
+        self.path = path
+    
+    def record(self,
+               messages: List[Dict[str, Any]],
+               content: str = "",
+               tool_calls: Optional[List[Dict[str, Any]]] = None,
+               tools: Optional[List[Dict[str, Any]]] = None,
+               latency: float = 0.0) -> None:
+        """Add the response to a request
+        
+        Args:
+            messages: Messages of the request
+            content: Content of the response
+            tool_calls: Tool calls of the response
+            tools: Tool schemas sent with the request
+            latency: Seconds the response takes with latency="recorded"
+        """
+        interaction = {
+            "key": cassette_key(MODEL, messages, tools),
+            "response": {"content": content, "tool_calls": tool_calls},
+            "latency": latency
+        }
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(interaction) + "\n")
+
+
+@pytest.fixture
+def cassette(tmp_path) -> CassetteWriter:
+    """Empty cassette to record the test's interactions in"""
+    return CassetteWriter(str(tmp_path / "cassette.jsonl"))
+
+
+@pytest.fixture
+def replay_server(cassette):
+    """Factory starting ReplayServers for the cassette, stopped after the test"""
+    servers = []
+    
+    def start(latency: Any = "recorded") -> ReplayServer:
+        server = ReplayServer(cassette.path, latency=latency).start()
+        servers.append(server)
+        return server
+    
+    yield start
+    for server in servers:
+        server.stop()
@@ -0,0 +1,174 @@
+"""
+Tests for admission control: priority queues, rejections and rate limits.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from openagents.llm.admission import AdmissionController, AdmissionRejected, AdmittedLLM
+from openagents.llm.ollama_me import OllamaLLM
+from openagents.utils import deadline
+
+from conftest import MODEL
+
+
+def wait_for_depth(controller: AdmissionController, priority: str, depth: int) -> None:
+    """Wait until a priority class has the given number of queued requests"""
+    while controller.queue_depths()[priority] < depth:
+        time.sleep(0.001)
+
+
+def start_waiter(controller: AdmissionController, priority: str, admitted: list, tenant: str = "default"):
+    """Queue a request on a thread; it records its priority when admitted and releases"""
+    def request():
+        controller.acquire(tenant, priority)
+        admitted.append(priority)
+        controller.release()
+    
+    thread = threading.Thread(target=request)
+    thread.start()
+    return thread
+
+
+def test_admits_immediately_below_the_limit():
+    controller = AdmissionController(max_concurrent=2)
+    
+    controller.acquire()
+    controller.acquire()
+    
+    assert controller.stats()["in_flight"] == 2
+    assert controller.queue_depths() == {"interactive": 0, "batch": 0}
+
+
+def test_free_slot_goes_to_the_highest_priority_class():
+    controller = AdmissionController(max_concurrent=1)
+    controller.acquire()
+    admitted = []
+    
+    threads = [start_waiter(controller, "batch", admitted)]
+    wait_for_depth(controller, "batch", 1)
+    threads.append(start_waiter(controller, "interactive", admitted))
+    wait_for_depth(controller, "interactive", 1)
+    controller.release()
+    for thread in threads:
+        thread.join(5)
+    
+    assert admitted == ["interactive", "batch"]
+    assert controller.stats()["in_flight"] == 0
+
+
+def test_full_queue_rejects():
+    controller = AdmissionController(max_concurrent=1, max_queue=1)
+    controller.acquire()
+    admitted = []
+    thread = start_waiter(controller, "batch", admitted)
+    wait_for_depth(controller, "batch", 1)
+    
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.acquire(priority="batch")
+    
+    assert rejected.value.reason == "queue_full"
+    controller.release()
+    thread.join(5)
+    assert controller.stats()["classes"]["batch"]["rejected"] == 1
+
+
+def test_request_waiting_past_its_deadline_is_rejected():
+    controller = AdmissionController(max_concurrent=1)
+    controller.acquire()
+    
+    start = time.monotonic()
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.acquire(deadline=time.monotonic() + 0.1)
+    
+    assert rejected.value.reason == "deadline"
+    assert time.monotonic() - start < 1.0
+    assert controller.queue_depths()["interactive"] == 0
+
+
+def test_rate_limited_request_that_cannot_make_its_deadline_is_rejected():
+    controller = AdmissionController(tenant_rate=0.01, tenant_burst=1)
+    controller.acquire("a")
+    controller.release()
+    
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.acquire("a", deadline=time.monotonic() + 1.0)
+    
+    assert rejected.value.reason == "rate_limited"
+    # Other tenants have their own buckets
+    controller.acquire("b", deadline=time.monotonic() + 1.0)
+
+
+def test_rejected_request_gives_back_its_rate_limit_token():
+    controller = AdmissionController(max_concurrent=1, tenant_limits={"limited": (0.01, 1)})
+    controller.acquire("other")
+    
+    with pytest.raises(AdmissionRejected):
+        controller.acquire("limited", deadline=time.monotonic() + 0.05)
+    controller.release()
+    
+    # The token was refunded, so the next request is not rate limited
+    controller.acquire("limited", deadline=time.monotonic() + 1.0)
+    assert controller.stats()["tenants"]["limited"]["admitted"] == 1
+
+
+def test_async_requests_are_admitted_by_priority():
+    controller = AdmissionController(max_concurrent=1)
+    admitted = []
+    
+    async def request(priority):
+        await controller.aacquire(priority=priority)
+        admitted.append(priority)
+        controller.release()
+    
+    async def main():
+        await controller.aacquire()
+        tasks = [asyncio.ensure_future(request("batch"))]
+        await asyncio.sleep(0.01)
+        tasks.append(asyncio.ensure_future(request("interactive")))
+        await asyncio.sleep(0.01)
+        controller.release()
+        await asyncio.wait_for(asyncio.gather(*tasks), 5)
+    
+    asyncio.run(main())
+    assert admitted == ["interactive", "batch"]
+
+
+def test_cancelled_async_request_leaves_the_queue():
+    controller = AdmissionController(max_concurrent=1, tenant_limits={"limited": (0.01, 1)})
+    
+    async def main():
+        await controller.aacquire("other")
+        waiter = asyncio.ensure_future(controller.aacquire("limited"))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert controller.queue_depths()["interactive"] == 0
+        controller.release()
+        await asyncio.wait_for(controller.aacquire("limited", deadline=time.monotonic() + 1.0), 2)
+        controller.release()
+    
+    asyncio.run(main())
+    assert controller.stats()["in_flight"] == 0
+
+
+def test_admitted_llm_returns_error_when_rejected_at_turn_deadline(cassette, replay_server):
+    messages = [{"role": "user", "content": "hi"}]
+    cassette.record(messages, "hello")
+    server = replay_server()
+    controller = AdmissionController(max_concurrent=1)
+    llm = AdmittedLLM(OllamaLLM(MODEL, base_url=server.url), controller)
+    
+    assert llm.generate_response(messages)["content"] == "hello"
+    
+    controller.acquire()
+    with deadline.budget(0.1):
+        response = llm.generate_response(messages)
+    controller.release()
+    
+    assert response["content"].startswith("Error:")
+    assert "deadline" in response["content"]
+    assert controller.stats()["in_flight"] == 0
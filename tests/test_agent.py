@@ -0,0 +1,113 @@
+"""
+Tests for agent turns.
+"""
+import asyncio
+
+import pytest
+
+from openagents.core.agent import Agent
+from openagents.llm.ollama_me import OllamaLLM
+from openagents.llm.usage import UsageTracker
+from openagents.tools.base import Tool
+from openagents.tools.registry import ToolRegistry
+from openagents.tools.result_store import ResultStore
+from openagents.tools.retrieval import ToolSelector
+from openagents.utils import deadline, session, tracing
+
+from conftest import MODEL
+
+SYSTEM_PROMPT = "You are a test agent."
+
+
+def make_agent(server, **kwargs) -> Agent:
+    llm = OllamaLLM(MODEL, base_url=server.url)
+    return Agent("test", SYSTEM_PROMPT, llm, ToolRegistry(), usage_tracker=UsageTracker(), **kwargs)
+
+
+def prompt(*messages: str) -> list:
+    return [{"role": "system", "content": SYSTEM_PROMPT}] + [{"role": "user", "content": m} for m in messages]
+
+
+PAGE = "filler " * 2000 + "the needle is here " + "filler " * 500
+
+
+def fetch_page() -> str:
+    return PAGE
+
+
+def run_turn(agent: Agent, mode: str, user_input: str):
+    """Run a turn; returns the answer and the stream events (empty unless streamed)"""
+    if mode == "sync":
+        return agent.process_input(user_input), []
+    if mode == "async":
+        return asyncio.run(agent.aprocess_input(user_input)), []
+    events = list(agent.stream_input(user_input))
+    return events[-1]["content"], events
+
+
+def test_stream_turn_context_does_not_leak_to_the_consumer(cassette, replay_server):
+    cassette.record(prompt("hi"), "hello there, how can I help you today?")
+    agent = make_agent(replay_server())
+    
+    seen = []
+    for event in agent.stream_input("hi", budget=30):
+        seen.append((deadline.remaining(), session.current(), tracing.current_span()))
+    
+    assert event == {"type": "done", "content": "hello there, how can I help you today?"}
+    assert len(seen) > 2
+    assert set(seen) == {(None, None, None)}
+
+
+def test_stream_closed_early_ends_the_turn_cleanly(cassette, replay_server):
+    cassette.record(prompt("hi"), "hello there, how can I help you today?")
+    agent = make_agent(replay_server())
+    
+    stream = agent.stream_input("hi", budget=30)
+    first = next(stream)
+    stream.close()
+    
+    assert first["type"] == "content"
+    assert deadline.remaining() is None
+    assert session.current() is None
+    assert tracing.current_span() is None
+
+
+@pytest.mark.parametrize("mode", ["sync", "async", "stream"])
+def test_model_reads_a_stored_result_before_answering(cassette, replay_server, tmp_path, mode):
+    registry = ToolRegistry()
+    registry.register_tool(Tool(name="fetch", description="Fetch the page", function=fetch_page))
+    selector = ToolSelector(registry, pinned=["fetch"])
+    store = ResultStore(str(tmp_path / "results"))
+    server = replay_server_for_result_rounds(cassette, replay_server, registry, store)
+    agent = Agent("test", SYSTEM_PROMPT, OllamaLLM(MODEL, base_url=server.url), registry,
+                  tool_selector=selector, usage_tracker=UsageTracker(), result_store=store)
+    
+    answer, events = run_turn(agent, mode, "fetch the page")
+    
+    assert answer == "The needle is at the end."
+    # The store's tools are the agent's own: the shared registry and selector are untouched
+    assert list(registry.tools) == ["fetch"]
+    assert selector.pinned == ["fetch"]
+    if mode == "stream":
+        assert [event["tool_call"]["name"] for event in events if event["type"] == "tool_call"] == [
+            "fetch", "search_result"
+        ]
+        assert [event["tool_call"]["name"] for event in events if event["type"] == "tool_result"] == [
+            "fetch", "search_result"
+        ]
+
+
+def replay_server_for_result_rounds(cassette, replay_server, registry, store):
+    """Record a turn that fetches a large page, searches the stored copy and answers"""
+    preview = store.compact("fetch", PAGE)
+    search = {"handle": preview.handle, "query": "needle"}
+    all_tools = registry.list_tools() + [tool.get_schema() for tool in store.get_tools()]
+    result_tools = [tool.get_schema() for tool in store.get_tools()]
+    
+    messages = prompt("fetch the page")
+    cassette.record(messages, tool_calls=[{"name": "fetch", "arguments": {}}], tools=all_tools)
+    messages = messages + [{"role": "tool", "content": preview}]
+    cassette.record(messages, tool_calls=[{"name": "search_result", "arguments": search}], tools=result_tools)
+    messages = messages + [{"role": "tool", "content": store.search_result(**search)}]
+    cassette.record(messages, "The needle is at the end.", tools=result_tools)
+    return replay_server()
@@ -0,0 +1,156 @@
+"""
+Tests for endpoint balancing and hedged requests.
+"""
+import asyncio
+import time
+
+from openagents.llm.balancer import BalancedOllamaLLM, EndpointPool
+from openagents.llm.ollama_me import DEADLINE_ERROR
+from openagents.llm.transport import get_default_transport
+from openagents.utils import deadline, session
+
+from conftest import MODEL
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+def balanced(servers, **kwargs) -> BalancedOllamaLLM:
+    """Client over the servers (the first is chosen first) with its own pool"""
+    base_urls = [server.url for server in servers]
+    pool = EndpointPool(base_urls, get_default_transport(), health_interval=None)
+    return BalancedOllamaLLM(MODEL, base_urls=base_urls, pool=pool, **kwargs)
+
+
+def wait_until_idle(llm: BalancedOllamaLLM, timeout: float = 1.0) -> bool:
+    """Wait until no request is outstanding on any endpoint"""
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if all(stats["outstanding"] == 0 for stats in llm.stats().values()):
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_slow_primary_is_hedged_and_the_loser_cancelled(cassette, replay_server):
+    cassette.record(MESSAGES, "hello")
+    slow, fast = replay_server(latency=3.0), replay_server(latency=0.05)
+    llm = balanced([slow, fast], hedge_after=0.1)
+    
+    start = time.monotonic()
+    response = llm.generate_response(MESSAGES)
+    
+    assert response["content"] == "hello"
+    assert time.monotonic() - start < 1.0
+    stats = llm.hedging_stats()
+    assert stats["hedges_fired"] == 1
+    assert stats["hedges_won"] == 1
+    # The request still waiting on the slow server was cancelled, not left to finish
+    assert wait_until_idle(llm)
+
+
+def test_fast_primary_is_not_hedged(cassette, replay_server):
+    cassette.record(MESSAGES, "hello")
+    fast, slow = replay_server(latency=0.01), replay_server(latency=3.0)
+    llm = balanced([fast, slow], hedge_after=0.5)
+    
+    response = llm.generate_response(MESSAGES)
+    
+    assert response["content"] == "hello"
+    assert llm.hedging_stats()["hedges_fired"] == 0
+    assert llm.stats()[slow.url]["requests"] == 0
+
+
+def test_async_hedge_cancels_the_loser(cassette, replay_server):
+    cassette.record(MESSAGES, "hello")
+    slow, fast = replay_server(latency=3.0), replay_server(latency=0.05)
+    llm = balanced([slow, fast], hedge_after=0.1)
+    
+    start = time.monotonic()
+    response = asyncio.run(llm.agenerate_response(MESSAGES))
+    
+    assert response["content"] == "hello"
+    assert time.monotonic() - start < 1.0
+    assert llm.hedging_stats()["hedges_won"] == 1
+    assert wait_until_idle(llm)
+
+
+def test_hedged_request_stops_at_the_turn_deadline(cassette, replay_server):
+    cassette.record(MESSAGES, "hello")
+    first, second = replay_server(latency=3.0), replay_server(latency=3.0)
+    llm = balanced([first, second], hedge_after=0.1)
+    
+    start = time.monotonic()
+    with deadline.budget(0.3):
+        response = llm.generate_response(MESSAGES)
+    
+    assert response == DEADLINE_ERROR
+    assert time.monotonic() - start < 1.5
+    assert wait_until_idle(llm)
+
+
+def test_percentile_threshold_needs_enough_samples(cassette, replay_server):
+    cassette.record(MESSAGES, "hello")
+    server = replay_server(latency=0.01)
+    llm = balanced([server], hedge_after=1.0, hedge_percentile=0.5, hedge_min_samples=3)
+    
+    assert llm.hedge_threshold() == 1.0
+    for _ in range(3):
+        llm.generate_response(MESSAGES)
+    
+    assert llm.hedge_threshold() < 1.0
+
+
+def test_sessions_stick_to_their_endpoint_by_session_id(cassette, replay_server):
+    cassette.record(MESSAGES, "hello")
+    first, second = replay_server(latency=0.0), replay_server(latency=0.0)
+    llm = balanced([first, second])
+    
+    # Identical conversations of different sessions are spread over the endpoints
+    for session_id in ("a", "b", "a", "b", "a"):
+        with session.bind(session_id):
+            llm.generate_response(MESSAGES)
+    
+    stats = llm.stats()
+    assert stats[first.url]["requests"] == 3
+    assert stats[second.url]["requests"] == 2
+
+
+def test_requests_without_a_session_are_not_sticky(cassette, replay_server):
+    cassette.record(MESSAGES, "hello")
+    first, second = replay_server(latency=0.0), replay_server(latency=0.0)
+    llm = balanced([first, second])
+    
+    for _ in range(4):
+        llm.generate_response(MESSAGES)
+    
+    assert [stats["requests"] for stats in llm.stats().values()] == [2, 2]
+
+
+def test_deadline_errors_leave_the_endpoint_healthy(cassette, replay_server):
+    cassette.record(MESSAGES, "hello", latency=1.0)
+    server = replay_server()
+    llm = balanced([server])
+    
+    for _ in range(3):
+        with deadline.budget(0.1):
+            assert llm.generate_response(MESSAGES) == DEADLINE_ERROR
+    with deadline.budget(0.1):
+        events = list(llm.generate_stream(MESSAGES))
+    
+    assert events[-1]["content"] == DEADLINE_ERROR["content"]
+    stats = llm.stats()[server.url]
+    assert stats["healthy"]
+    assert stats["failures"] == 0
+
+
+def test_rejected_requests_leave_the_endpoint_healthy(replay_server):
+    # Nothing recorded, so the server answers 404
+    server = replay_server()
+    llm = balanced([server])
+    
+    for _ in range(3):
+        assert llm.generate_response(MESSAGES)["content"].startswith("Error")
+    
+    stats = llm.stats()[server.url]
+    assert stats["healthy"]
+    assert stats["failures"] == 0
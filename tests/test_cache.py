@@ -0,0 +1,107 @@
+"""
+Tests for the LLM response cache.
+"""
+
+from openagents.llm.cache import CachedLLM, ResponseCache, request_key
+from openagents.llm.ollama_me import OllamaLLM
+
+from conftest import MODEL
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+def response(content: str = "hello") -> dict:
+    return {"content": content, "tool_calls": [{"id": "1", "name": "lookup", "arguments": {"q": "x"}}]}
+
+
+def test_hit_returns_a_copy():
+    cache = ResponseCache()
+    cache.put("key", response())
+    
+    first = cache.get("key")
+    first["tool_calls"][0]["arguments"]["q"] = "changed"
+    
+    assert cache.get("key") == response()
+    assert cache.stats()["memory_hits"] == 2
+
+
+def test_miss_and_expiry():
+    cache = ResponseCache(ttl=-1)
+    cache.put("key", response())
+    
+    assert cache.get("key") is None
+    assert cache.get("other") is None
+    assert cache.stats()["misses"] == 2
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", response("a"))
+    cache.put("b", response("b"))
+    cache.get("a")
+    cache.put("c", response("c"))
+    
+    assert cache.get("b") is None
+    assert cache.get("a")["content"] == "a"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_disk_tier_survives_reopening(tmp_path):
+    path = str(tmp_path / "responses.db")
+    cache = ResponseCache(path=path)
+    cache.put("key", response())
+    cache.close()
+    
+    reopened = ResponseCache(path=path)
+    
+    assert reopened.get("key") == response()
+    assert reopened.stats()["disk_hits"] == 1
+
+
+def test_disk_tier_stays_under_its_size_limit(tmp_path):
+    path = str(tmp_path / "responses.db")
+    size = len('{"content": "x", "tool_calls": null}') + 100
+    cache = ResponseCache(max_entries=1, path=path, max_disk_bytes=3 * size)
+    for i in range(10):
+        cache.put(f"key{i}", {"content": "x" * 100, "tool_calls": None})
+    cache.close()
+    
+    reopened = ResponseCache(max_entries=1, path=path)
+    
+    assert reopened.get("key9") is not None
+    assert reopened.get("key0") is None
+    assert reopened._disk_bytes <= 3 * size
+
+
+def test_key_ignores_options_that_are_not_plain_values():
+    class Manager:
+        pass
+    
+    plain = OllamaLLM(MODEL, temperature=0.2)
+    with_object = OllamaLLM(MODEL, temperature=0.2, manager=Manager())
+    
+    assert CachedLLM(plain)._key(MESSAGES, None) == CachedLLM(with_object)._key(MESSAGES, None)
+    assert request_key(MODEL, MESSAGES, None, {"temperature": 0.2}) != request_key(MODEL, MESSAGES, None, {"temperature": 0.7})
+
+
+def test_cached_llm_serves_repeats_from_the_cache(cassette, replay_server):
+    cassette.record(MESSAGES, "hello")
+    server = replay_server()
+    llm = CachedLLM(OllamaLLM(MODEL, base_url=server.url))
+    
+    first = llm.generate_response(MESSAGES)
+    second = llm.generate_response(MESSAGES)
+    
+    assert first["content"] == second["content"] == "hello"
+    assert "usage" in first and "usage" not in second
+    assert llm.cache.stats()["hits"] == 1
+
+
+def test_errors_are_not_cached(cassette, replay_server):
+    server = replay_server()
+    llm = CachedLLM(OllamaLLM(MODEL, base_url=server.url))
+    
+    assert llm.generate_response(MESSAGES)["content"].startswith("Error:")
+    llm.generate_response(MESSAGES)
+    
+    assert llm.cache.stats()["hits"] == 0
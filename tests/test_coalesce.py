@@ -0,0 +1,211 @@
+"""
+Tests for request coalescing.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from openagents.llm.coalesce import CoalescingLLM, SingleFlight
+from openagents.llm.ollama_me import DEADLINE_ERROR, OllamaLLM
+from openagents.utils import deadline
+
+from conftest import MODEL
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+def run_threads(targets, timeout: float = 10.0) -> None:
+    threads = [threading.Thread(target=target) for target in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout)
+
+
+def test_concurrent_identical_requests_share_one_upstream_call(cassette, replay_server):
+    cassette.record(MESSAGES, "hello", latency=0.3)
+    server = replay_server()
+    group = SingleFlight()
+    llm = CoalescingLLM(OllamaLLM(MODEL, base_url=server.url), group)
+    responses = []
+    
+    run_threads([lambda: responses.append(llm.generate_response(MESSAGES))] * 5)
+    
+    assert [response["content"] for response in responses] == ["hello"] * 5
+    assert group.stats() == {"upstream_calls": 1, "coalesced_calls": 4, "in_flight": 0}
+    # Usage is accounted once, to the caller that made the upstream call
+    assert sum("usage" in response for response in responses) == 1
+
+
+def test_async_identical_requests_share_one_upstream_call(cassette, replay_server):
+    cassette.record(MESSAGES, "hello", latency=0.3)
+    server = replay_server()
+    group = SingleFlight()
+    llm = CoalescingLLM(OllamaLLM(MODEL, base_url=server.url), group)
+    
+    async def main():
+        return await asyncio.gather(*(llm.agenerate_response(MESSAGES) for _ in range(5)))
+    
+    responses = asyncio.run(main())
+    
+    assert [response["content"] for response in responses] == ["hello"] * 5
+    assert group.stats()["upstream_calls"] == 1
+
+
+def test_sequential_requests_are_not_coalesced(cassette, replay_server):
+    cassette.record(MESSAGES, "hello")
+    server = replay_server()
+    group = SingleFlight()
+    llm = CoalescingLLM(OllamaLLM(MODEL, base_url=server.url), group)
+    
+    llm.generate_response(MESSAGES)
+    llm.generate_response(MESSAGES)
+    
+    assert group.stats()["upstream_calls"] == 2
+
+
+def test_follower_stops_waiting_at_its_own_deadline(cassette, replay_server):
+    cassette.record(MESSAGES, "hello", latency=1.0)
+    server = replay_server()
+    group = SingleFlight()
+    llm = CoalescingLLM(OllamaLLM(MODEL, base_url=server.url), group)
+    results = {}
+    
+    def leader():
+        results["leader"] = llm.generate_response(MESSAGES)
+    
+    def follower():
+        while group.stats()["in_flight"] == 0:
+            time.sleep(0.001)
+        start = time.monotonic()
+        with deadline.budget(0.2):
+            results["follower"] = llm.generate_response(MESSAGES)
+        results["follower_wait"] = time.monotonic() - start
+    
+    run_threads([leader, follower])
+    
+    assert results["follower"] == DEADLINE_ERROR
+    assert results["follower_wait"] < 0.8
+    assert results["leader"]["content"] == "hello"
+
+
+def test_async_follower_stops_waiting_at_its_own_deadline(cassette, replay_server):
+    cassette.record(MESSAGES, "hello", latency=1.0)
+    server = replay_server()
+    group = SingleFlight()
+    llm = CoalescingLLM(OllamaLLM(MODEL, base_url=server.url), group)
+    
+    async def follower():
+        await asyncio.sleep(0.05)
+        with deadline.budget(0.2):
+            return await llm.agenerate_response(MESSAGES)
+    
+    async def main():
+        return await asyncio.gather(llm.agenerate_response(MESSAGES), follower())
+    
+    leader_response, follower_response = asyncio.run(main())
+    
+    assert follower_response == DEADLINE_ERROR
+    assert leader_response["content"] == "hello"
+
+
+def test_follower_without_budget_is_not_cut_short_by_the_leader_deadline(cassette, replay_server):
+    cassette.record(MESSAGES, "hello", latency=0.5)
+    server = replay_server()
+    group = SingleFlight()
+    llm = CoalescingLLM(OllamaLLM(MODEL, base_url=server.url), group)
+    results = {}
+    
+    def leader():
+        with deadline.budget(0.1):
+            results["leader"] = llm.generate_response(MESSAGES)
+    
+    def follower():
+        while group.stats()["in_flight"] == 0:
+            time.sleep(0.001)
+        results["follower"] = llm.generate_response(MESSAGES)
+    
+    run_threads([leader, follower])
+    
+    assert results["leader"] == DEADLINE_ERROR
+    assert results["follower"]["content"] == "hello"
+
+
+def test_async_follower_without_budget_is_not_cut_short_by_the_leader_deadline(cassette, replay_server):
+    cassette.record(MESSAGES, "hello", latency=0.5)
+    server = replay_server()
+    llm = CoalescingLLM(OllamaLLM(MODEL, base_url=server.url), SingleFlight())
+    
+    async def leader():
+        with deadline.budget(0.1):
+            return await llm.agenerate_response(MESSAGES)
+    
+    async def follower():
+        await asyncio.sleep(0.02)
+        return await llm.agenerate_response(MESSAGES)
+    
+    async def main():
+        return await asyncio.gather(leader(), follower())
+    
+    leader_response, follower_response = asyncio.run(main())
+    
+    assert leader_response == DEADLINE_ERROR
+    assert follower_response["content"] == "hello"
+
+
+def test_callers_get_their_own_copy_of_the_response():
+    shared = {"content": "", "tool_calls": [{"id": "1", "name": "lookup", "arguments": {}}], "usage": {}}
+    
+    leader_copy = CoalescingLLM._copy(shared, True)
+    follower_copy = CoalescingLLM._copy(shared, False)
+    follower_copy["tool_calls"].append({"id": "2"})
+    
+    assert "usage" in leader_copy and "usage" not in follower_copy
+    assert len(leader_copy["tool_calls"]) == 1
+    assert len(shared["tool_calls"]) == 1
+
+
+def test_upstream_error_reaches_every_caller():
+    group = SingleFlight()
+    release = threading.Event()
+    errors = []
+    
+    def fail():
+        release.wait(5)
+        raise RuntimeError("upstream failed")
+    
+    def call():
+        try:
+            group.do("key", fail)
+        except RuntimeError as e:
+            errors.append(str(e))
+    
+    threads = [threading.Thread(target=call), threading.Thread(target=call)]
+    threads[0].start()
+    while group.stats()["in_flight"] == 0:
+        time.sleep(0.001)
+    threads[1].start()
+    while group.stats()["coalesced_calls"] == 0:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    
+    assert errors == ["upstream failed", "upstream failed"]
+    assert group.stats()["in_flight"] == 0
+
+
+def test_follower_timeout_raises_timeout_error():
+    group = SingleFlight()
+    release = threading.Event()
+    leader = threading.Thread(target=lambda: group.do("key", lambda: release.wait(5)))
+    leader.start()
+    while group.stats()["in_flight"] == 0:
+        time.sleep(0.001)
+    
+    with pytest.raises(TimeoutError):
+        group.do("key", lambda: None, timeout=0.05)
+    release.set()
+    leader.join(5)
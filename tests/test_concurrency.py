@@ -0,0 +1,213 @@
+"""
+Tests for the adaptive (AIMD) concurrency limiter.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from openagents.llm.concurrency import AdaptiveConcurrencyLimiter
+from openagents.llm.ollama_me import OllamaLLM
+
+from conftest import MODEL
+
+
+def timings(eval_seconds: float, tokens: int = 100) -> dict:
+    """Ollama response timing fields for a request that spent all its time generating"""
+    return {"eval_duration": int(eval_seconds * 1e9), "eval_count": tokens}
+
+
+def test_rejects_invalid_limits():
+    with pytest.raises(ValueError):
+        AdaptiveConcurrencyLimiter(initial_limit=0)
+    with pytest.raises(ValueError):
+        AdaptiveConcurrencyLimiter(initial_limit=8, max_limit=4)
+
+
+def test_acquire_waits_at_limit_and_times_out():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+    
+    assert limiter.acquire()
+    assert not limiter.acquire(timeout=0.05)
+    assert limiter.stats()["queued"] == 0
+    limiter.release()
+    assert limiter.acquire(timeout=0.05)
+
+
+def test_slots_are_granted_in_arrival_order():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+    limiter.acquire()
+    order = []
+    
+    def request(name):
+        limiter.acquire()
+        order.append(name)
+        limiter.release()
+    
+    threads = []
+    for name in ("first", "second", "third"):
+        thread = threading.Thread(target=request, args=(name,))
+        thread.start()
+        threads.append(thread)
+        while limiter.stats()["queued"] < len(threads):
+            time.sleep(0.001)
+    limiter.release()
+    for thread in threads:
+        thread.join(5)
+    
+    assert order == ["first", "second", "third"]
+
+
+def test_limit_grows_while_in_use_without_contention():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=8)
+    
+    for _ in range(20):
+        held = limiter.stats()["limit"]
+        for _ in range(held):
+            limiter.acquire()
+        for _ in range(held):
+            limiter.release(latency=0.5, response_data=timings(0.5))
+    
+    stats = limiter.stats()
+    assert stats["limit"] > 2
+    assert stats["increases"] > 0
+    assert stats["decreases"] == 0
+
+
+def test_limit_does_not_grow_when_unused():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4)
+    
+    for _ in range(20):
+        limiter.acquire()
+        limiter.release(latency=0.5, response_data=timings(0.5))
+    
+    assert limiter.stats()["limit"] == 4
+
+
+def test_slower_per_token_time_cuts_the_limit():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=10, backoff_ratio=0.5)
+    
+    limiter.acquire()
+    limiter.release(latency=0.5, response_data=timings(0.5))
+    limiter.acquire()
+    limiter.release(latency=1.5, response_data=timings(1.5))
+    
+    stats = limiter.stats()
+    assert stats["limit"] == 5
+    assert stats["decreases"] == 1
+
+
+def test_time_spent_queued_on_the_server_cuts_the_limit():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=10, backoff_ratio=0.5)
+    
+    limiter.acquire()
+    limiter.release(latency=0.55, response_data=timings(0.5))
+    limiter.acquire()
+    limiter.release(latency=2.0, response_data=timings(0.5))
+    
+    assert limiter.stats()["limit"] == 5
+
+
+def test_failure_cuts_the_limit_once_per_window():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=10, backoff_ratio=0.5)
+    
+    for _ in range(3):
+        limiter.acquire()
+    for _ in range(3):
+        # All three were in flight when the first failure was seen
+        limiter.release(latency=1.0, failed=True)
+    
+    stats = limiter.stats()
+    assert stats["limit"] == 5
+    assert stats["failures"] == 3
+
+
+def test_limit_never_falls_below_minimum():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, min_limit=2)
+    
+    limiter.acquire()
+    limiter.release(latency=0.0, failed=True)
+    
+    assert limiter.stats()["limit"] == 2
+
+
+def test_cancelled_async_waiter_gives_up_its_place():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+    
+    async def main():
+        await limiter.aacquire()
+        waiter = asyncio.ensure_future(limiter.aacquire())
+        await asyncio.sleep(0.01)
+        assert limiter.stats()["queued"] == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert limiter.stats()["queued"] == 0
+        limiter.release()
+    
+    asyncio.run(main())
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_async_waiter_is_granted_on_release():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+    
+    async def main():
+        await limiter.aacquire()
+        waiter = asyncio.ensure_future(limiter.aacquire())
+        await asyncio.sleep(0.01)
+        limiter.release()
+        await asyncio.wait_for(waiter, 1.0)
+        limiter.release()
+    
+    asyncio.run(main())
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_client_requests_queue_at_the_limit(cassette, replay_server):
+    messages = [{"role": "user", "content": "hi"}]
+    cassette.record(messages, "hello", latency=0.2)
+    server = replay_server()
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=2)
+    llm = OllamaLLM(MODEL, base_url=server.url, concurrency_limiter=limiter)
+    responses = []
+    
+    threads = [threading.Thread(target=lambda: responses.append(llm.generate_response(messages))) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    
+    stats = limiter.stats()
+    assert [response["content"] for response in responses] == ["hello"] * 6
+    assert stats["peak_queued"] >= 1
+    assert stats["in_flight"] == 0
+    assert stats["completed"] == 6
+
+
+def test_client_errors_do_not_cut_the_limit(replay_server):
+    # Nothing recorded, so the server answers 404
+    server = replay_server()
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4)
+    llm = OllamaLLM(MODEL, base_url=server.url, concurrency_limiter=limiter)
+    
+    response = llm.generate_response([{"role": "user", "content": "unrecorded"}])
+    
+    stats = limiter.stats()
+    assert response["content"].startswith("Error")
+    assert stats["failures"] == 0
+    assert stats["limit"] == 4
+    assert stats["in_flight"] == 0
+
+
+def test_connection_errors_cut_the_limit():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4, backoff_ratio=0.5)
+    llm = OllamaLLM(MODEL, base_url="http://127.0.0.1:9", concurrency_limiter=limiter)
+    
+    response = llm.generate_response([{"role": "user", "content": "hi"}])
+    
+    stats = limiter.stats()
+    assert response["content"].startswith("Error")
+    assert stats["failures"] == 1
+    assert stats["limit"] == 2
@@ -0,0 +1,84 @@
+"""
+Tests for fitting the conversation to the context budget.
+"""
+
+from openagents.core.context import (
+    COLLAPSED_TOOL_OUTPUT, ContextManager, DropToolOutputsPolicy, SlidingWindowPolicy, message_tokens
+)
+from openagents.core.state import Message
+
+LONG = "word " * 200
+
+
+def turn(question: str, tool_outputs=(), answer: str = "ok"):
+    """Messages of one turn: the question, its tool calls and results, and the answer"""
+    messages = [Message("user", question)]
+    for i, output in enumerate(tool_outputs):
+        messages.append(Message("assistant", None, {"id": str(i), "name": "lookup", "arguments": {}}))
+        messages.append(Message("tool", output))
+    messages.append(Message("assistant", answer))
+    return messages
+
+
+def tokens(messages) -> int:
+    return sum(message_tokens(message) for message in messages)
+
+
+def test_messages_within_budget_are_sent_unchanged():
+    messages = [Message("system", "sys")] + turn("hi")
+    
+    assert ContextManager(max_tokens=1000).fit(messages) is messages
+
+
+def test_old_tool_outputs_are_collapsed_first():
+    messages = [Message("system", "sys")] + turn("old", [LONG]) + turn("new")
+    
+    fitted = ContextManager(max_tokens=tokens(messages) - 10, keep_recent=1).fit(messages)
+    
+    assert [m.get("content") for m in fitted if m.get("role") == "tool"] == [COLLAPSED_TOOL_OUTPUT]
+    assert fitted[1]["content"] == "old"
+    # The history itself is not rewritten
+    assert messages[3]["content"] == LONG
+
+
+def test_sliding_window_drops_the_oldest_turns():
+    messages = [Message("system", "sys")] + turn("first", answer=LONG) + turn("second")
+    
+    fitted = ContextManager(max_tokens=50, keep_recent=1).fit(messages)
+    
+    assert [m["content"] for m in fitted] == ["sys", "second", "ok"]
+
+
+def test_current_turn_keeps_its_user_message_with_many_tool_calls():
+    messages = [Message("system", "sys")] + turn("old", answer=LONG) + turn("question", ["a", "b", "c", "d"], LONG)
+    
+    fitted = ContextManager(max_tokens=tokens(messages) - 10, keep_recent=1).fit(messages)
+    
+    assert fitted[0]["content"] == "sys"
+    assert fitted[1]["content"] == "question"
+    assert fitted[-1]["content"] == LONG
+
+
+def test_tool_calls_without_content_do_not_count():
+    call = Message("assistant", None, {"id": "1", "name": "lookup", "arguments": {"query": LONG}})
+    
+    assert message_tokens(call) == 0
+    assert message_tokens(Message("user", "hello")) > 0
+
+
+def test_plain_dict_messages_are_not_modified():
+    message = {"role": "user", "content": "hello"}
+    
+    message_tokens(message)
+    
+    assert message == {"role": "user", "content": "hello"}
+
+
+def test_policies_collapse_tool_outputs_and_drop_messages():
+    older = turn("old", [LONG])
+    
+    collapsed = DropToolOutputsPolicy().apply(older, excess=1)
+    dropped = SlidingWindowPolicy().apply(older, excess=tokens(older))
+    
+    assert collapsed[2]["content"] == COLLAPSED_TOOL_OUTPUT
+    assert dropped == []
@@ -0,0 +1,164 @@
+"""
+Tests for turn deadlines: budgeted agent turns and tool timeouts.
+"""
+import asyncio
+import json
+import time
+
+from openagents.core.agent import Agent
+from openagents.llm.ollama_me import DEADLINE_ERROR, OllamaLLM
+from openagents.tools.base import Tool
+from openagents.tools.registry import ToolRegistry
+from openagents.utils import deadline
+
+from conftest import MODEL
+
+SYSTEM = "You are a test agent."
+
+
+def make_agent(server, registry=None, **kwargs) -> Agent:
+    return Agent("test", SYSTEM, OllamaLLM(MODEL, base_url=server.url), registry or ToolRegistry(), **kwargs)
+
+
+def opening(user_input: str):
+    return [{"role": "system", "content": SYSTEM}, {"role": "user", "content": user_input}]
+
+
+def lookup_call():
+    return [{"id": "call-1", "name": "lookup", "arguments": {}}]
+
+
+def test_budget_nests_and_only_shortens():
+    assert deadline.remaining() is None
+    with deadline.budget(10):
+        outer = deadline.current()
+        with deadline.budget(60):
+            assert deadline.current() == outer
+        with deadline.budget(0.5):
+            assert deadline.remaining() <= 0.5
+        assert deadline.current() == outer
+    assert deadline.current() is None
+
+
+def test_llm_call_stops_at_deadline(cassette, replay_server):
+    cassette.record(opening("hi"), "hello", latency=5.0)
+    server = replay_server()
+    llm = OllamaLLM(MODEL, base_url=server.url)
+    
+    start = time.monotonic()
+    with deadline.budget(0.3):
+        response = llm.generate_response(opening("hi"))
+    
+    assert response == DEADLINE_ERROR
+    assert time.monotonic() - start < 2.0
+
+
+def test_budgeted_turn_against_slow_model_returns_best_effort_answer(cassette, replay_server):
+    cassette.record(opening("hi"), "hello", latency=5.0)
+    agent = make_agent(replay_server())
+    
+    start = time.monotonic()
+    answer = agent.process_input("hi", budget=0.3)
+    
+    assert answer == "I ran out of time before I could answer."
+    assert time.monotonic() - start < 2.0
+    assert agent.state.get_messages()[-1]["content"] == answer
+
+
+def test_best_effort_answer_includes_tool_results(cassette, replay_server):
+    registry = ToolRegistry()
+    registry.register_tool(Tool("lookup", "Look up the answer", lambda: "42"))
+    tools = registry.list_tools()
+    cassette.record(opening("question"), tool_calls=lookup_call(), tools=tools)
+    cassette.record(opening("question") + [{"role": "tool", "content": "42"}], "It is 42", latency=5.0)
+    agent = make_agent(replay_server(), registry)
+    
+    start = time.monotonic()
+    answer = agent.process_input("question", budget=0.5)
+    
+    assert answer.startswith("I ran out of time")
+    assert "lookup: 42" in answer
+    assert time.monotonic() - start < 2.0
+
+
+def test_turn_within_budget_is_unaffected(cassette, replay_server):
+    cassette.record(opening("hi"), "hello", latency=0.05)
+    agent = make_agent(replay_server())
+    
+    assert agent.process_input("hi", budget=5.0) == "hello"
+
+
+def test_async_turn_against_slow_model_returns_best_effort_answer(cassette, replay_server):
+    cassette.record(opening("hi"), "hello", latency=5.0)
+    agent = make_agent(replay_server())
+    
+    start = time.monotonic()
+    answer = asyncio.run(agent.aprocess_input("hi", budget=0.3))
+    
+    assert answer == "I ran out of time before I could answer."
+    assert time.monotonic() - start < 2.0
+
+
+def test_overrunning_tool_returns_timeout_result(cassette, replay_server):
+    registry = ToolRegistry()
+    registry.register_tool(Tool("lookup", "Look up the answer", lambda: time.sleep(5) or "42"))
+    agent = make_agent(replay_server(), registry, tool_timeout=0.2)
+    
+    start = time.monotonic()
+    result = json.loads(agent.execute_tool("lookup", {}))
+    
+    assert result["status"] == "timeout"
+    assert result["tool"] == "lookup"
+    assert time.monotonic() - start < 1.0
+
+
+def test_overrunning_async_tool_returns_timeout_result(cassette, replay_server):
+    async def lookup():
+        await asyncio.sleep(5)
+        return "42"
+    
+    registry = ToolRegistry()
+    registry.register_tool(Tool("lookup", "Look up the answer", lookup))
+    agent = make_agent(replay_server(), registry, tool_timeout=0.2)
+    
+    start = time.monotonic()
+    sync_result = json.loads(agent.execute_tool("lookup", {}))
+    async_result = json.loads(asyncio.run(agent.aexecute_tool("lookup", {})))
+    
+    assert sync_result["status"] == "timeout"
+    assert async_result["status"] == "timeout"
+    assert time.monotonic() - start < 2.0
+
+
+def test_tool_in_budgeted_turn_gets_remaining_time(cassette, replay_server):
+    registry = ToolRegistry()
+    registry.register_tool(Tool("lookup", "Look up the answer", lambda: time.sleep(5) or "42"))
+    cassette.record(opening("question"), tool_calls=lookup_call(), tools=registry.list_tools())
+    agent = make_agent(replay_server(), registry)
+    
+    start = time.monotonic()
+    answer = agent.process_input("question", budget=0.5)
+    
+    assert answer.startswith("I ran out of time")
+    assert '"status": "timeout"' in answer
+    assert time.monotonic() - start < 2.0
+
+
+def test_tool_raising_timeout_error_is_reported_as_error(cassette, replay_server):
+    def lookup():
+        raise TimeoutError("database did not answer")
+    
+    registry = ToolRegistry()
+    registry.register_tool(Tool("lookup", "Look up the answer", lookup))
+    agent = make_agent(replay_server(), registry, tool_timeout=5.0)
+    
+    result = agent.execute_tool("lookup", {})
+    
+    assert result == "Error executing tool 'lookup': database did not answer"
+
+
+def test_run_with_timeout_carries_the_deadline():
+    with deadline.budget(10):
+        left = deadline.run_with_timeout(deadline.remaining, 1.0)
+    
+    assert left is not None and 0 < left <= 10
@@ -0,0 +1,123 @@
+"""
+Tests for model residency management.
+"""
+
+from openagents import create_agent
+from openagents.llm.balancer import BalancedOllamaLLM, EndpointPool
+from openagents.llm.providers import LLMRegistry
+from openagents.llm.replay import ReplayLLM
+from openagents.llm.residency import ModelResidencyManager
+
+MB = 1024 * 1024
+
+
+class FakeResponse:
+    def __init__(self, data, status_code=200):
+        self.data = data
+        self.status_code = status_code
+    
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+    
+    def json(self):
+        return self.data
+
+
+class FakeTransport:
+    """Answers Ollama load/unload and /api/ps requests from per-host state"""
+    
+    connect_timeout = 1.0
+    
+    def __init__(self, running=None, failing_unloads=()):
+        self.running = running or {}
+        self.failing_unloads = set(failing_unloads)
+        self.posts = []
+    
+    def post(self, url, json=None, **kwargs):
+        self.posts.append((url, json))
+        host = url.rsplit("/api/", 1)[0]
+        if json.get("keep_alive") == 0:
+            if (host, json["model"]) in self.failing_unloads:
+                return FakeResponse({}, 500)
+            self.running.get(host, {}).pop(json["model"], None)
+        else:
+            self.running.setdefault(host, {}).setdefault(json["model"], MB)
+        return FakeResponse({"done": True, "load_duration": 0})
+    
+    def get(self, url, **kwargs):
+        host = url.rsplit("/api/", 1)[0]
+        models = [{"name": name, "size": size} for name, size in self.running.get(host, {}).items()]
+        return FakeResponse({"models": models})
+
+
+def test_keep_alive_overrides_ignore_the_latest_tag():
+    manager = ModelResidencyManager(transport=FakeTransport(), keep_alive={"llama3.2:latest": "1h"})
+    
+    assert manager.keep_alive_for("llama3.2") == "1h"
+    assert manager.keep_alive_for("llama3.2:latest") == "1h"
+    assert manager.keep_alive_for("other") == "30m"
+
+
+def test_resident_sets_are_kept_per_host():
+    transport = FakeTransport(running={"http://a": {"m1": MB}, "http://b": {"m2": MB}})
+    manager = ModelResidencyManager(base_url="http://a", transport=transport)
+    
+    manager.record_request("m1", 0.1, {}, base_url="http://a")
+    manager.record_request("m2:latest", 0.1, {}, base_url="http://b")
+    
+    assert manager.is_resident("m1", "http://a")
+    assert manager.is_resident("m2", "http://b")
+    assert not manager.is_resident("m1", "http://b")
+    assert manager.stats()["resident"] == {"http://a": {"m1": 1.0}, "http://b": {"m2": 1.0}}
+
+
+def test_budget_unloads_least_recently_used_model_on_that_host_only():
+    running = {"http://a": {"old": 600 * MB, "new": 600 * MB}, "http://b": {"other": 600 * MB}}
+    transport = FakeTransport(running=running)
+    manager = ModelResidencyManager(base_url="http://a", transport=transport, memory_budget_mb=1000)
+    manager.record_request("other", 0.1, {}, base_url="http://b")
+    
+    manager.record_request("new", 0.1, {}, base_url="http://a")
+    
+    assert not manager.is_resident("old", "http://a")
+    assert manager.is_resident("new", "http://a")
+    assert manager.is_resident("other", "http://b")
+    assert ("http://a/api/generate", {"model": "old", "keep_alive": 0}) in transport.posts
+
+
+def test_model_that_failed_to_unload_stays_tracked():
+    running = {"http://a": {"old": 600 * MB, "new": 600 * MB}}
+    transport = FakeTransport(running=running, failing_unloads={("http://a", "old")})
+    manager = ModelResidencyManager(base_url="http://a", transport=transport, memory_budget_mb=1000)
+    
+    manager.record_request("new", 0.1, {})
+    
+    assert manager.is_resident("old")
+    assert not manager.unload("old")
+
+
+def test_balanced_client_is_preloaded_on_every_host():
+    transport = FakeTransport()
+    manager = ModelResidencyManager(transport=transport)
+    pool = EndpointPool(["http://a", "http://b"], transport, health_interval=None)
+    llm = BalancedOllamaLLM("m", base_urls=["http://a", "http://b"], pool=pool, transport=transport)
+    
+    manager.preload_for(llm)
+    
+    assert sorted(url for url, _ in transport.posts) == ["http://a/api/generate", "http://b/api/generate"]
+    assert manager.is_resident("m", "http://a") and manager.is_resident("m", "http://b")
+
+
+def test_create_agent_skips_residency_for_other_providers(tmp_path):
+    transport = FakeTransport()
+    manager = ModelResidencyManager(transport=transport)
+    LLMRegistry.register_provider("replay-test", ReplayLLM)
+    
+    agent = create_agent("test", "sys", llm_provider="replay-test", llm_model="m",
+                         include_general_tools=False, residency=manager,
+                         cassette=str(tmp_path / "cassette.jsonl"))
+    
+    assert isinstance(agent.llm, ReplayLLM)
+    assert "residency" not in agent.llm.kwargs
+    assert transport.posts == []
@@ -0,0 +1,115 @@
+"""
+Tests for the large tool result store.
+"""
+import gc
+import os
+
+import pytest
+
+from openagents.tools.result_store import ResultPreview, ResultStore
+
+TEXT = "".join(f"line {i:04d}\n" for i in range(1000))
+
+
+def test_put_is_content_addressed(tmp_path):
+    store = ResultStore(str(tmp_path))
+    
+    handle = store.put(TEXT)
+    
+    assert store.put(TEXT) == handle
+    assert store.put(TEXT + "more") != handle
+    assert len(handle) == 16
+    assert store.size(handle) == len(TEXT)
+
+
+def test_read_slices(tmp_path):
+    store = ResultStore(str(tmp_path))
+    handle = store.put(TEXT)
+    
+    assert store.read(handle) == TEXT
+    assert store.read(handle, 10, 10) == "line 0001\n"
+    assert store.read(handle, len(TEXT) - 5, 100) == "0999\n"
+    assert store.read(handle, len(TEXT) + 10) == ""
+    assert store.read(store.put("")) == ""
+
+
+def test_read_drops_characters_cut_by_the_slice(tmp_path):
+    store = ResultStore(str(tmp_path))
+    handle = store.put("aé" * 10)
+    
+    # "é" is two bytes; a slice through the middle of one drops it
+    assert store.read(handle, 0, 2) == "a"
+    assert store.read(handle, 0, 3) == "aé"
+
+
+def test_search_finds_matches_with_context(tmp_path):
+    store = ResultStore(str(tmp_path))
+    handle = store.put(TEXT)
+    
+    matches = store.search(handle, "line 0500", context=5)
+    
+    assert matches == [{"offset": 5000, "snippet": "0499\nline 0500\nline"}]
+    assert len(store.search(handle, "line", max_matches=3)) == 3
+    assert store.search(handle, "missing") == []
+    assert store.search(handle, "") == []
+
+
+def test_unknown_and_invalid_handles(tmp_path):
+    store = ResultStore(str(tmp_path))
+    
+    with pytest.raises(FileNotFoundError):
+        store.read("0" * 16)
+    with pytest.raises(ValueError):
+        store.read("../../etc/passwd")
+    assert store.read_result("0" * 16).startswith("Error: No stored result")
+    assert store.search_result("not-a-handle", "x").startswith("Error: Invalid result handle")
+
+
+def test_compact_keeps_small_results_and_previews_large_ones(tmp_path):
+    store = ResultStore(str(tmp_path), threshold=1000, preview_chars=100)
+    
+    assert store.compact("tool", "short") == "short"
+    preview = store.compact("tool", TEXT)
+    
+    assert isinstance(preview, ResultPreview)
+    assert TEXT[:100] in preview
+    assert TEXT[100:200] not in preview
+    assert store.read(preview.handle) == TEXT
+
+
+def test_result_tools_read_and_search(tmp_path):
+    store = ResultStore(str(tmp_path), threshold=1000, preview_chars=100)
+    handle = store.put(TEXT)
+    
+    assert store.read_result(handle, 20, 10) == "[Bytes 20-30 of 10000]\nline 0002\n"
+    # Slices stay under the threshold so they are not stored again
+    assert len(store.read_result(handle, 0, 5000)) < 1000
+    found = store.search_result(handle, "line 0007")
+    assert found.startswith("[offset 70] ...line 0000")
+    assert found.endswith("line 0017...")
+    assert store.search_result(handle, "missing") == "No matches for 'missing'"
+
+
+def test_close_removes_only_a_directory_the_store_created(tmp_path):
+    own = ResultStore(str(tmp_path))
+    own.put(TEXT)
+    with ResultStore() as temporary:
+        temporary.put(TEXT)
+        directory = temporary.directory
+        assert os.path.isdir(directory)
+    
+    own.close()
+    
+    assert not os.path.exists(directory)
+    assert os.listdir(tmp_path)
+
+
+def test_temporary_directory_is_removed_when_the_store_is_collected():
+    store = ResultStore()
+    store.put(TEXT)
+    directory = store.directory
+    
+    del store
+    gc.collect()
+    
+    assert not os.path.exists(directory)
@@ -0,0 +1,109 @@
+"""
+Tests for sandboxed tool execution.
+
+Tool functions live at module level so the worker processes can unpickle
+them; the executor starts its workers with forkserver (or spawn), which
+re-imports this module instead of forking the test process.
+"""
+import asyncio
+import os
+import time
+
+import pytest
+
+from openagents.tools.base import Tool, ToolTimeoutError
+from openagents.tools.sandbox import SandboxExecutor, ToolExecutionError
+
+
+def square(x: int) -> int:
+    return x * x
+
+
+def sleep_for(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+def crash() -> None:
+    os._exit(3)
+
+
+def fail(message: str) -> None:
+    raise ValueError(message)
+
+
+def big_result(size: int) -> bytes:
+    return b"x" * size
+
+
+async def async_square(x: int) -> int:
+    await asyncio.sleep(0)
+    return x * x
+
+
+@pytest.fixture
+def sandbox():
+    executor = SandboxExecutor(workers=1, timeout=5.0, preload=())
+    yield executor
+    executor.close()
+
+
+def test_runs_functions_in_a_worker_process(sandbox):
+    assert sandbox.run(square, {"x": 7}) == 49
+    assert sandbox.run(async_square, {"x": 3}) == 9
+    assert sandbox.run(os.getpid, {}) != os.getpid()
+    assert sandbox.stats()["calls"] == 3
+
+
+def test_timeout_replaces_the_worker(sandbox):
+    pid = sandbox.run(os.getpid, {})
+    
+    start = time.monotonic()
+    with pytest.raises(ToolTimeoutError):
+        sandbox.run(sleep_for, {"seconds": 10}, timeout=0.3)
+    
+    assert time.monotonic() - start < 3
+    stats = sandbox.stats()
+    assert stats["timeouts"] == 1
+    assert stats["replacements"] == 1
+    assert stats["idle_workers"] == 1
+    # The stuck worker is gone and a fresh one answers
+    assert sandbox.run(os.getpid, {}) != pid
+    assert sandbox.run(square, {"x": 2}) == 4
+
+
+def test_crashed_worker_is_replaced(sandbox):
+    with pytest.raises(ToolExecutionError, match="exit code 3"):
+        sandbox.run(crash, {})
+    
+    stats = sandbox.stats()
+    assert stats["failures"] == 1
+    assert stats["replacements"] == 1
+    assert sandbox.run(square, {"x": 5}) == 25
+
+
+def test_function_errors_keep_the_worker(sandbox):
+    pid = sandbox.run(os.getpid, {})
+    
+    with pytest.raises(ToolExecutionError, match="ValueError: bad input") as error:
+        sandbox.run(fail, {"message": "bad input"})
+    
+    assert "raise ValueError(message)" in error.value.remote_traceback
+    assert sandbox.stats()["replacements"] == 0
+    assert sandbox.run(os.getpid, {}) == pid
+
+
+def test_large_results_come_back_through_shared_memory():
+    with SandboxExecutor(workers=1, shm_threshold=1024, preload=()) as sandbox:
+        assert sandbox.run(big_result, {"size": 100}) == b"x" * 100
+        assert sandbox.run(big_result, {"size": 1 << 20}) == b"x" * (1 << 20)
+        assert sandbox.stats()["shm_transfers"] == 1
+
+
+def test_wrapped_tool_times_out_through_tool_call(sandbox):
+    tool = sandbox.wrap(Tool(name="sleep", description="Sleep", function=sleep_for))
+    
+    assert tool.call({"seconds": 0}) == 0
+    with pytest.raises(ToolTimeoutError):
+        tool.call({"seconds": 10}, timeout=0.3)
+    assert sandbox.stats()["replacements"] == 1
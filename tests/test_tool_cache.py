@@ -0,0 +1,99 @@
+"""
+Tests for the tool result cache.
+"""
+import time
+
+from openagents.tools.base import CACHE_NEVER, CACHE_PURE, Tool
+from openagents.tools.cache import ToolResultCache
+
+
+def search_documents(query: str, limit: int = 10) -> dict:
+    return {"query": query, "hits": [query] * limit}
+
+
+def search_web(query: str, limit: int = 10) -> dict:
+    return {"query": query, "hits": []}
+
+
+def tool(function=search_documents, name: str = "search", cache: str = CACHE_PURE) -> Tool:
+    return Tool(name=name, description="Search", function=function, cache=cache)
+
+
+def test_only_cacheable_tools_get_keys():
+    cache = ToolResultCache()
+    
+    assert cache.key_for(tool(cache=CACHE_NEVER), {"query": "x"}) is None
+    assert cache.key_for(tool(), {"query": "x"}) is not None
+
+
+def test_argument_order_does_not_matter():
+    cache = ToolResultCache()
+    
+    assert cache.key_for(tool(), {"query": "x", "limit": 2}) == cache.key_for(tool(), {"limit": 2, "query": "x"})
+
+
+def test_hit_returns_a_copy_and_put_stores_one():
+    cache = ToolResultCache()
+    key = cache.key_for(tool(), {"query": "x"})
+    result = search_documents("x", 2)
+    cache.put(key, result)
+    
+    result["hits"].append("changed by the caller")
+    _, first = cache.get(key)
+    first["hits"].clear()
+    
+    assert cache.get(key) == (True, {"query": "x", "hits": ["x", "x"]})
+
+
+def test_same_named_tools_with_different_functions_do_not_collide():
+    cache = ToolResultCache()
+    documents_key = cache.key_for(tool(search_documents), {"query": "x"})
+    web_key = cache.key_for(tool(search_web), {"query": "x"})
+    cache.put(documents_key, "documents")
+    
+    assert documents_key != web_key
+    assert cache.get(web_key) == (False, None)
+    # A separately constructed tool around the same function shares results
+    assert cache.get(cache.key_for(tool(search_documents), {"query": "x"})) == (True, "documents")
+
+
+def test_stats_and_invalidate_handle_names_with_colons():
+    cache = ToolResultCache()
+    namespaced = tool(name="docs:search")
+    plain = tool(name="docs")
+    cache.put(cache.key_for(namespaced, {"query": "x"}), "namespaced")
+    cache.put(cache.key_for(plain, {"query": "x"}), "plain")
+    
+    cache.get(cache.key_for(namespaced, {"query": "x"}))
+    cache.get(cache.key_for(namespaced, {"query": "y"}))
+    cache.invalidate("docs")
+    
+    stats = cache.stats()
+    assert stats["tools"] == {"docs:search": {"hits": 1, "misses": 1, "hit_rate": 0.5}}
+    assert stats["entries"] == 1
+    assert cache.get(cache.key_for(namespaced, {"query": "x"}))[0]
+
+
+def test_expired_results_are_misses():
+    cache = ToolResultCache()
+    key = cache.key_for(tool(), {"query": "x"})
+    cache.put(key, "result", ttl=0.01)
+    
+    time.sleep(0.02)
+    
+    assert cache.get(key) == (False, None)
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_result_is_evicted():
+    cache = ToolResultCache(max_entries=2)
+    keys = [cache.key_for(tool(), {"query": query}) for query in ("a", "b", "c")]
+    cache.put(keys[0], "a")
+    cache.put(keys[1], "b")
+    cache.get(keys[0])
+    
+    cache.put(keys[2], "c")
+    
+    assert cache.get(keys[0]) == (True, "a")
+    assert cache.get(keys[1]) == (False, None)
+    assert cache.stats()["evictions"] == 1